@@ -1,64 +1,851 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
+from tkinter import ttk, messagebox
 import sqlite3
 from datetime import datetime, date, timedelta
-import calendar as cal
-import csv
 import os
+import sys
+import argparse
+import threading
+import time
+import hashlib
+import re
+import json
+import heapq
+import itertools
+from collections import OrderedDict
 
-class Database: # Responsible for handling all database operations
-    
-    def __init__(self, db_path='ClassIFY.db'): # ClassIFY.db is created and connected automatically when the program runs
-        self.db_path = db_path
-        self.conn = None
-        self.cursor = None
-        self.init_database()
-        
-    def init_database(self):
-        self.conn = sqlite3.connect(self.db_path) # Establish the actual connection between the GUI and the database
-        self.cursor = self.conn.cursor()
-        self.cursor.execute("PRAGMA foreign_keys = ON")
-        self.create_tables()
-        self.seed_data_if_empty()
-        self.write_schema_files()
-        print(f"✅ Database initialized: {self.db_path}")
-        
-    def create_tables(self):
-        tables = [
-            """CREATE TABLE IF NOT EXISTS subjects (
-                SubjectCode TEXT PRIMARY KEY,       -- e.g. 'CS 212'
+# Rarely used modules (csv, gzip, uuid, socket, array, bisect, pathlib, subprocess, shutil, filedialog, tkcalendar,
+# numpy) are imported where they are needed so startup only pays for what the dashboard uses
+IMPORT_BUDGET_MS = 100                   # 'import-budget' fails when importing this module takes longer
+
+# Backup settings - snapshots go to a 'backups' folder next to the database file
+BACKUP_DIR_NAME = 'backups'
+BACKUP_KEEP = 7                          # number of snapshots kept by rotation
+BACKUP_INTERVAL_MS = 30 * 60 * 1000      # automatic backup every 30 minutes while the GUI runs
+BACKUP_PAGES_PER_STEP = 64               # pages copied per backup step before locks are released
+BACKUP_STEP_SLEEP = 0.005                # seconds to yield to writers between steps
+
+# Maintenance - ANALYZE, integrity checks and incremental VACUUM on a cadence; PRAGMA optimize on every close
+MAINTENANCE_INTERVAL_DAYS = 7            # days between maintenance runs
+MAINTENANCE_FIRST_CHECK_MS = 2 * 60 * 1000   # the GUI first checks shortly after startup...
+MAINTENANCE_CHECK_MS = 60 * 60 * 1000    # ...and then every hour whether a run is due
+MAINTENANCE_LOG_SQL = """CREATE TABLE IF NOT EXISTS maintenance_log (
+                RunID INTEGER PRIMARY KEY AUTOINCREMENT,
+                StartedAt TEXT NOT NULL,           -- local time, YYYY-MM-DD HH:MM:SS
+                Seconds REAL NOT NULL,
+                QuickCheck TEXT,                   -- 'ok' or the first problem PRAGMA quick_check found
+                ForeignKeyErrors INTEGER,          -- rows reported by PRAGMA foreign_key_check
+                BytesReclaimed INTEGER,            -- file shrink from (incremental) VACUUM
+                Steps TEXT                         -- JSON seconds per step
+            )"""
+
+# Multi-student deployments - one database file per student under this folder
+TENANT_DIR_NAME = 'students'
+
+# Local JSON API ('serve') - asyncio HTTP server; SQLite calls run on executor threads, never on the event loop
+API_HOST = '127.0.0.1'                   # loopback only; other devices need --host and the printed token
+API_PORT = 8765
+API_READERS = 4                          # reader threads, each with its own read-only connection
+API_MAX_BODY = 64 * 1024                 # bigger request bodies are refused (413)
+API_CACHE_ENTRIES = 64                   # encoded list responses kept per reader, until another connection commits
+API_IDLE_TIMEOUT = 30                    # seconds a keep-alive connection may sit idle
+API_MAX_HEADERS = 100                    # header lines per request; more are refused (431)
+# Field names of the rows each kind of API response carries (the Database method's column order)
+API_COLUMNS = {
+    'subjects': ('SubjectCode', 'Name', 'Instructor', 'Units', 'Goals'),
+    'tasks': ('TaskID', 'SubjectCode', 'TaskName', 'Deadline', 'Priority', 'Status', 'SubjectName', 'Recurrence'),
+    'task': ('TaskID', 'SubjectCode', 'TaskName', 'Deadline', 'Priority', 'Status', 'Recurrence', 'EffortMinutes'),
+    'schedule': ('ScheduleID', 'SubjectCode', 'Day', 'StartTime', 'EndTime', 'Room', 'SubjectName',
+                 'TermStart', 'TermEnd', 'Recurrence', 'StartMinute', 'EndMinute'),
+}
+LOADTEST_CONNECTIONS = 16                # concurrent keep-alive clients
+LOADTEST_SECONDS = 10
+LOADTEST_WRITE_SHARE = 0.1               # fraction of requests that update a task
+
+# Several writers on one file (two windows, the GUI and a script) - lock waits and retries
+DB_BUSY_TIMEOUT_MS = 1000                # PRAGMA busy_timeout: how long SQLite itself waits for a lock
+WRITE_RETRIES = 5                        # further attempts after a write still found the database locked
+WRITE_BACKOFF_SECONDS = 0.02             # first retry delay - doubles per attempt, with jitter
+WRITE_BACKOFF_MAX_SECONDS = 0.5
+
+# Schema version stored in PRAGMA user_version - bump it together with a Database.migrate_vN method
+SCHEMA_VERSION = 6
+
+# Recurring items - how far ahead open-ended repeats are expanded for "upcoming" views
+UPCOMING_HORIZON_DAYS = 120
+DAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+
+# Now / next class ticker - once today's classes are over, the next one is looked for this many days ahead
+NOW_NEXT_LOOKAHEAD_DAYS = 14             # two weeks also finds every-other-week classes
+
+# Reminders - due tasks are announced on their deadline day, classes shortly before they start
+REMINDER_HORIZON_DAYS = 7                # heap holds reminders this far ahead; reloaded daily
+REMINDER_TASK_TIME = '08:00'
+REMINDER_CLASS_LEAD_MINUTES = 10
+REMINDER_SINKS = 'toast,log'             # any of toast, desktop, log
+REMINDER_LOG_FILE = 'ClassIFY_reminders.log'
+
+# Analytics - the column arrays hold the priority rank and the stored StatusID
+ANALYTICS_WEEKS = 8                      # weeks shown by the tasks-per-week chart
+
+# Study planner - free time between classes is filled with sessions for open tasks
+PLANNER_DAY_START = '07:00'
+PLANNER_DAY_END = '21:00'
+PLANNER_HORIZON_DAYS = 120               # how far ahead a plan reaches (about one term)
+PLANNER_MIN_SESSION_MINUTES = 30         # shorter gaps are not worth a session
+PLANNER_MAX_SESSION_MINUTES = 120
+PLANNER_BREAK_MINUTES = 15               # rest between back-to-back sessions
+PLANNER_DEFAULT_EFFORT = [60, 120, 180]  # minutes by priority rank (Low, Medium, High), when a task has no estimate
+
+# Compact layout (schema v6) - tables are STRICT where the SQLite library supports it (3.37+)
+STRICT_SQL = ' STRICT' if sqlite3.sqlite_version_info >= (3, 37, 0) else ''
+
+# Stored codes of the known priorities and statuses - any other name gets the next free code when first saved
+PRIORITY_IDS = {'Low': 0, 'Medium': 1, 'High': 2}       # also the priority rank (2 = High)
+STATUS_IDS = {'Not Started': 0, 'In Progress': 1, 'Completed': 2}
+# Priority rank of a task row - names saved later rank with Low
+PRIORITY_RANK_SQL = (f"CASE t.PriorityID WHEN {PRIORITY_IDS['High']} THEN 2 "
+                     f"WHEN {PRIORITY_IDS['Medium']} THEN 1 ELSE 0 END")
+
+# Tables are rebuilt under a temporary name by rebuild_tables, hence the {name} placeholder
+SUBJECTS_SQL = """CREATE TABLE IF NOT EXISTS {name} (
+                SubjectID INTEGER PRIMARY KEY,     -- compact key tasks and schedule refer to
+                SubjectCode TEXT NOT NULL UNIQUE,  -- e.g. 'CS 212'
                 Name TEXT NOT NULL,
                 Instructor TEXT,
                 Units INTEGER,
                 Goals TEXT                         -- allows up to 100 characters
-            )""",
-            """CREATE TABLE IF NOT EXISTS tasks (
+            )""" + STRICT_SQL
+
+PRIORITIES_SQL = """CREATE TABLE IF NOT EXISTS priorities (
+                PriorityID INTEGER PRIMARY KEY,    -- PRIORITY_IDS, then the next free code
+                Name TEXT NOT NULL UNIQUE
+            )""" + STRICT_SQL
+
+STATUSES_SQL = """CREATE TABLE IF NOT EXISTS statuses (
+                StatusID INTEGER PRIMARY KEY,      -- STATUS_IDS, then the next free code
+                Name TEXT NOT NULL UNIQUE
+            )""" + STRICT_SQL
+
+TASKS_SQL = """CREATE TABLE IF NOT EXISTS {name} (
                 TaskID INTEGER PRIMARY KEY AUTOINCREMENT,
-                SubjectCode TEXT NOT NULL,
+                SubjectID INTEGER NOT NULL,
                 TaskName TEXT NOT NULL,
                 Deadline TEXT,                     -- YYYY-MM-DD
-                Priority TEXT,                     -- Low / Medium / High
-                Status TEXT,                       -- Not Started / In Progress / Completed
-                FOREIGN KEY (SubjectCode) REFERENCES subjects(SubjectCode) ON DELETE CASCADE
-            )""",
-            """CREATE TABLE IF NOT EXISTS schedule (
+                PriorityID INTEGER,                -- priorities: 0 Low, 1 Medium, 2 High
+                StatusID INTEGER,                  -- statuses: 0 Not Started, 1 In Progress, 2 Completed
+                Recurrence TEXT,                   -- NULL or e.g. 'FREQ=WEEKLY;INTERVAL=1;UNTIL=2025-12-20'
+                EffortMinutes INTEGER,             -- estimated work, NULL = default for the priority
+                FOREIGN KEY (SubjectID) REFERENCES subjects(SubjectID) ON DELETE CASCADE,
+                FOREIGN KEY (PriorityID) REFERENCES priorities(PriorityID),
+                FOREIGN KEY (StatusID) REFERENCES statuses(StatusID)
+            )""" + STRICT_SQL
+
+SCHEDULE_SQL = """CREATE TABLE IF NOT EXISTS {name} (
                 ScheduleID INTEGER PRIMARY KEY AUTOINCREMENT,
-                SubjectCode TEXT NOT NULL,
+                SubjectID INTEGER NOT NULL,
                 Day TEXT NOT NULL,                 -- 'Mon','Tue','Wed','Thu','Fri','Sat','Sun'
                 StartTime TEXT NOT NULL,           -- 'HH:MM'
                 EndTime TEXT NOT NULL,             -- 'HH:MM'
                 Room TEXT,
-                FOREIGN KEY (SubjectCode) REFERENCES subjects(SubjectCode) ON DELETE CASCADE
+                TermStart TEXT,                    -- YYYY-MM-DD, NULL = no start date
+                TermEnd TEXT,                      -- YYYY-MM-DD, NULL = no end date
+                Recurrence TEXT,                   -- NULL = every week, or e.g. 'FREQ=WEEKLY;INTERVAL=2'
+                StartMinute INTEGER GENERATED ALWAYS AS (CAST(substr(StartTime, 1, instr(StartTime, ':') - 1) AS INTEGER) * 60
+                                                        + CAST(substr(StartTime, instr(StartTime, ':') + 1) AS INTEGER)) VIRTUAL,
+                EndMinute INTEGER GENERATED ALWAYS AS (CAST(substr(EndTime, 1, instr(EndTime, ':') - 1) AS INTEGER) * 60
+                                                      + CAST(substr(EndTime, instr(EndTime, ':') + 1) AS INTEGER)) VIRTUAL,
+                FOREIGN KEY (SubjectID) REFERENCES subjects(SubjectID) ON DELETE CASCADE
+            )""" + STRICT_SQL
+
+STUDY_SESSIONS_SQL = """CREATE TABLE IF NOT EXISTS {name} (
+                SessionID INTEGER PRIMARY KEY AUTOINCREMENT,
+                TaskID INTEGER NOT NULL,
+                DueDate TEXT NOT NULL,             -- deadline (or repeat date) the session works towards
+                SessionDate TEXT NOT NULL,         -- YYYY-MM-DD
+                StartTime TEXT NOT NULL,           -- 'HH:MM'
+                EndTime TEXT NOT NULL,             -- 'HH:MM'
+                FOREIGN KEY (TaskID) REFERENCES tasks(TaskID) ON DELETE CASCADE
+            )""" + STRICT_SQL
+
+INDEXES_SQL = [
+    "CREATE INDEX IF NOT EXISTS idx_tasks_deadline ON tasks(Deadline)",
+    "CREATE INDEX IF NOT EXISTS idx_tasks_subject ON tasks(SubjectID)",
+    "CREATE INDEX IF NOT EXISTS idx_schedule_day ON schedule(Day, StartMinute, EndMinute)",
+    "CREATE INDEX IF NOT EXISTS idx_schedule_subject ON schedule(SubjectID)",
+    "CREATE INDEX IF NOT EXISTS idx_study_sessions_date ON study_sessions(SessionDate, StartTime)",
+    "CREATE INDEX IF NOT EXISTS idx_study_sessions_task ON study_sessions(TaskID)",
+]
+
+# Compatibility views - tasks and schedule in their text-keyed v5 column layout, for reports, the archive,
+# cross-term queries and hand-written SQL
+COMPAT_VIEWS_SQL = [
+    """CREATE VIEW IF NOT EXISTS task_details AS
+            SELECT t.TaskID, s.SubjectCode, t.TaskName, t.Deadline, p.Name AS Priority, st.Name AS Status,
+                   t.Recurrence, t.EffortMinutes
+            FROM tasks t
+            JOIN subjects s ON s.SubjectID = t.SubjectID
+            LEFT JOIN priorities p ON p.PriorityID = t.PriorityID
+            LEFT JOIN statuses st ON st.StatusID = t.StatusID""",
+    """CREATE VIEW IF NOT EXISTS schedule_details AS
+            SELECT c.ScheduleID, s.SubjectCode, c.Day, c.StartTime, c.EndTime, c.Room,
+                   c.TermStart, c.TermEnd, c.Recurrence, c.StartMinute, c.EndMinute
+            FROM schedule c
+            JOIN subjects s ON s.SubjectID = c.SubjectID""",
+]
+
+# Text-keyed layout of schema versions 4-5 - migrate_v4 / migrate_v5 build it, bench-schema compares against it
+SUBJECTS_V5_SQL = """CREATE TABLE IF NOT EXISTS subjects (
+                SubjectCode TEXT PRIMARY KEY,
+                Name TEXT NOT NULL,
+                Instructor TEXT,
+                Units INTEGER,
+                Goals TEXT
+            )"""
+
+TASKS_V5_SQL = """CREATE TABLE IF NOT EXISTS {name} (
+                TaskID INTEGER PRIMARY KEY AUTOINCREMENT,
+                SubjectCode TEXT NOT NULL,
+                TaskName TEXT NOT NULL,
+                Deadline TEXT,
+                Priority TEXT,
+                Status TEXT,
+                Recurrence TEXT,
+                EffortMinutes INTEGER,
+                FOREIGN KEY (SubjectCode) REFERENCES subjects(SubjectCode) ON DELETE CASCADE ON UPDATE CASCADE
+            )"""
+
+SCHEDULE_V5_SQL = """CREATE TABLE IF NOT EXISTS {name} (
+                ScheduleID INTEGER PRIMARY KEY AUTOINCREMENT,
+                SubjectCode TEXT NOT NULL,
+                Day TEXT NOT NULL,
+                StartTime TEXT NOT NULL,
+                EndTime TEXT NOT NULL,
+                Room TEXT,
+                TermStart TEXT,
+                TermEnd TEXT,
+                Recurrence TEXT,
+                StartMinute INTEGER GENERATED ALWAYS AS (CAST(substr(StartTime, 1, instr(StartTime, ':') - 1) AS INTEGER) * 60
+                                                        + CAST(substr(StartTime, instr(StartTime, ':') + 1) AS INTEGER)) VIRTUAL,
+                EndMinute INTEGER GENERATED ALWAYS AS (CAST(substr(EndTime, 1, instr(EndTime, ':') - 1) AS INTEGER) * 60
+                                                      + CAST(substr(EndTime, instr(EndTime, ':') + 1) AS INTEGER)) VIRTUAL,
+                FOREIGN KEY (SubjectCode) REFERENCES subjects(SubjectCode) ON DELETE CASCADE ON UPDATE CASCADE
+            )"""
+
+INDEXES_V5_SQL = [
+    "CREATE INDEX IF NOT EXISTS idx_tasks_deadline ON tasks(Deadline)",
+    "CREATE INDEX IF NOT EXISTS idx_tasks_subject ON tasks(SubjectCode)",
+    "CREATE INDEX IF NOT EXISTS idx_schedule_day ON schedule(Day, StartMinute, EndMinute)",
+    "CREATE INDEX IF NOT EXISTS idx_schedule_subject ON schedule(SubjectCode)",
+]
+
+# Synchronised columns per table (primary keys excluded - rows are matched by rowid / sync key).
+# These are the logical, text-valued columns; the change log and sync bundles always use them.
+TABLE_COLUMNS = {
+    'subjects': ['SubjectCode', 'Name', 'Instructor', 'Units', 'Goals'],
+    'tasks': ['SubjectCode', 'TaskName', 'Deadline', 'Priority', 'Status', 'Recurrence', 'EffortMinutes'],
+    'schedule': ['SubjectCode', 'Day', 'StartTime', 'EndTime', 'Room', 'TermStart', 'TermEnd', 'Recurrence'],
+}
+SYNC_BUNDLE_FORMAT = 'classify-sync/1'
+
+# TABLE_COLUMNS values that tasks and schedule store as integer keys: column -> (key column, lookup table, text column)
+CODED_COLUMNS = {
+    'SubjectCode': ('SubjectID', 'subjects', 'SubjectCode'),
+    'Priority': ('PriorityID', 'priorities', 'Name'),
+    'Status': ('StatusID', 'statuses', 'Name'),
+}
+# ...and the columns as stored
+STORED_COLUMNS = {table: [CODED_COLUMNS[c][0] if table != 'subjects' and c in CODED_COLUMNS else c for c in columns]
+                  for table, columns in TABLE_COLUMNS.items()}
+
+# Undo / redo - TEMP triggers on the write connection record the inverse SQL of every change to these columns
+UNDO_TABLES = {**STORED_COLUMNS, 'study_sessions': ['TaskID', 'DueDate', 'SessionDate', 'StartTime', 'EndTime']}
+UNDO_LIMIT = 100                         # write transactions that can be undone; older ones are forgotten
+
+# External change detection - how often PRAGMA data_version is checked while the GUI runs
+CHANGE_POLL_MS = 2000
+
+# View-model for the task lists - display values are computed by SQLite so the widgets just insert rows.
+# Columns: 0 TaskID, 1 subject label, 2 task label, 3 Deadline, 4 Priority, 5 Status,
+#          6 colour tag, 7 overdue flag, 8 priority rank (2 = High), 9 Recurrence, then {todo}: 10 to-do card text
+TASK_VIEW_SQL = f"""SELECT t.TaskID,
+                          s.SubjectCode || ' - ' || s.Name,
+                          CASE WHEN t.Recurrence IS NULL THEN t.TaskName ELSE '🔁 ' || t.TaskName END,
+                          t.Deadline, p.Name, st.Name,
+                          CASE WHEN t.StatusID = {STATUS_IDS['Completed']} THEN 'completed'
+                               WHEN t.Deadline < :today THEN 'overdue'
+                               WHEN t.PriorityID = {PRIORITY_IDS['High']} THEN 'high'
+                               WHEN t.PriorityID = {PRIORITY_IDS['Medium']} THEN 'medium'
+                               ELSE 'low' END,
+                          t.StatusID IS NOT {STATUS_IDS['Completed']} AND COALESCE(t.Deadline < :today, 0),
+                          {PRIORITY_RANK_SQL},
+                          t.Recurrence{{todo}}
+                   FROM tasks t
+                   JOIN subjects s ON s.SubjectID = t.SubjectID
+                   LEFT JOIN priorities p ON p.PriorityID = t.PriorityID
+                   LEFT JOIN statuses st ON st.StatusID = t.StatusID"""
+TASK_TODO_TEXT_SQL = f""",
+                          CASE t.StatusID WHEN {STATUS_IDS['Completed']} THEN '✅' WHEN {STATUS_IDS['In Progress']} THEN '⏳' ELSE '📝' END
+                              || ' ' || t.TaskName || char(10) || '   📚 ' || s.Name || ' (' || s.SubjectCode || ')'"""
+
+# Bulk task actions - selected TaskIDs are bound per statement in chunks of this size, all in one transaction
+TASK_BULK_CHUNK = 500
+
+# Type-ahead subject picker - matches listed per keystroke
+SUBJECT_PICKER_LIMIT = 30
+
+# View refreshes after writes are debounced so a burst of saves repaints each view once
+REFRESH_DEBOUNCE_MS = 60
+REFRESH_MAX_WAIT_MS = 500                # a steady stream of writes still repaints at least this often
+
+# Tables each dashboard card reads, so only the cards touched by a change are rebuilt
+DASHBOARD_CARD_TABLES = {
+    'get_todays_classes_content': {'schedule', 'subjects'},
+    'get_todays_todos_content': {'tasks', 'subjects'},
+    'get_subjects_goals_content': {'subjects'},
+    'get_calendar_content': {'tasks'},
+}
+
+# Dashboard snapshot - the dashboard's data is saved on exit so the next start paints before the database opens
+DASHBOARD_SNAPSHOT_SUFFIX = '.dashboard.json'     # next to the database, e.g. ClassIFY.dashboard.json
+DASHBOARD_SNAPSHOT_FORMAT = 2            # 2: to-dos are TASK_VIEW_SQL rows
+DASHBOARD_MARKER_DAYS = 42               # deadline markers cover the six calendar weeks from the 1st
+
+# Registered reports - name -> (Database method, column headings); used by the Records page and batch runs
+REPORTS = {
+    'All Subjects with Tasks': ('get_all_subjects_with_tasks', ('SubjectCode', 'Name', 'Instructor', 'Units', 'Tasks')),
+    'Upcoming Tasks': ('get_upcoming_tasks', ('TaskName', 'Deadline', 'Priority', 'Status', 'SubjectCode', 'Name')),
+    'Tasks Today': ('get_tasks_today', ('TaskName', 'Deadline', 'Priority', 'Status', 'SubjectCode', 'Name')),
+    'Completed Tasks': ('get_completed_tasks', ('TaskName', 'Deadline', 'Priority', 'Status', 'SubjectCode', 'Name')),
+    'Missing Tasks': ('get_missing_tasks', ('TaskName', 'Deadline', 'Priority', 'Status', 'SubjectCode', 'Name')),
+    'Schedule for Today': ('get_schedule_for_today', ('SubjectCode', 'Name', 'StartTime', 'EndTime', 'Room')),
+    'All Subjects Ever Taken': ('get_subjects_ever_taken', ('SubjectCode', 'Name', 'Instructor', 'Units', 'Terms', 'Tasks')),
+    'Completion History': ('get_completion_history', ('Term', 'From', 'To', 'Subjects', 'Tasks', 'Completed', 'Completion')),
+}
+REPORT_MANIFEST = 'manifest.json'
+
+# Archive tier - old tasks move to archive/<database name> next to the database file
+ARCHIVE_DIR_NAME = 'archive'
+ARCHIVE_AFTER_DAYS = 90                  # completed tasks due longer ago than this are archived
+ARCHIVE_REPORTS = {'All Subjects with Tasks', 'Completed Tasks', 'Missing Tasks'}   # can include archived tasks
+ARCHIVE_TABLES_SQL = [
+    """CREATE TABLE IF NOT EXISTS archive.subjects (
+                SubjectCode TEXT PRIMARY KEY,      -- snapshot taken when its tasks were archived
+                Name TEXT NOT NULL,
+                Instructor TEXT,
+                Units INTEGER,
+                Goals TEXT
+            )""",
+    """CREATE TABLE IF NOT EXISTS archive.tasks (
+                TaskID INTEGER PRIMARY KEY,        -- same TaskID it had in the live table
+                SubjectCode TEXT NOT NULL,
+                TaskName TEXT NOT NULL,
+                Deadline TEXT,
+                Priority TEXT,
+                Status TEXT,
+                Recurrence TEXT,
+                EffortMinutes INTEGER,
+                ArchivedAt TEXT NOT NULL           -- local time, YYYY-MM-DD HH:MM:SS
+            )""",
+    "CREATE INDEX IF NOT EXISTS archive.idx_archive_tasks_subject ON tasks(SubjectCode)",
+]
+# Past-term databases - registered in the primary database, ATTACHed read-only only for cross-term reports
+TERM_CURRENT_LABEL = 'Current'
+TERM_DATABASES_SQL = """CREATE TABLE IF NOT EXISTS term_databases (
+                Label TEXT PRIMARY KEY,            -- e.g. '2024-2025 1st Sem'
+                Path TEXT NOT NULL,                -- absolute path of that term's ClassIFY database
+                AddedAt TEXT NOT NULL
             )"""
+
+# Temp views on the read connection - live rows first, archived rows the live tables no longer hold
+ARCHIVE_VIEWS_SQL = [
+    """CREATE TEMP VIEW IF NOT EXISTS all_tasks AS
+            SELECT TaskID, SubjectCode, TaskName, Deadline, Priority, Status, Recurrence, EffortMinutes, 0 AS Archived
+            FROM main.task_details
+            UNION ALL
+            SELECT TaskID, SubjectCode, TaskName, Deadline, Priority, Status, Recurrence, EffortMinutes, 1
+            FROM archive.tasks WHERE TaskID NOT IN (SELECT TaskID FROM main.tasks)""",
+    """CREATE TEMP VIEW IF NOT EXISTS all_subjects AS
+            SELECT SubjectCode, Name, Instructor, Units, Goals FROM main.subjects
+            UNION ALL
+            SELECT SubjectCode, Name, Instructor, Units, Goals
+            FROM archive.subjects WHERE SubjectCode NOT IN (SELECT SubjectCode FROM main.subjects)""",
+]
+
+
+_calendar_class = None                   # tkcalendar.Calendar, False when not installed, None until probed
+
+
+def calendar_class():
+    """tkcalendar's Calendar widget, or None when it isn't installed (probed once per run)"""
+    global _calendar_class
+    if _calendar_class is None:
+        try:
+            from tkcalendar import Calendar
+            _calendar_class = Calendar
+        except ImportError:
+            _calendar_class = False
+    return _calendar_class or None
+
+
+_numpy_module = None                     # numpy, False when not installed, None until probed
+
+
+def numpy_module():
+    """numpy if it is installed, else None (probed once per run)"""
+    global _numpy_module
+    if _numpy_module is None:
+        try:
+            import numpy
+            _numpy_module = numpy
+        except ImportError:
+            _numpy_module = False
+    return _numpy_module or None
+
+
+def readonly_uri(path):
+    """Build a read-only SQLite URI for a file path (handles spaces and Windows paths)"""
+    from pathlib import Path
+    return Path(path).absolute().as_uri() + '?mode=ro'
+
+
+def archive_path_for(db_path):
+    """Archive file for a database: archive/<same name> in the database's folder (None for :memory:)"""
+    if db_path == ':memory:':
+        return None
+    folder, name = os.path.split(os.path.abspath(db_path))
+    return os.path.join(folder, ARCHIVE_DIR_NAME, name)
+
+
+def replica_home(db_path):
+    """'<host>:<absolute path>' - where a database file lives; a copy elsewhere gets a new replica ID"""
+    import socket
+    return f"{socket.gethostname()}:{os.path.abspath(db_path)}"
+
+
+def stored_column(table, column):
+    """Column that holds a TABLE_COLUMNS value - the integer key for coded columns of tasks / schedule"""
+    return CODED_COLUMNS[column][0] if table != 'subjects' and column in CODED_COLUMNS else column
+
+
+def insert_sql(table, columns):
+    """INSERT binding TABLE_COLUMNS values in `columns` order - coded text is looked up as its key"""
+    return (f"INSERT INTO {table} ({', '.join(stored_column(table, c) for c in columns)}) "
+            f"VALUES ({', '.join(stored_value_sql(table, c) for c in columns)})")
+
+
+def update_sql(table, columns):
+    """UPDATE ... SET binding TABLE_COLUMNS values in `columns` order (the caller adds the WHERE)"""
+    return f"UPDATE {table} SET " + ', '.join(f"{stored_column(table, c)} = {stored_value_sql(table, c)}" for c in columns)
+
+
+def stored_value_sql(table, column):
+    """Placeholder that binds a TABLE_COLUMNS value for INSERT / UPDATE - coded text is stored as its key"""
+    if stored_column(table, column) == column:
+        return '?'
+    key, lookup, text = CODED_COLUMNS[column]
+    return f"(SELECT {key} FROM {lookup} WHERE {text} = ?)"
+
+
+def logical_value_sql(table, column, ref):
+    """Expression for a TABLE_COLUMNS value of row `ref` (NEW, a table name or alias) - coded keys read back as text"""
+    if stored_column(table, column) == column:
+        return f"{ref}.{column}"
+    key, lookup, text = CODED_COLUMNS[column]
+    return f"(SELECT {text} FROM {lookup} WHERE {key} = {ref}.{key})"
+
+
+def register_codes(conn, priority=None, status=None):
+    """Give Priority / Status names that were never saved before a code of their own (inside the write)"""
+    for lookup, name in (('priorities', priority), ('statuses', status)):
+        if name is not None:
+            conn.execute(f"INSERT OR IGNORE INTO {lookup} (Name) VALUES (?)", (name,))
+
+
+class RecurrenceRule: # Repeat rule for tasks and schedule entries, stored as text like 'FREQ=WEEKLY;INTERVAL=2;UNTIL=2025-12-20;EXDATE=2025-11-01'
+
+    STEP_DAYS = {'DAILY': 1, 'WEEKLY': 7}
+
+    def __init__(self, freq='WEEKLY', interval=1, until=None, exceptions=()):
+        if freq not in self.STEP_DAYS:
+            raise ValueError(f"Unknown repeat frequency: {freq}")
+        if interval < 1:
+            raise ValueError("Repeat interval must be at least 1")
+        self.freq = freq
+        self.interval = interval
+        self.until = until                          # date or None
+        self.exceptions = frozenset(exceptions)     # dates that are skipped
+
+    @classmethod
+    def parse(cls, text):
+        """Rule from its stored text - None for NULL/empty (does not repeat)"""
+        if not text:
+            return None
+        parts = dict(part.split('=', 1) for part in text.split(';') if '=' in part)
+        until = parts.get('UNTIL')
+        return cls(freq=parts.get('FREQ', 'WEEKLY'),
+                   interval=int(parts.get('INTERVAL', 1)),
+                   until=date.fromisoformat(until) if until else None,
+                   exceptions=[date.fromisoformat(d) for d in parts.get('EXDATE', '').split(',') if d])
+
+    def __str__(self):
+        parts = [f"FREQ={self.freq}", f"INTERVAL={self.interval}"]
+        if self.until:
+            parts.append(f"UNTIL={self.until.isoformat()}")
+        if self.exceptions:
+            parts.append("EXDATE=" + ','.join(d.isoformat() for d in sorted(self.exceptions)))
+        return ';'.join(parts)
+
+    @property
+    def step(self):
+        return timedelta(days=self.STEP_DAYS[self.freq] * self.interval)
+
+    def occurrences(self, anchor, start, end):
+        """Lazily yield the dates in [start, end] on which an item anchored at `anchor` occurs"""
+        last = min(end, self.until) if self.until else end
+        if anchor > last:
+            return
+        step = self.step
+        current = anchor
+        if current < start:
+            # Jump straight to the first occurrence inside the window
+            skipped = -(-(start - anchor).days // step.days)
+            current = anchor + step * skipped
+        while current <= last:
+            if current not in self.exceptions:
+                yield current
+            current += step
+
+    def ended_on(self, anchor, today):
+        """Last occurrence before `today` if the series has ended by then (UNTIL passed) - None while it still runs"""
+        if self.until is None or next(self.occurrences(anchor, today, self.until), None) is not None:
+            return None
+        last = min(self.until, today - timedelta(days=1))
+        # Only the last few steps can hold the final occurrence, even with exceptions in between
+        window = max(anchor, last - self.step * (len(self.exceptions) + 1))
+        past = list(self.occurrences(anchor, window, last))
+        return past[-1] if past else None
+
+def is_busy_error(error):
+    """True for SQLite's 'database is locked' / 'database table is locked' errors"""
+    code = getattr(error, 'sqlite_errorcode', None)      # Python 3.11+
+    if code is not None:
+        return code & 0xff in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+    return 'locked' in str(error) or 'busy' in str(error)
+
+
+class DatabaseBusyError(sqlite3.OperationalError): # Another writer kept the database locked through every retry
+    pass
+
+
+class Database: # Responsible for handling all database operations
+    
+    def __init__(self, db_path='ClassIFY.db', seed=True, write_files=True, readonly=False,
+                 check_same_thread=True): # ClassIFY.db is created and connected automatically when the program runs
+        self.db_path = db_path
+        self.check_same_thread = check_same_thread   # False: opened on a worker thread, then handed to the GUI
+        self.seed = seed                # student databases (--student) start empty
+        self.write_files = write_files
+        self.readonly = readonly
+        self.write_retries = 0          # busy retries so far (reported by stress-writes)
+        self.undo_log = None            # UndoLog once the database is set up (never for readonly)
+        self.conn = None                # primary connection - all writes
+        self.read_conn = None           # read-only connection for listings and reports
+        if readonly:
+            self.open_readonly()
+        else:
+            self.init_database()
+    
+    def open_readonly(self):
+        """Connect read-only for reporting - no schema setup, seeding or file writes"""
+        if not os.path.exists(self.db_path):
+            raise FileNotFoundError(f"Database not found: {self.db_path}")
+        self.conn = sqlite3.connect(readonly_uri(self.db_path), uri=True, isolation_level=None,
+                                    check_same_thread=self.check_same_thread)
+        self.conn.execute("PRAGMA query_only = ON")
+        self.read_conn = self.conn
+        
+    def init_database(self):
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=self.check_same_thread) # Establish the actual connection between the GUI and the database
+        self.conn.execute(f"PRAGMA busy_timeout = {DB_BUSY_TIMEOUT_MS}")
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        if self.conn.execute("PRAGMA page_count").fetchone()[0] == 0:
+            # Only possible on a new file - older files switch on their first maintenance run
+            self.conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        # WAL lets the read connection keep a consistent snapshot while saves commit on the primary
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.create_tables()
+        # Startup writes take the lock like any save - another window may be writing right now
+        self.write(lambda conn: self.install_change_log())
+        if self.seed:
+            self.write(lambda conn: self.seed_data_if_empty())
+        # From here on every write transaction can be undone
+        self.undo_log = UndoLog(self)
+        if self.write_files:
+            self.write_schema_files()
+        self.open_read_connection()
+        print(f"✅ Database initialized: {self.db_path}")
+    
+    def open_read_connection(self):
+        """Second connection (mode=ro, query_only) used by every listing and report query"""
+        if self.db_path == ':memory:':
+            self.read_conn = self.conn      # a private in-memory database cannot be opened twice
+            return
+        # Autocommit: no implicit BEGIN can leave the connection pinned to an old snapshot
+        self.read_conn = sqlite3.connect(readonly_uri(self.db_path), uri=True, isolation_level=None,
+                                         check_same_thread=self.check_same_thread)
+        self.read_conn.execute(f"PRAGMA busy_timeout = {DB_BUSY_TIMEOUT_MS}")
+        self.read_conn.execute("PRAGMA query_only = ON")
+        
+    def create_tables(self):
+        """Create or migrate the schema in one write transaction - the lock is taken before the schema is looked
+        at, so two windows opening the same file at once cannot both create or migrate it"""
+        # Rebuilds drop and rename referenced tables; foreign_keys can only be switched outside a transaction
+        self.conn.execute("PRAGMA foreign_keys = OFF")
+        try:
+            self.write(lambda conn: self.create_schema())
+        finally:
+            self.conn.execute("PRAGMA foreign_keys = ON")
+    
+    def create_schema(self):
+        if self.conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='subjects'").fetchone():
+            # Existing database - bring an older schema up to date
+            self.migrate_schema()
+            self.create_views()
+            return
+        
+        self.create_lookup_tables()
+        tables = [
+            SUBJECTS_SQL.format(name='subjects'),
+            TASKS_SQL.format(name='tasks'),
+            SCHEDULE_SQL.format(name='schedule'),
+            STUDY_SESSIONS_SQL.format(name='study_sessions')
         ]
         
         for table_sql in tables:
-            self.cursor.execute(table_sql)
-        self.conn.commit()
-        
+            self.conn.execute(table_sql)
+        self.create_indexes()
+        self.create_views()
+        self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    
+    def create_lookup_tables(self):
+        """priorities / statuses holding the PRIORITY_IDS / STATUS_IDS codes"""
+        self.conn.execute(PRIORITIES_SQL)
+        self.conn.execute(STATUSES_SQL)
+        self.conn.executemany("INSERT OR IGNORE INTO priorities (PriorityID, Name) VALUES (?, ?)",
+                              ((code, name) for name, code in PRIORITY_IDS.items()))
+        self.conn.executemany("INSERT OR IGNORE INTO statuses (StatusID, Name) VALUES (?, ?)",
+                              ((code, name) for name, code in STATUS_IDS.items()))
+    
+    def create_views(self):
+        """The COMPAT_VIEWS_SQL views (rebuild_tables drops them)"""
+        for sql in COMPAT_VIEWS_SQL:
+            self.conn.execute(sql)
+    
+    def migrate_schema(self):
+        """Run the migrate_vN steps between the stored PRAGMA user_version and SCHEMA_VERSION"""
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        while version < SCHEMA_VERSION:
+            version += 1
+            print(f"🔧 Migrating database schema to version {version}...")
+            getattr(self, f"migrate_v{version}")()
+            self.conn.execute(f"PRAGMA user_version = {version}")
+    
+    def migrate_v1(self):
+        """Recurring tasks and term dates for schedule entries"""
+        self.conn.execute("ALTER TABLE tasks ADD COLUMN Recurrence TEXT")
+        self.conn.execute("ALTER TABLE schedule ADD COLUMN TermStart TEXT")
+        self.conn.execute("ALTER TABLE schedule ADD COLUMN TermEnd TEXT")
+        self.conn.execute("ALTER TABLE schedule ADD COLUMN Recurrence TEXT")
+    
+    def migrate_v2(self):
+        """Indexes for date and weekday lookups"""
+        # Later rebuilds replace these with the INDEXES_SQL definitions
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_deadline ON tasks(Deadline)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_schedule_day ON schedule(Day, StartTime)")
+    
+    def migrate_v3(self):
+        """Effort estimates and planned study sessions"""
+        self.conn.execute("ALTER TABLE tasks ADD COLUMN EffortMinutes INTEGER")
+        self.conn.execute(STUDY_SESSIONS_SQL.format(name='study_sessions'))
+        self.create_indexes([sql for sql in INDEXES_SQL if 'study_sessions' in sql])
+    
+    def migrate_v4(self):
+        """SubjectCode renames cascade to tasks and schedule (ON UPDATE CASCADE)"""
+        # SQLite cannot change a foreign key in place - rebuild both tables with the new definition
+        self.rebuild_tables({'tasks': TASKS_V5_SQL, 'schedule': SCHEDULE_V5_SQL}, INDEXES_V5_SQL)
+    
+    def migrate_v5(self):
+        """Schedule times as minutes after midnight (generated StartMinute / EndMinute) for now/next lookups"""
+        # Rebuilt rather than ALTERed so the table matches SCHEDULE_V5_SQL exactly; it only holds the weekly template
+        self.rebuild_tables({'schedule': SCHEDULE_V5_SQL}, INDEXES_V5_SQL)
+    
+    def migrate_v6(self):
+        """Compact STRICT tables - integer SubjectID / PriorityID / StatusID keys instead of repeated text"""
+        self.create_lookup_tables()
+        # Free-text names outside PRIORITY_IDS / STATUS_IDS keep their spelling under a code of their own
+        self.conn.execute("INSERT OR IGNORE INTO priorities (Name) SELECT DISTINCT Priority FROM tasks WHERE Priority IS NOT NULL")
+        self.conn.execute("INSERT OR IGNORE INTO statuses (Name) SELECT DISTINCT Status FROM tasks WHERE Status IS NOT NULL")
+        # subjects is rebuilt first: its rowid becomes SubjectID, which the tasks / schedule copies then look up
+        expressions = {'subjects': {'SubjectID': 'rowid', 'Units': 'CAST(Units AS INTEGER)'},
+                       'tasks': {'EffortMinutes': 'CAST(EffortMinutes AS INTEGER)'},
+                       'schedule': {}}
+        for table in ('tasks', 'schedule'):
+            for column in TABLE_COLUMNS[table]:
+                if column in CODED_COLUMNS:
+                    key, lookup, text = CODED_COLUMNS[column]
+                    expressions[table][key] = f"(SELECT {key} FROM {lookup} WHERE {lookup}.{text} = {table}.{column})"
+        self.rebuild_tables({'subjects': SUBJECTS_SQL, 'tasks': TASKS_SQL, 'schedule': SCHEDULE_SQL,
+                             'study_sessions': STUDY_SESSIONS_SQL}, INDEXES_SQL, expressions)
+    
+    def rebuild_tables(self, tables, indexes, expressions=None):
+        """Recreate tables from their {name: CREATE template}, keeping rows, IDs and the AUTOINCREMENT counter.
+        
+        Columns are copied by name; expressions ({table: {column: SQL over the old row}}) fill the others.
+        Runs inside create_tables' write transaction, with foreign_keys off so dropping the old tables cascades nowhere."""
+        # Views and change-log triggers that name a table would block renaming its copy into place;
+        # create_views and install_change_log recreate them
+        for kind, name in self.conn.execute("""SELECT type, name FROM sqlite_master
+                                               WHERE type = 'view' OR (type = 'trigger' AND name LIKE 'trg_%')""").fetchall():
+            self.conn.execute(f"DROP {kind.upper()} {name}")
+        for table, create_sql in tables.items():
+            rebuilt = f"{table}_rebuilt"
+            self.conn.execute(f"DROP TABLE IF EXISTS {rebuilt}")
+            self.conn.execute(create_sql.format(name=rebuilt))
+            # table_info leaves out generated columns, which are computed rather than copied
+            columns = [row[1] for row in self.conn.execute(f"PRAGMA table_info({rebuilt})")]
+            computed = (expressions or {}).get(table, {})
+            self.conn.execute(f"INSERT INTO {rebuilt} ({', '.join(columns)}) "
+                              f"SELECT {', '.join(computed.get(c, c) for c in columns)} FROM {table}")
+            # Keep the AUTOINCREMENT high-water mark so deleted IDs are never handed out again
+            sequence = self.conn.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)).fetchone()
+            self.conn.execute(f"DROP TABLE {table}")          # also drops its indexes and triggers
+            self.conn.execute(f"ALTER TABLE {rebuilt} RENAME TO {table}")
+            if sequence:
+                self.conn.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = ?", (sequence[0], table))
+        self.create_indexes(indexes)
+        if self.conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sync_state'").fetchone():
+            # Forget the trigger signature so install_change_log recreates the dropped triggers
+            self.conn.execute("DELETE FROM sync_state WHERE Key = 'trigger_sig'")
+        orphans = self.conn.execute("PRAGMA foreign_key_check").fetchall()
+        if orphans:
+            raise sqlite3.IntegrityError(f"{len(orphans)} row(s) reference a missing parent: {orphans[:5]}")
+    
+    def create_indexes(self, indexes=INDEXES_SQL):
+        """Indexes used by the reminder, today and calendar lookups, the subject joins and the delete cascades"""
+        for sql in indexes:
+            self.conn.execute(sql)
+        
+    def install_change_log(self):
+        """Create the append-only change log and the triggers that fill it"""
+        is_new_log = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='changelog'").fetchone() is None
+        
+        statements = [
+            """CREATE TABLE IF NOT EXISTS changelog (
+                Seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                TableName TEXT NOT NULL,
+                RowID INTEGER NOT NULL,            -- local rowid of the changed row
+                Op TEXT NOT NULL,                  -- 'I' insert, 'U' update, 'D' delete, 'M' archive move (local only)
+                Version INTEGER NOT NULL,          -- per-row version stamp (1, 2, 3...)
+                ChangedAt TEXT NOT NULL,           -- UTC, millisecond resolution
+                Origin TEXT NOT NULL,              -- replica that made the change
+                RowData TEXT                       -- JSON row after the change, NULL for deletes
+            )""",
+            "CREATE INDEX IF NOT EXISTS idx_changelog_row ON changelog(TableName, RowID)",
+            """CREATE TABLE IF NOT EXISTS sync_state (
+                Key TEXT PRIMARY KEY,              -- 'replica_id', 'replica_home', 'applying', 'trigger_sig', 'api_token'
+                Value TEXT
+            )""",
+            """CREATE TABLE IF NOT EXISTS sync_peers (
+                PeerID TEXT PRIMARY KEY,
+                LastSentSeq INTEGER NOT NULL DEFAULT 0,       -- our Seq the peer has acknowledged
+                LastReceivedSeq INTEGER NOT NULL DEFAULT 0    -- peer's Seq we have applied
+            )""",
+            """CREATE TABLE IF NOT EXISTS sync_map (
+                TableName TEXT NOT NULL,
+                SyncKey TEXT NOT NULL,             -- '<origin replica>:<rowid there>'
+                LocalRowID INTEGER NOT NULL,
+                PRIMARY KEY (TableName, SyncKey)
+            )""",
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_sync_map_local ON sync_map(TableName, LocalRowID)",
+        ]
+        for sql in statements:
+            self.conn.execute(sql)
+        
+        # A copied database file keeps the old replica_id - give the copy its own identity
+        home = replica_home(self.db_path)
+        state = dict(self.conn.execute("SELECT Key, Value FROM sync_state").fetchall())
+        if state.get('replica_home') != home or 'replica_id' not in state:
+            import uuid
+            self.conn.execute("INSERT OR REPLACE INTO sync_state VALUES ('replica_id', ?)", (uuid.uuid4().hex[:12],))
+            self.conn.execute("INSERT OR REPLACE INTO sync_state VALUES ('replica_home', ?)", (home,))
+        self.conn.execute("INSERT OR REPLACE INTO sync_state VALUES ('applying', '0')")
+        
+        # Triggers are generated from TABLE_COLUMNS - rebuild them only when the columns change
+        trigger_sql = self.change_trigger_sql()
+        signature = hashlib.sha1('\n'.join(trigger_sql).encode('utf-8')).hexdigest()
+        if state.get('trigger_sig') != signature:
+            for table in TABLE_COLUMNS:
+                for op in ('insert', 'update', 'delete', 'rename'):
+                    self.conn.execute(f"DROP TRIGGER IF EXISTS trg_{table}_log_{op}")
+            for sql in trigger_sql:
+                self.conn.execute(sql)
+            self.conn.execute("INSERT OR REPLACE INTO sync_state VALUES ('trigger_sig', ?)", (signature,))
+        
+        # Rows that existed before the change log get a baseline insert entry so they can be synced
+        if is_new_log:
+            for table in TABLE_COLUMNS:
+                self.conn.execute(
+                    f"""INSERT INTO changelog (TableName, RowID, Op, Version, ChangedAt, Origin, RowData)
+                        SELECT '{table}', rowid, 'I', 1, strftime('%Y-%m-%dT%H:%M:%fZ', 'now'),
+                               (SELECT Value FROM sync_state WHERE Key = 'replica_id'), {self.row_json_sql(table, table)}
+                        FROM {table}""")
+    
+    def change_trigger_sql(self):
+        """CREATE TRIGGER statements that append every row change to the change log"""
+        triggers = []
+        for table, columns in TABLE_COLUMNS.items():
+            for op, event, ref in (('insert', 'INSERT', 'NEW'), ('update', 'UPDATE', 'NEW'), ('delete', 'DELETE', 'OLD')):
+                row_data = 'NULL' if op == 'delete' else self.row_json_sql(table, 'NEW')
+                triggers.append(f"""CREATE TRIGGER trg_{table}_log_{op} AFTER {event} ON {table}
+                    WHEN (SELECT Value FROM sync_state WHERE Key = 'applying') = '0'
+                    BEGIN
+                        INSERT INTO changelog (TableName, RowID, Op, Version, ChangedAt, Origin, RowData)
+                        VALUES ('{table}', {ref}.rowid, '{op[0].upper()}',
+                                COALESCE((SELECT MAX(Version) FROM changelog
+                                          WHERE TableName = '{table}' AND RowID = {ref}.rowid), 0) + 1,
+                                strftime('%Y-%m-%dT%H:%M:%fZ', 'now'),
+                                (SELECT Value FROM sync_state WHERE Key = 'replica_id'),
+                                {row_data});
+                    END""")
+        # Children store the SubjectID, so a rename no longer rewrites them - log their new SubjectCode
+        # as an update each, the way the v5 ON UPDATE CASCADE did, so peers see the rows under the new code
+        renames = []
+        for table, columns in TABLE_COLUMNS.items():
+            if table != 'subjects' and 'SubjectCode' in columns:
+                renames.append(f"""INSERT INTO changelog (TableName, RowID, Op, Version, ChangedAt, Origin, RowData)
+                        SELECT '{table}', c.rowid, 'U',
+                               COALESCE((SELECT MAX(Version) FROM changelog
+                                         WHERE TableName = '{table}' AND RowID = c.rowid), 0) + 1,
+                               strftime('%Y-%m-%dT%H:%M:%fZ', 'now'),
+                               (SELECT Value FROM sync_state WHERE Key = 'replica_id'),
+                               {self.row_json_sql(table, 'c')}
+                        FROM {table} c WHERE c.SubjectID = NEW.SubjectID;""")
+        triggers.append(f"""CREATE TRIGGER trg_subjects_log_rename AFTER UPDATE OF SubjectCode ON subjects
+                    WHEN (SELECT Value FROM sync_state WHERE Key = 'applying') = '0'
+                         AND NEW.SubjectCode IS NOT OLD.SubjectCode
+                    BEGIN
+                        {' '.join(renames)}
+                    END""")
+        return triggers
+    
+    def row_json_sql(self, table, ref):
+        """json_object() of a row's TABLE_COLUMNS values - the change log's RowData"""
+        return 'json_object(' + ', '.join(f"'{c}', {logical_value_sql(table, c, ref)}" for c in TABLE_COLUMNS[table]) + ')'
+    
     def seed_data_if_empty(self):
-        self.cursor.execute("SELECT COUNT(*) FROM subjects")
-        subjects_count = self.cursor.fetchone()[0]
+        subjects_count = self.conn.execute("SELECT COUNT(*) FROM subjects").fetchone()[0]
         
         if subjects_count == 0:
             print("📝 Seeding database with sample data...")
@@ -73,7 +860,7 @@ class Database: # Responsible for handling all database operations
                 ('IT 212', 'Computer Networking 1', 'MACATANGAY, LLOYD H.', 3, 'Get CISCO NetAcad certification')
             ]
             
-            self.cursor.executemany(
+            self.conn.executemany(
                 "INSERT INTO subjects (SubjectCode, Name, Instructor, Units, Goals) VALUES (?, ?, ?, ?, ?)",
                 subjects
             )
@@ -86,8 +873,8 @@ class Database: # Responsible for handling all database operations
                 ('Phy 101', 'Successfully defend the research project in Physics and STS', '2025-12-04', 'High', 'Completed')
             ]
             
-            self.cursor.executemany(
-                "INSERT INTO tasks (SubjectCode, TaskName, Deadline, Priority, Status) VALUES (?, ?, ?, ?, ?)",
+            self.conn.executemany(
+                insert_sql('tasks', ['SubjectCode', 'TaskName', 'Deadline', 'Priority', 'Status']),
                 tasks
             )
             
@@ -105,12 +892,11 @@ class Database: # Responsible for handling all database operations
                 ('CpE 405', 'Sat', '07:00', '10:00', 'ROOM 103')
             ]
             
-            self.cursor.executemany(
-                "INSERT INTO schedule (SubjectCode, Day, StartTime, EndTime, Room) VALUES (?, ?, ?, ?, ?)",
+            self.conn.executemany(
+                insert_sql('schedule', ['SubjectCode', 'Day', 'StartTime', 'EndTime', 'Room']),
                 schedule
             )
             
-            self.conn.commit()
             print("✅ Sample data inserted successfully!")
         else:
             print("✅ Database already contains data")
@@ -121,32 +907,89 @@ class Database: # Responsible for handling all database operations
             tables_sql = """PRAGMA foreign_keys = ON;
 
 CREATE TABLE IF NOT EXISTS subjects (
-    SubjectCode TEXT PRIMARY KEY,       -- e.g. 'CS 212'
+    SubjectID INTEGER PRIMARY KEY,      -- compact key tasks and schedule refer to
+    SubjectCode TEXT NOT NULL UNIQUE,   -- e.g. 'CS 212'
     Name TEXT NOT NULL,
     Instructor TEXT,
     Units INTEGER,
     Goals TEXT   -- allow at least 100 characters
-);
+) STRICT;
+
+CREATE TABLE IF NOT EXISTS priorities (
+    PriorityID INTEGER PRIMARY KEY,
+    Name TEXT NOT NULL UNIQUE
+) STRICT;
+
+CREATE TABLE IF NOT EXISTS statuses (
+    StatusID INTEGER PRIMARY KEY,
+    Name TEXT NOT NULL UNIQUE
+) STRICT;
+
+INSERT OR IGNORE INTO priorities (PriorityID, Name) VALUES (0, 'Low'), (1, 'Medium'), (2, 'High');
+INSERT OR IGNORE INTO statuses (StatusID, Name) VALUES (0, 'Not Started'), (1, 'In Progress'), (2, 'Completed');
 
 CREATE TABLE IF NOT EXISTS tasks (
     TaskID INTEGER PRIMARY KEY AUTOINCREMENT,
-    SubjectCode TEXT NOT NULL,
+    SubjectID INTEGER NOT NULL,
     TaskName TEXT NOT NULL,
     Deadline TEXT,                   -- YYYY-MM-DD
-    Priority TEXT,                   -- Low / Medium / High
-    Status TEXT,                     -- Not Started / In Progress / Completed
-    FOREIGN KEY (SubjectCode) REFERENCES subjects(SubjectCode) ON DELETE CASCADE
-);
+    PriorityID INTEGER,              -- priorities: 0 Low, 1 Medium, 2 High
+    StatusID INTEGER,                -- statuses: 0 Not Started, 1 In Progress, 2 Completed
+    Recurrence TEXT,                 -- NULL or e.g. 'FREQ=WEEKLY;INTERVAL=1;UNTIL=2025-12-20'
+    EffortMinutes INTEGER,           -- estimated work, NULL = default for the priority
+    FOREIGN KEY (SubjectID) REFERENCES subjects(SubjectID) ON DELETE CASCADE,
+    FOREIGN KEY (PriorityID) REFERENCES priorities(PriorityID),
+    FOREIGN KEY (StatusID) REFERENCES statuses(StatusID)
+) STRICT;
 
 CREATE TABLE IF NOT EXISTS schedule (
     ScheduleID INTEGER PRIMARY KEY AUTOINCREMENT,
-    SubjectCode TEXT NOT NULL,
+    SubjectID INTEGER NOT NULL,
     Day TEXT NOT NULL,               -- 'Mon','Tue','Wed','Thu','Fri','Sat','Sun'
     StartTime TEXT NOT NULL,         -- 'HH:MM'
     EndTime TEXT NOT NULL,           -- 'HH:MM'
     Room TEXT,
-    FOREIGN KEY (SubjectCode) REFERENCES subjects(SubjectCode) ON DELETE CASCADE
-);
+    TermStart TEXT,                  -- YYYY-MM-DD, NULL = no start date
+    TermEnd TEXT,                    -- YYYY-MM-DD, NULL = no end date
+    Recurrence TEXT,                 -- NULL = every week, or e.g. 'FREQ=WEEKLY;INTERVAL=2'
+    StartMinute INTEGER GENERATED ALWAYS AS (CAST(substr(StartTime, 1, instr(StartTime, ':') - 1) AS INTEGER) * 60
+                                            + CAST(substr(StartTime, instr(StartTime, ':') + 1) AS INTEGER)) VIRTUAL,
+    EndMinute INTEGER GENERATED ALWAYS AS (CAST(substr(EndTime, 1, instr(EndTime, ':') - 1) AS INTEGER) * 60
+                                          + CAST(substr(EndTime, instr(EndTime, ':') + 1) AS INTEGER)) VIRTUAL,
+    FOREIGN KEY (SubjectID) REFERENCES subjects(SubjectID) ON DELETE CASCADE
+) STRICT;
+
+CREATE TABLE IF NOT EXISTS study_sessions (
+    SessionID INTEGER PRIMARY KEY AUTOINCREMENT,
+    TaskID INTEGER NOT NULL,
+    DueDate TEXT NOT NULL,           -- deadline (or repeat date) the session works towards
+    SessionDate TEXT NOT NULL,       -- YYYY-MM-DD
+    StartTime TEXT NOT NULL,         -- 'HH:MM'
+    EndTime TEXT NOT NULL,           -- 'HH:MM'
+    FOREIGN KEY (TaskID) REFERENCES tasks(TaskID) ON DELETE CASCADE
+) STRICT;
+
+CREATE INDEX IF NOT EXISTS idx_tasks_deadline ON tasks(Deadline);
+CREATE INDEX IF NOT EXISTS idx_tasks_subject ON tasks(SubjectID);
+CREATE INDEX IF NOT EXISTS idx_schedule_day ON schedule(Day, StartMinute, EndMinute);
+CREATE INDEX IF NOT EXISTS idx_schedule_subject ON schedule(SubjectID);
+CREATE INDEX IF NOT EXISTS idx_study_sessions_date ON study_sessions(SessionDate, StartTime);
+CREATE INDEX IF NOT EXISTS idx_study_sessions_task ON study_sessions(TaskID);
+
+-- Text-keyed views with the column layout tasks and schedule had before the compact schema
+CREATE VIEW IF NOT EXISTS task_details AS
+    SELECT t.TaskID, s.SubjectCode, t.TaskName, t.Deadline, p.Name AS Priority, st.Name AS Status,
+           t.Recurrence, t.EffortMinutes
+    FROM tasks t
+    JOIN subjects s ON s.SubjectID = t.SubjectID
+    LEFT JOIN priorities p ON p.PriorityID = t.PriorityID
+    LEFT JOIN statuses st ON st.StatusID = t.StatusID;
+
+CREATE VIEW IF NOT EXISTS schedule_details AS
+    SELECT c.ScheduleID, s.SubjectCode, c.Day, c.StartTime, c.EndTime, c.Room,
+           c.TermStart, c.TermEnd, c.Recurrence, c.StartMinute, c.EndMinute
+    FROM schedule c
+    JOIN subjects s ON s.SubjectID = c.SubjectID;
 """
             
             with open('ClassIFY_tables.sql', 'w', encoding='utf-8') as f:
@@ -163,16 +1006,22 @@ INSERT INTO subjects (SubjectCode, Name, Instructor, Units, Goals) VALUES
 ('CpE 405', 'Discrete Mathematics', 'BAGSIT, CHARLES CONRAD P.', 3, 'Learn more about logics with math!'),
 ('IT 212', 'Computer Networking 1', 'MACATANGAY, LLOYD H.', 3, 'Get CISCO NetAcad certification');
 
--- Tasks
-INSERT INTO tasks (SubjectCode, TaskName, Deadline, Priority, Status) VALUES
+-- Tasks (codes and names are looked up as their SubjectID / PriorityID / StatusID)
+INSERT INTO tasks (SubjectID, TaskName, Deadline, PriorityID, StatusID)
+SELECT s.SubjectID, v.column2, v.column3, p.PriorityID, st.StatusID FROM (VALUES
 ('CpE 405', 'Review for final exam', '2025-12-12', 'High', 'Not Started'),
 ('CS 211', 'Review for final exam', '2025-12-09', 'High', 'Not Started'),
 ('CS 211', 'Review for quiz', '2025-12-09', 'High', 'In Progress'),
 ('CS 212', 'Review for final exam \n and practice coding with assembly language', '2025-12-11', 'High', 'Not Started'),
-('Phy 101', 'Successfully defend the research project in Physics and STS', '2025-12-04', 'High', 'Completed');
+('Phy 101', 'Successfully defend the research project in Physics and STS', '2025-12-04', 'High', 'Completed')
+) v
+JOIN subjects s ON s.SubjectCode = v.column1
+JOIN priorities p ON p.Name = v.column4
+JOIN statuses st ON st.Name = v.column5;
 
 -- Schedule
-INSERT INTO schedule (SubjectCode, Day, StartTime, EndTime, Room) VALUES
+INSERT INTO schedule (SubjectID, Day, StartTime, EndTime, Room)
+SELECT s.SubjectID, v.column2, v.column3, v.column4, v.column5 FROM (VALUES
 ('Phy 101', 'Mon', '10:00', '13:00', 'ROOM 402'),
 ('GEd 109', 'Mon', '14:00', '17:00', 'ROOM 101'),
 ('CS 211', 'Tue', '07:00', '10:00', 'LAB 02'),
@@ -183,7 +1032,9 @@ INSERT INTO schedule (SubjectCode, Day, StartTime, EndTime, Room) VALUES
 ('IT 212', 'Thu', '14:00', '16:00', 'ONLINE'),
 ('CS 212', 'Thu', '11:00', '13:00', 'ONLINE'),
 ('CS 212', 'Fri', '07:00', '10:00', 'LAB 03'),
-('CpE 405', 'Sat', '07:00', '10:00', 'ROOM 103');
+('CpE 405', 'Sat', '07:00', '10:00', 'ROOM 103')
+) v
+JOIN subjects s ON s.SubjectCode = v.column1;
 """
             
             with open('ClassIFY_data.sql', 'w', encoding='utf-8') as f:
@@ -194,240 +1045,2546 @@ INSERT INTO schedule (SubjectCode, Day, StartTime, EndTime, Room) VALUES
         except Exception as e:
             print(f"⚠️ Could not write SQL files: {e}")
     
+    def write(self, work, undo=True):
+        """Run work(conn) as one write transaction and return its result.
+        
+        BEGIN IMMEDIATE takes the write lock before any work is done, so a second writer waits
+        (busy_timeout) instead of failing half-way; if the lock is still held the whole
+        transaction is retried with jittered exponential backoff, then DatabaseBusyError.
+        The transaction's changes become one undo step; undo=False leaves them out (sync, archive)."""
+        if self.conn.in_transaction:
+            return work(self.conn)          # part of a transaction the caller already opened
+        undo_log = self.undo_log
+        delay = WRITE_BACKOFF_SECONDS
+        for attempt in range(WRITE_RETRIES + 1):
+            try:
+                self.conn.execute("BEGIN IMMEDIATE")
+                try:
+                    step = None
+                    if undo_log is None:
+                        result = work(self.conn)
+                    elif undo:
+                        mark = undo_log.mark()
+                        result = work(self.conn)
+                        step = undo_log.take_step(mark)
+                    else:
+                        undo_log.set_recording(False)
+                        result = work(self.conn)
+                        undo_log.set_recording(True)
+                    self.conn.commit()
+                    if step:
+                        undo_log.push(step)
+                    return result
+                except BaseException:
+                    self.conn.rollback()
+                    raise
+            except sqlite3.OperationalError as e:
+                if not is_busy_error(e):
+                    raise
+                if attempt == WRITE_RETRIES:
+                    raise DatabaseBusyError(f"{e} - another ClassIFY window or script kept it busy "
+                                            f"through {WRITE_RETRIES + 1} attempts, please try again") from e
+                import random
+                self.write_retries += 1
+                # Jitter keeps writers that collided from retrying in lockstep
+                time.sleep(delay * random.uniform(0.5, 1.5))
+                delay = min(delay * 2, WRITE_BACKOFF_MAX_SECONDS)
+    
     def get_subjects(self):
         """Get all subjects"""
-        self.cursor.execute("SELECT * FROM subjects ORDER BY SubjectCode")
-        return self.cursor.fetchall()
+        return self.read_conn.execute(
+            "SELECT SubjectCode, Name, Instructor, Units, Goals FROM subjects ORDER BY SubjectCode").fetchall()
     
     def get_subject_by_code(self, subject_code):
         """Get subject by SubjectCode"""
-        self.cursor.execute("SELECT * FROM subjects WHERE SubjectCode = ?", (subject_code,))
-        return self.cursor.fetchone()
+        return self.read_conn.execute("SELECT SubjectCode, Name, Instructor, Units, Goals FROM subjects WHERE SubjectCode = ?",
+                                      (subject_code,)).fetchone()
     
     def add_subject(self, code, name, instructor, units, goals):
-        """Add a new subject using SubjectCode as primary key"""
-        self.cursor.execute(
+        """Add a new subject - SubjectCode is unique, SubjectID is assigned"""
+        self.write(lambda conn: conn.execute(
             "INSERT INTO subjects (SubjectCode, Name, Instructor, Units, Goals) VALUES (?, ?, ?, ?, ?)",
             (code, name, instructor, units, goals)
-        )
-        self.conn.commit()
+        ))
         return code
     
     def update_subject(self, old_code, new_code, name, instructor, units, goals):
-        """Update a subject - handles SubjectCode change"""
+        """Update a subject - tasks and schedule follow a SubjectCode change through its SubjectID"""
         try:
-            # If SubjectCode changed, update foreign keys first
-            if old_code != new_code:
-                # Update tasks
-                self.cursor.execute("UPDATE tasks SET SubjectCode = ? WHERE SubjectCode = ?", 
-                                  (new_code, old_code))
-                
-                # Update schedule
-                self.cursor.execute("UPDATE schedule SET SubjectCode = ? WHERE SubjectCode = ?", 
-                                  (new_code, old_code))
-            
-            self.cursor.execute(
+            # Only the subjects row changes; a clash with an existing code is refused by the UNIQUE constraint
+            self.write(lambda conn: conn.execute(
                 """UPDATE subjects SET SubjectCode=?, Name=?, Instructor=?, Units=?, Goals=?
                    WHERE SubjectCode=?""",
                 (new_code, name, instructor, units, goals, old_code)
-            )
-            self.conn.commit()
+            ))
             return True
         except sqlite3.IntegrityError:
             return False
     
-    def delete_subject(self, subject_code):
-        """Delete a subject (cascades to tasks and schedule via FK)"""
-        if messagebox.askyesno("Confirm Delete", 
-                              f"Delete subject '{subject_code}'?\n\nThis will delete ALL associated tasks and schedule entries!"):
-            self.cursor.execute("DELETE FROM subjects WHERE SubjectCode = ?", (subject_code,))
-            self.conn.commit()
+    def delete_subject(self, subject_code, confirm=True):
+        """Delete a subject (cascades to tasks and schedule via FK) - confirm=False skips the dialog (API)"""
+        if not confirm or messagebox.askyesno("Confirm Delete", 
+                              f"Delete subject '{subject_code}'?\n\nThis will delete ALL associated tasks and schedule entries!\n"
+                              "(Ctrl+Z brings them all back.)"):
+            self.write(lambda conn: conn.execute("DELETE FROM subjects WHERE SubjectCode = ?", (subject_code,)))
             return True
         return False
     
     def get_tasks(self, subject_code=None):
-        """Get tasks, optionally filtered by SubjectCode"""
+        """Get tasks, optionally filtered by SubjectCode (one row per task, repeats not expanded)"""
         if subject_code:
-            query = """SELECT t.*, s.Name FROM tasks t 
-                      JOIN subjects s ON t.SubjectCode = s.SubjectCode 
-                      WHERE t.SubjectCode = ? 
+            query = """SELECT t.TaskID, s.SubjectCode, t.TaskName, t.Deadline, p.Name, st.Name, s.Name, t.Recurrence
+                      FROM tasks t 
+                      JOIN subjects s ON s.SubjectID = t.SubjectID
+                      LEFT JOIN priorities p ON p.PriorityID = t.PriorityID
+                      LEFT JOIN statuses st ON st.StatusID = t.StatusID
+                      WHERE s.SubjectCode = ? 
+                      ORDER BY t.Deadline"""
+            return self.read_conn.execute(query, (subject_code,)).fetchall()
+        else:
+            query = """SELECT t.TaskID, s.SubjectCode, t.TaskName, t.Deadline, p.Name, st.Name, s.Name, t.Recurrence
+                      FROM tasks t 
+                      JOIN subjects s ON s.SubjectID = t.SubjectID
+                      LEFT JOIN priorities p ON p.PriorityID = t.PriorityID
+                      LEFT JOIN statuses st ON st.StatusID = t.StatusID
                       ORDER BY t.Deadline"""
-            self.cursor.execute(query, (subject_code,))
+            return self.read_conn.execute(query).fetchall()
+    
+    def get_task(self, task_id):
+        """Get one task by TaskID"""
+        return self.read_conn.execute(
+            """SELECT TaskID, SubjectCode, TaskName, Deadline, Priority, Status, Recurrence, EffortMinutes
+               FROM task_details WHERE TaskID = ?""", (task_id,)).fetchone()
+    
+    def iter_task_occurrences(self, start, end=None, subject_code=None, task_id=None):
+        """Yield (date, task row) for each task occurrence in [start, end], in date order.
+        
+        Repeating tasks are stored once and expanded lazily for the requested window only.
+        With end=None one-off tasks are unbounded and repeats stop after UPCOMING_HORIZON_DAYS.
+        The task row has the get_tasks() shape with Deadline set to the occurrence date,
+        followed by 8 priority rank (2 = High) and 9 StatusID."""
+        repeat_end = end or start + timedelta(days=UPCOMING_HORIZON_DAYS)
+        query = f"""SELECT t.TaskID, s.SubjectCode, t.TaskName, t.Deadline, p.Name, st.Name, s.Name, t.Recurrence,
+                          {PRIORITY_RANK_SQL}, t.StatusID
+                   FROM tasks t
+                   JOIN subjects s ON s.SubjectID = t.SubjectID
+                   LEFT JOIN priorities p ON p.PriorityID = t.PriorityID
+                   LEFT JOIN statuses st ON st.StatusID = t.StatusID
+                   WHERE ((t.Recurrence IS NULL AND t.Deadline >= ? AND t.Deadline <= ?)
+                          OR (t.Recurrence IS NOT NULL AND t.Deadline <= ?))"""
+        params = [start.isoformat(), end.isoformat() if end else '9999-12-31', repeat_end.isoformat()]
+        if subject_code:
+            query += " AND s.SubjectCode = ?"
+            params.append(subject_code)
+        if task_id is not None:
+            query += " AND t.TaskID = ?"
+            params.append(task_id)
+        rows = self.read_conn.execute(query, params).fetchall()
+        
+        def expand(row):
+            try:
+                anchor = date.fromisoformat(row[3])
+                rule = RecurrenceRule.parse(row[7])
+            except (TypeError, ValueError):
+                return    # missing or malformed deadline / rule
+            if rule is None:
+                yield anchor, row
+                return
+            for day in rule.occurrences(anchor, start, repeat_end):
+                yield day, row[:3] + (day.isoformat(),) + row[4:]
+        
+        return heapq.merge(*(expand(row) for row in rows), key=lambda item: item[0])
+    
+    def get_todays_tasks(self):
+        """Get tasks due today (including repeating tasks that occur today)"""
+        rows = sorted((row for _, row in self.iter_task_occurrences(date.today(), date.today())),
+                      key=lambda row: -row[8])
+        return [row[:6] + (row[1], row[6]) for row in rows]
+    
+    def get_deadline_markers(self, start, end):
+        """(YYYY-MM-DD, tasks due) for each day in [start, end] with at least one open task due"""
+        counts = {}
+        for day, task in self.iter_task_occurrences(start, end):
+            if task[5] != 'Completed':
+                counts[day.isoformat()] = counts.get(day.isoformat(), 0) + 1
+        return sorted(counts.items())
+    
+    def add_task(self, subject_code, task_name, deadline, priority, status, recurrence=None, effort_minutes=None):
+        """Add a new task - subject_code, priority and status are stored as their integer keys"""
+        def add(conn):
+            register_codes(conn, priority, status)
+            return conn.execute(insert_sql('tasks', TABLE_COLUMNS['tasks']),
+                                (subject_code, task_name, deadline, priority, status, recurrence, effort_minutes))
+        return self.write(add).lastrowid
+    
+    def update_task(self, task_id, subject_code, task_name, deadline, priority, status, recurrence=None,
+                    effort_minutes=None):
+        """Update a task using TaskID"""
+        def update(conn):
+            register_codes(conn, priority, status)
+            conn.execute(update_sql('tasks', TABLE_COLUMNS['tasks']) + " WHERE TaskID = ?",
+                         (subject_code, task_name, deadline, priority, status, recurrence, effort_minutes, task_id))
+        self.write(update)
+    
+    def delete_task(self, task_id):
+        """Delete a task by TaskID"""
+        self.write(lambda conn: conn.execute("DELETE FROM tasks WHERE TaskID = ?", (task_id,)))
+    
+    def get_task_rows(self, subject_code=None, task_ids=None, today=None):
+        """Display-ready TASK_VIEW_SQL rows for the tasks table, by deadline - all, one subject's or the given TaskIDs"""
+        today = today or date.today()
+        params = {'today': today.isoformat()}
+        if task_ids is None:
+            query = TASK_VIEW_SQL.format(todo='')
+            if subject_code:
+                query += " WHERE s.SubjectCode = :code"
+                params['code'] = subject_code
+            rows = self.read_conn.execute(query + " ORDER BY t.Deadline", params).fetchall()
+        else:
+            task_ids = list(task_ids)
+            rows = []
+            for start in range(0, len(task_ids), TASK_BULK_CHUNK):
+                chunk = task_ids[start:start + TASK_BULK_CHUNK]
+                params.update((f"id{n}", task_id) for n, task_id in enumerate(chunk))
+                rows += self.read_conn.execute(
+                    TASK_VIEW_SQL.format(todo='') + f" WHERE t.TaskID IN ({', '.join(f':id{n}' for n in range(len(chunk)))})",
+                    params).fetchall()
+        return [self.repeat_view_row(row, today) if row[9] is not None else row for row in rows]
+    
+    def repeat_view_row(self, row, today):
+        """A repeating task's TASK_VIEW_SQL row with the overdue flag / tag of its occurrences, not its anchor
+        date - it is only overdue once its series ended before today (the rule is not SQL)"""
+        try:
+            ended = RecurrenceRule.parse(row[9]).ended_on(date.fromisoformat(row[3]), today)
+        except (TypeError, ValueError):
+            return row      # missing or malformed deadline / rule
+        overdue = ended is not None and row[5] != 'Completed'
+        tag = 'completed' if row[5] == 'Completed' else 'overdue' if overdue else ('low', 'medium', 'high')[row[8]]
+        return row[:6] + (tag, int(overdue)) + row[8:]
+    
+    def get_todo_rows(self, today=None):
+        """TASK_VIEW_SQL rows (with the to-do card text) for the tasks that fall on today, High priority first.
+        
+        Only whether a repeating task occurs today is decided in Python (its rule is not SQL)."""
+        today = today or date.today()
+        rows = self.read_conn.execute(
+            TASK_VIEW_SQL.format(todo=TASK_TODO_TEXT_SQL) + """ WHERE (t.Recurrence IS NULL AND t.Deadline = :today)
+                                   OR (t.Recurrence IS NOT NULL AND t.Deadline <= :today)
+                                ORDER BY 9 DESC""", {'today': today.isoformat()}).fetchall()
+        todos = []
+        for row in rows:
+            if row[9] is not None:
+                try:
+                    anchor = date.fromisoformat(row[3])
+                    rule = RecurrenceRule.parse(row[9])
+                except (TypeError, ValueError):
+                    continue    # missing or malformed deadline / rule
+                days = rule.occurrences(anchor, today, today) if rule else [anchor] if anchor == today else []
+                if next(iter(days), None) is None:
+                    continue
+                row = self.repeat_view_row(row, today)
+            todos.append(row)
+        return todos
+    
+    def update_tasks(self, task_ids, status=None, priority=None, deadline=None, shift_days=None):
+        """Set Status / Priority / Deadline on many tasks at once, or move their deadlines by shift_days.
+        
+        One UPDATE ... WHERE TaskID IN (...) per TASK_BULK_CHUNK ids, all in a single transaction.
+        Returns the number of tasks changed."""
+        assignments, params = [], []
+        for column, value in (('Status', status), ('Priority', priority), ('Deadline', deadline)):
+            if value is not None:
+                assignments.append(f"{stored_column('tasks', column)} = {stored_value_sql('tasks', column)}")
+                params.append(value)
+        if shift_days:
+            assignments.append("Deadline = date(Deadline, ?)")
+            params.append(f"{shift_days:+d} days")
+        if not assignments:
+            return 0
+        return self._bulk_tasks(f"UPDATE tasks SET {', '.join(assignments)}", params, task_ids,
+                                lambda conn: register_codes(conn, priority, status))
+    
+    def delete_tasks(self, task_ids):
+        """Delete many tasks in one transaction - returns the number deleted"""
+        return self._bulk_tasks("DELETE FROM tasks", [], task_ids)
+    
+    def _bulk_tasks(self, statement, params, task_ids, prepare=None):
+        task_ids = list(task_ids)
+        
+        def run(conn):
+            if prepare:
+                prepare(conn)
+            changed = 0
+            for start in range(0, len(task_ids), TASK_BULK_CHUNK):
+                chunk = task_ids[start:start + TASK_BULK_CHUNK]
+                changed += conn.execute(f"{statement} WHERE TaskID IN ({','.join('?' * len(chunk))})",
+                                        params + chunk).rowcount
+            return changed
+        return self.write(run) if task_ids else 0
+    
+    def get_study_sessions(self, start, end=None):
+        """Planned study sessions in [start, end] - (SessionDate, StartTime, EndTime, TaskName, SubjectCode, DueDate)"""
+        return self.read_conn.execute(
+            """SELECT ss.SessionDate, ss.StartTime, ss.EndTime, t.TaskName, s.SubjectCode, ss.DueDate
+               FROM study_sessions ss
+               JOIN tasks t ON ss.TaskID = t.TaskID
+               JOIN subjects s ON s.SubjectID = t.SubjectID
+               WHERE ss.SessionDate BETWEEN ? AND ?
+               ORDER BY ss.SessionDate, ss.StartTime""",
+            (start.isoformat(), (end or start).isoformat())).fetchall()
+    
+    def get_schedule(self, day=None):
+        """Get the weekly schedule template, optionally filtered by day using SubjectCode as FK"""
+        if day:
+            query = """SELECT s.ScheduleID, subj.SubjectCode, s.Day, s.StartTime, s.EndTime, s.Room, subj.Name,
+                             s.TermStart, s.TermEnd, s.Recurrence, s.StartMinute, s.EndMinute
+                      FROM schedule s
+                      JOIN subjects subj ON subj.SubjectID = s.SubjectID
+                      WHERE s.Day = ? ORDER BY s.StartMinute"""
+            return self.read_conn.execute(query, (day,)).fetchall()
+        else:
+            query = """SELECT s.ScheduleID, subj.SubjectCode, s.Day, s.StartTime, s.EndTime, s.Room, subj.Name,
+                             s.TermStart, s.TermEnd, s.Recurrence, s.StartMinute, s.EndMinute
+                      FROM schedule s
+                      JOIN subjects subj ON subj.SubjectID = s.SubjectID
+                      ORDER BY 
+                      CASE s.Day 
+                          WHEN 'Mon' THEN 1
+                          WHEN 'Tue' THEN 2
+                          WHEN 'Wed' THEN 3
+                          WHEN 'Thu' THEN 4
+                          WHEN 'Fri' THEN 5
+                          WHEN 'Sat' THEN 6
+                          WHEN 'Sun' THEN 7
+                          ELSE 8
+                      END,
+                      s.StartMinute"""
+            return self.read_conn.execute(query).fetchall()
+    
+    def get_schedule_entry(self, schedule_id):
+        """One schedule entry by ScheduleID, in get_schedule's column order"""
+        return self.read_conn.execute(
+            """SELECT s.ScheduleID, subj.SubjectCode, s.Day, s.StartTime, s.EndTime, s.Room, subj.Name,
+                      s.TermStart, s.TermEnd, s.Recurrence, s.StartMinute, s.EndMinute
+               FROM schedule s
+               JOIN subjects subj ON subj.SubjectID = s.SubjectID
+               WHERE s.ScheduleID = ?""", (schedule_id,)).fetchone()
+    
+    def iter_schedule_occurrences(self, start, end, schedule_id=None):
+        """Yield (date, schedule row) for each class meeting in [start, end], ordered by date and start time.
+        
+        Entries repeat weekly on their Day within TermStart..TermEnd; a Recurrence rule can
+        change the interval (every N weeks) and list skipped dates. The row has the
+        get_schedule() shape."""
+        query = """SELECT s.ScheduleID, subj.SubjectCode, s.Day, s.StartTime, s.EndTime, s.Room, subj.Name,
+                          s.TermStart, s.TermEnd, s.Recurrence, s.StartMinute, s.EndMinute
+                   FROM schedule s
+                   JOIN subjects subj ON subj.SubjectID = s.SubjectID
+                   WHERE (s.TermStart IS NULL OR s.TermStart <= ?) AND (s.TermEnd IS NULL OR s.TermEnd >= ?)"""
+        params = [end.isoformat(), start.isoformat()]
+        if schedule_id is not None:
+            query += " AND s.ScheduleID = ?"
+            params.append(schedule_id)
+        rows = self.read_conn.execute(query, params).fetchall()
+        return heapq.merge(*(self.schedule_row_occurrences(row, start, end) for row in rows),
+                           key=lambda item: (item[0], item[1][10]))
+    
+    def schedule_row_occurrences(self, row, start, end):
+        """Yield (date, row) for the meetings of one get_schedule() row in [start, end]"""
+        try:
+            weekday = DAYS.index(row[2])
+            rule = RecurrenceRule.parse(row[9]) or RecurrenceRule('WEEKLY')
+            term_start = date.fromisoformat(row[7]) if row[7] else date(2000, 1, 3)  # a Monday
+            term_end = date.fromisoformat(row[8]) if row[8] else None
+        except ValueError:
+            return
+        anchor = term_start + timedelta(days=(weekday - term_start.weekday()) % 7)
+        until = min(d for d in (rule.until, term_end) if d) if (rule.until or term_end) else None
+        weekly = RecurrenceRule('WEEKLY', rule.interval, until, rule.exceptions)
+        for day in weekly.occurrences(anchor, start, end):
+            yield day, row
+    
+    def get_now_and_next(self, now=None):
+        """(class in progress or None, (date, next class) or None) at now - rows have the get_schedule() shape.
+        
+        Today's classes come from idx_schedule_day (Day, StartMinute, EndMinute): SQLite seeks on Day only,
+        then walks that day's few entries in StartMinute order (no sort) and drops the finished ones by the
+        EndMinute kept in the index. Later days are only expanded once today's classes are over."""
+        now = now or datetime.now()
+        today = now.date()
+        minute = now.hour * 60 + now.minute
+        rows = self.read_conn.execute(
+            """SELECT s.ScheduleID, subj.SubjectCode, s.Day, s.StartTime, s.EndTime, s.Room, subj.Name,
+                      s.TermStart, s.TermEnd, s.Recurrence, s.StartMinute, s.EndMinute
+               FROM schedule s
+               JOIN subjects subj ON subj.SubjectID = s.SubjectID
+               WHERE s.Day = ? AND s.EndMinute > ?
+               ORDER BY s.StartMinute""", (DAYS[today.weekday()], minute)).fetchall()
+        current = None
+        for row in rows:
+            if next(self.schedule_row_occurrences(row, today, today), None) is None:
+                continue                    # outside its term, an off week or a skipped date
+            if row[10] > minute:
+                return current, (today, row)
+            current = current or row
+        tomorrow = today + timedelta(days=1)
+        return current, next(self.iter_schedule_occurrences(
+            tomorrow, tomorrow + timedelta(days=NOW_NEXT_LOOKAHEAD_DAYS - 1)), None)
+    
+    def get_todays_schedule(self):
+        """Get today's classes (respects term dates, repeat interval and skipped dates)"""
+        today = date.today()
+        return [row for _, row in self.iter_schedule_occurrences(today, today)]
+    
+    def add_schedule(self, subject_code, day, start_time, end_time, room,
+                     term_start=None, term_end=None, recurrence=None):
+        """Add a new schedule entry - subject_code is stored as its SubjectID"""
+        cur = self.write(lambda conn: conn.execute(
+            insert_sql('schedule', TABLE_COLUMNS['schedule']),
+            (subject_code, day, start_time, end_time, room, term_start, term_end, recurrence)
+        ))
+        return cur.lastrowid
+    
+    def update_schedule(self, schedule_id, subject_code, day, start_time, end_time, room,
+                        term_start=None, term_end=None, recurrence=None):
+        """Update a schedule entry using ScheduleID"""
+        self.write(lambda conn: conn.execute(
+            update_sql('schedule', TABLE_COLUMNS['schedule']) + " WHERE ScheduleID = ?",
+            (subject_code, day, start_time, end_time, room, term_start, term_end, recurrence, schedule_id)
+        ))
+    
+    def delete_schedule(self, schedule_id):
+        """Delete a schedule entry by ScheduleID"""
+        self.write(lambda conn: conn.execute("DELETE FROM schedule WHERE ScheduleID = ?", (schedule_id,)))
+    
+    def attach_archive(self):
+        """ATTACH the archive to the read connection with the all_tasks / all_subjects views - False if none exists"""
+        if any(row[1] == 'archive' for row in self.read_conn.execute("PRAGMA database_list")):
+            return True
+        path = archive_path_for(self.db_path)
+        if not path or not os.path.exists(path):
+            return False
+        self.read_conn.execute("ATTACH DATABASE ? AS archive", (readonly_uri(path),))
+        # query_only also refuses TEMP views; mode=ro keeps both files read-only meanwhile
+        self.read_conn.execute("PRAGMA query_only = OFF")
+        try:
+            for sql in ARCHIVE_VIEWS_SQL:
+                self.read_conn.execute(sql)
+        finally:
+            self.read_conn.execute("PRAGMA query_only = ON")
+        return True
+    
+    def report_sources(self, include_archive):
+        """(tasks, subjects) sources for a report - the text-keyed task_details view, or the archive UNION views
+        when asked for and present"""
+        if include_archive and self.attach_archive():
+            return 'all_tasks', 'all_subjects'
+        return 'task_details', 'subjects'
+    
+    # REPORT QUERIES - Updated to match requested filters
+    def get_all_subjects_with_tasks(self, include_archive=False):
+        """Report: All subjects with their tasks"""
+        tasks, subjects = self.report_sources(include_archive)
+        query = f"""SELECT s.SubjectCode, s.Name, s.Instructor, s.Units,
+                  GROUP_CONCAT(t.TaskName || ' (Due: ' || t.Deadline || ', ' || t.Status || ')', '; ') as Tasks
+                  FROM {subjects} s
+                  LEFT JOIN {tasks} t ON s.SubjectCode = t.SubjectCode
+                  GROUP BY s.SubjectCode, s.Name, s.Instructor, s.Units
+                  ORDER BY s.SubjectCode"""
+        return self.read_conn.execute(query).fetchall()
+    
+    def get_upcoming_tasks(self):
+        """Report: Upcoming tasks (from tomorrow forward, repeats up to UPCOMING_HORIZON_DAYS ahead)"""
+        tomorrow = date.today() + timedelta(days=1)
+        return [(row[2], row[3], row[4], row[5], row[1], row[6])
+                for _, row in self.iter_task_occurrences(tomorrow)]
+    
+    def get_tasks_today(self):
+        """Report: Tasks due today"""
+        return [(task[2], task[3], task[4], task[5], task[1], task[7]) for task in self.get_todays_tasks()]
+    
+    def get_completed_tasks(self, include_archive=False):
+        """Report: Completed tasks"""
+        tasks, subjects = self.report_sources(include_archive)
+        query = f"""SELECT t.TaskName, t.Deadline, t.Priority, t.Status, s.SubjectCode, s.Name
+                  FROM {tasks} t
+                  JOIN {subjects} s ON t.SubjectCode = s.SubjectCode
+                  WHERE t.Status = 'Completed'
+                  ORDER BY t.Deadline DESC"""
+        return self.read_conn.execute(query).fetchall()
+    
+    def get_missing_tasks(self, include_archive=False, today=None):
+        """Report: Missing/overdue tasks - not completed, and past their deadline (one-off tasks) or with their
+        repeat series ended before today, listed at its last occurrence"""
+        today = today or date.today()
+        tasks, subjects = self.report_sources(include_archive)
+        query = f"""SELECT t.TaskName, t.Deadline, t.Priority, t.Status, s.SubjectCode, s.Name, t.Recurrence
+                  FROM {tasks} t
+                  JOIN {subjects} s ON t.SubjectCode = s.SubjectCode
+                  WHERE t.Deadline < ? AND t.Status != 'Completed'"""
+        rows = []
+        for row in self.read_conn.execute(query, (today.isoformat(),)):
+            if row[6] is not None:
+                try:
+                    ended = RecurrenceRule.parse(row[6]).ended_on(date.fromisoformat(row[1]), today)
+                except (TypeError, ValueError):
+                    continue    # missing or malformed deadline / rule
+                if ended is None:
+                    continue    # still repeating - its next occurrence is ahead
+                row = row[:1] + (ended.isoformat(),) + row[2:]
+            rows.append(row[:6])
+        return sorted(rows, key=lambda row: row[1])
+    
+    def get_schedule_for_today(self):
+        """Report: Schedule for today"""
+        return [(entry[1], entry[6], entry[3], entry[4], entry[5]) for entry in self.get_todays_schedule()]
+    
+    def get_subjects_ever_taken(self):
+        """Report: every subject in this and the registered past-term databases"""
+        return TermLibrary(self).subjects_ever_taken()
+    
+    def get_completion_history(self):
+        """Report: task completion per term, oldest term first"""
+        return TermLibrary(self).completion_history()
+    
+    def get_api_token(self, renew=False):
+        """Secret the JSON API asks for (Authorization: Bearer ...) - made on first use, kept in sync_state"""
+        import secrets
+        
+        def work(conn):
+            row = conn.execute("SELECT Value FROM sync_state WHERE Key = 'api_token'").fetchone()
+            if row and not renew:
+                return row[0]
+            token = secrets.token_urlsafe(24)
+            conn.execute("INSERT OR REPLACE INTO sync_state VALUES ('api_token', ?)", (token,))
+            return token
+        return self.write(work, undo=False)
+    
+    def get_data_version(self):
+        """PRAGMA data_version - changes whenever ANOTHER connection commits to this database"""
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+    
+    def get_last_change_seq(self):
+        """Newest change log sequence number"""
+        return self.conn.execute("SELECT COALESCE(MAX(Seq), 0) FROM changelog").fetchone()[0]
+    
+    def get_changed_tables(self, since_seq):
+        """Tables changed after a change log sequence number - returns (tables, newest seq)"""
+        rows = self.conn.execute("SELECT DISTINCT TableName FROM changelog WHERE Seq > ?", (since_seq,)).fetchall()
+        return {row[0] for row in rows}, self.get_last_change_seq()
+    
+    def close(self):
+        """Close the database connections - the writer refreshes planner statistics first"""
+        if self.read_conn and self.read_conn is not self.conn:
+            self.read_conn.close()
+        if self.conn:
+            if not self.readonly:
+                try:
+                    # Cheap: only re-analyzes tables whose statistics the session's queries showed to be stale.
+                    # Its ANALYZE writes, so it takes the write lock the same way as any save
+                    self.write(lambda conn: conn.execute("PRAGMA optimize").fetchall())
+                except sqlite3.Error as e:
+                    print(f"⚠️ PRAGMA optimize failed: {e}")
+            self.conn.close()
+
+
+class UndoLog: # Undo/redo from inverse SQL recorded by TEMP triggers - no data copies
+
+    def __init__(self, db):
+        self.db = db
+        self.conn = db.conn
+        self.undo_steps = []            # [(first Seq, last Seq, tables)] oldest first
+        self.redo_steps = []
+        self.install()
+
+    def install(self):
+        """TEMP log table and triggers - they live only in this connection, so other windows are not recorded"""
+        self.conn.execute("""CREATE TEMP TABLE IF NOT EXISTS undo_log (
+                Seq INTEGER PRIMARY KEY,
+                TableName TEXT NOT NULL,
+                Statement TEXT NOT NULL            -- SQL that reverses one row change
+            )""")
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS undo_state (Recording INTEGER NOT NULL)")
+        self.conn.execute("INSERT INTO undo_state SELECT 1 WHERE NOT EXISTS (SELECT 1 FROM undo_state)")
+        for table, columns in UNDO_TABLES.items():
+            values = " || ', ' || ".join(f"quote(old.{column})" for column in columns)
+            assignments = " || ', ' || ".join(f"'{column} = ' || quote(old.{column})" for column in columns)
+            inverse = {
+                'INSERT': f"'DELETE FROM {table} WHERE rowid = ' || new.rowid",
+                'DELETE': f"'INSERT INTO {table} (rowid, {', '.join(columns)}) VALUES (' || old.rowid || ', ' || {values} || ')'",
+                'UPDATE': f"'UPDATE {table} SET ' || {assignments} || ' WHERE rowid = ' || new.rowid",
+            }
+            # Cascaded child deletes/updates fire these too, so a step restores the whole family
+            for op, statement in inverse.items():
+                self.conn.execute(f"""CREATE TEMP TRIGGER IF NOT EXISTS undo_{table}_{op.lower()}
+                    AFTER {op} ON main.{table} WHEN (SELECT Recording FROM undo_state)
+                    BEGIN INSERT INTO undo_log (TableName, Statement) VALUES ('{table}', {statement}); END""")
+        self.conn.commit()
+
+    def mark(self):
+        return self.conn.execute("SELECT COALESCE(MAX(Seq), 0) FROM temp.undo_log").fetchone()[0]
+
+    def set_recording(self, on):
+        self.conn.execute("UPDATE temp.undo_state SET Recording = ?", (1 if on else 0,))
+
+    def take_step(self, mark):
+        """Inside the write transaction: the step recorded since mark, or None if nothing changed.
+        
+        The redo steps (and the oldest undo step past UNDO_LIMIT) it makes obsolete are deleted
+        in the same transaction; push() updates the stacks once the commit succeeded."""
+        first, last = self.conn.execute("SELECT MIN(Seq), MAX(Seq) FROM temp.undo_log WHERE Seq > ?",
+                                        (mark,)).fetchone()
+        if first is None:
+            return None
+        tables = {table for (table,) in self.conn.execute(
+            "SELECT DISTINCT TableName FROM temp.undo_log WHERE Seq > ?", (mark,))}
+        obsolete = self.redo_steps + self.undo_steps[:max(0, len(self.undo_steps) + 1 - UNDO_LIMIT)]
+        for old_first, old_last, _ in obsolete:
+            self.conn.execute("DELETE FROM temp.undo_log WHERE Seq BETWEEN ? AND ?", (old_first, old_last))
+        return first, last, tables
+
+    def push(self, step):
+        self.undo_steps.append(step)
+        del self.undo_steps[:-UNDO_LIMIT]
+        self.redo_steps.clear()
+
+    def can_undo(self):
+        return bool(self.undo_steps)
+
+    def can_redo(self):
+        return bool(self.redo_steps)
+
+    def undo(self):
+        """Reverse the last write transaction - returns the tables it touched, or None if there is nothing to undo"""
+        return self.replay(self.undo_steps, self.redo_steps)
+
+    def redo(self):
+        """Re-apply the last undone transaction - returns the tables it touched, or None"""
+        return self.replay(self.redo_steps, self.undo_steps)
+
+    def replay(self, source, target):
+        """Run a step's inverse statements newest first in one transaction; what they record becomes the opposite step"""
+        if not source:
+            return None
+        first, last, tables = source[-1]
+
+        def run(conn):
+            statements = conn.execute("SELECT Statement FROM temp.undo_log WHERE Seq BETWEEN ? AND ? ORDER BY Seq DESC",
+                                      (first, last)).fetchall()
+            conn.execute("DELETE FROM temp.undo_log WHERE Seq BETWEEN ? AND ?", (first, last))
+            # Parents and children come back in one go - check their foreign keys at commit, not per row
+            conn.execute("PRAGMA defer_foreign_keys = ON")
+            self.set_recording(True)
+            mark = self.mark()
+            for (statement,) in statements:
+                if conn.execute(statement).rowcount == 0:
+                    # An UPDATE / DELETE that matches nothing - the row was archived or deleted elsewhere since
+                    raise sqlite3.IntegrityError("a row it changed no longer exists (archived or deleted)")
+            return conn.execute("SELECT MIN(Seq), MAX(Seq) FROM temp.undo_log WHERE Seq > ?", (mark,)).fetchone()
+
+        try:
+            new_first, new_last = self.db.write(run, undo=False)
+        except sqlite3.IntegrityError:
+            # Later changes (e.g. from another window) conflict with it - this step can never apply
+            source.pop()
+            self.db.write(lambda conn: conn.execute("DELETE FROM temp.undo_log WHERE Seq BETWEEN ? AND ?",
+                                                    (first, last)), undo=False)
+            raise
+        source.pop()
+        if new_first is not None:
+            target.append((new_first, new_last, tables))
+        return tables
+
+    def clear(self):
+        """Forget every step - e.g. after a restore replaced the data they refer to"""
+        self.undo_steps.clear()
+        self.redo_steps.clear()
+        self.db.write(lambda conn: conn.execute("DELETE FROM temp.undo_log"), undo=False)
+
+
+class BackupManager: # Takes online snapshots of the database without blocking the GUI or writers
+
+    def __init__(self, db_path, backup_dir=None, keep=BACKUP_KEEP, pages_per_step=BACKUP_PAGES_PER_STEP):
+        self.db_path = db_path
+        self.backup_dir = backup_dir or os.path.join(os.path.dirname(os.path.abspath(db_path)), BACKUP_DIR_NAME)
+        self.keep = keep
+        self.pages_per_step = pages_per_step
+        self.last_result = None     # (ok, path or error message) of the most recent snapshot
+        self._thread = None
+
+    def list_snapshots(self):
+        """Return snapshot paths, newest first"""
+        if not os.path.isdir(self.backup_dir):
+            return []
+        prefix = os.path.splitext(os.path.basename(self.db_path))[0] + '-'
+        names = [n for n in os.listdir(self.backup_dir) if n.startswith(prefix) and n.endswith('.db')]
+        return [os.path.join(self.backup_dir, n) for n in sorted(names, reverse=True)]
+
+    def verify(self, path):
+        """Run PRAGMA quick_check on a database file - returns (ok, message)"""
+        try:
+            conn = sqlite3.connect(readonly_uri(path), uri=True)
+            try:
+                result = conn.execute("PRAGMA quick_check").fetchone()[0]
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            return False, str(e)
+        return result == 'ok', result
+
+    def create_snapshot(self, protect=None):
+        """Copy the live database page by page into a new rotated snapshot and verify it"""
+        if not os.path.exists(self.db_path):
+            raise FileNotFoundError(f"Database not found: {self.db_path}")
+        os.makedirs(self.backup_dir, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')   # sorts chronologically by name
+        final_path = os.path.join(self.backup_dir, f"{os.path.splitext(os.path.basename(self.db_path))[0]}-{stamp}.db")
+        partial_path = final_path + '.partial'
+
+        # A separate source connection: each step holds a read lock only briefly,
+        # and sleeping between steps lets the GUI's own writes go through
+        src = sqlite3.connect(self.db_path)
+        dst = sqlite3.connect(partial_path)
+        try:
+            src.backup(dst, pages=self.pages_per_step, sleep=BACKUP_STEP_SLEEP)
+            # The copy inherits WAL mode - switch it back so the snapshot is one self-contained file
+            dst.execute("PRAGMA journal_mode = DELETE")
+        finally:
+            dst.close()
+            src.close()
+
+        ok, message = self.verify(partial_path)
+        if not ok:
+            os.remove(partial_path)
+            raise sqlite3.DatabaseError(f"Snapshot failed quick_check: {message}")
+
+        os.replace(partial_path, final_path)
+        self.rotate(protect)
+        return final_path
+
+    def rotate(self, protect=None):
+        """Delete the oldest snapshots beyond the configured count"""
+        for old_path in self.list_snapshots()[self.keep:]:
+            if protect and os.path.abspath(old_path) == os.path.abspath(protect):
+                continue
+            try:
+                os.remove(old_path)
+            except OSError as e:
+                print(f"⚠️ Could not remove old backup {old_path}: {e}")
+
+    def start_background(self):
+        """Start a snapshot on a worker thread - returns False if one is already running"""
+        if self.is_running():
+            return False
+
+        def worker():
+            try:
+                self.last_result = (True, self.create_snapshot())
+            except Exception as e:
+                self.last_result = (False, str(e))
+
+        self.last_result = None
+        self._thread = threading.Thread(target=worker, name='ClassIFY-backup', daemon=True)
+        self._thread.start()
+        return True
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def restore(self, snapshot_path, target_conn=None):
+        """Replace the live database contents with a verified snapshot in one atomic step.
+        
+        A snapshot from an older schema is migrated on a scratch copy first, so the live database
+        never goes back to an older layout; one from a newer ClassIFY is refused."""
+        ok, message = self.verify(snapshot_path)
+        if not ok:
+            raise sqlite3.DatabaseError(f"Snapshot failed quick_check: {message}")
+        conn = sqlite3.connect(readonly_uri(snapshot_path), uri=True)
+        try:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            has_state = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sync_state'").fetchone()
+            state = dict(conn.execute("SELECT Key, Value FROM sync_state").fetchall()) if has_state else {}
+        finally:
+            conn.close()
+        if version > SCHEMA_VERSION:
+            raise sqlite3.DatabaseError(f"Snapshot has schema version {version}, newer than this ClassIFY "
+                                        f"({SCHEMA_VERSION}) - restore it with a newer version")
+
+        # Keep a copy of the current state so a wrong restore can itself be undone
+        safety_path = self.create_snapshot(protect=snapshot_path)
+
+        import tempfile
+        with tempfile.TemporaryDirectory() as folder:
+            source = snapshot_path
+            if version < SCHEMA_VERSION:
+                import shutil
+                source = os.path.join(folder, os.path.basename(snapshot_path))
+                shutil.copy(snapshot_path, source)
+                Database(source, seed=False, write_files=False).close()
+                # The scratch copy got its own replica identity - keep the snapshot's, or the live database's
+                # when the snapshot predates the change log
+                replica_id = state.get('replica_id')
+                if replica_id is None:
+                    conn = sqlite3.connect(readonly_uri(self.db_path), uri=True)
+                    try:
+                        row = conn.execute("SELECT Value FROM sync_state WHERE Key = 'replica_id'").fetchone()
+                        replica_id = row[0] if row else None
+                    except sqlite3.OperationalError:
+                        pass
+                    finally:
+                        conn.close()
+                conn = sqlite3.connect(source)
+                try:
+                    conn.execute("UPDATE sync_state SET Value = ? WHERE Key = 'replica_home'",
+                                 (replica_home(self.db_path),))
+                    if replica_id:
+                        conn.execute("UPDATE sync_state SET Value = ? WHERE Key = 'replica_id'", (replica_id,))
+                    conn.execute("PRAGMA journal_mode = DELETE")
+                    conn.commit()
+                finally:
+                    conn.close()
+
+            src = sqlite3.connect(readonly_uri(source), uri=True)
+            dst = target_conn or sqlite3.connect(self.db_path)
+            try:
+                # pages=-1 copies everything in a single step, which SQLite applies to the
+                # destination as one write transaction - other readers see old or new, never a mix
+                src.backup(dst, pages=-1)
+            finally:
+                src.close()
+                if target_conn is None:
+                    dst.close()
+        return safety_path
+
+
+class MaintenanceManager: # Keeps a long-lived database healthy: planner statistics, integrity checks, free-page reclaim
+
+    def __init__(self, db_path, interval_days=MAINTENANCE_INTERVAL_DAYS):
+        self.db_path = db_path
+        self.interval_days = interval_days
+        self.last_result = None     # (ok, summary dict or error message) of the most recent run
+        self._thread = None
+
+    def connect(self):
+        """Own connection, like the backup worker - the app's connections stay free"""
+        if not os.path.exists(self.db_path):
+            raise FileNotFoundError(f"Database not found: {self.db_path}")
+        conn = sqlite3.connect(self.db_path, timeout=DB_BUSY_TIMEOUT_MS / 1000)
+        conn.execute(MAINTENANCE_LOG_SQL)
+        return conn
+
+    def history(self, limit=10):
+        """Recent runs, newest first"""
+        conn = self.connect()
+        try:
+            return conn.execute("""SELECT StartedAt, Seconds, QuickCheck, ForeignKeyErrors, BytesReclaimed, Steps
+                                   FROM maintenance_log ORDER BY RunID DESC LIMIT ?""", (limit,)).fetchall()
+        finally:
+            conn.close()
+
+    def is_due(self, now=None):
+        """True when the last run is older than the cadence (or there never was one)"""
+        runs = self.history(1)
+        if not runs:
+            return True
+        last = datetime.strptime(runs[0][0], '%Y-%m-%d %H:%M:%S')
+        return (now or datetime.now()) - last >= timedelta(days=self.interval_days)
+
+    def run(self):
+        """Integrity checks, ANALYZE, incremental VACUUM and PRAGMA optimize - the summary is also logged"""
+        conn = self.connect()
+        try:
+            started_at = datetime.now()
+            started = time.perf_counter()
+            steps = {}
+
+            def timed(name, sql):
+                step_start = time.perf_counter()
+                rows = conn.execute(sql).fetchall()
+                steps[name] = round(time.perf_counter() - step_start, 3)
+                return rows
+
+            pages_before = conn.execute("PRAGMA page_count").fetchone()[0]
+            problems = timed('quick_check', "PRAGMA quick_check")
+            quick_check = problems[0][0] if problems else 'ok'
+            foreign_key_errors = len(timed('foreign_key_check', "PRAGMA foreign_key_check"))
+            timed('analyze', "ANALYZE")
+
+            if quick_check != 'ok':
+                pass    # never rewrite the pages of a damaged file - restore a backup instead
+            elif conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                # Files created before incremental vacuum need one full VACUUM to switch modes
+                conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                timed('vacuum', "VACUUM")
+            else:
+                timed('incremental_vacuum', "PRAGMA incremental_vacuum")
+            # Fold the WAL back so the freed pages also leave the file on disk
+            timed('checkpoint', "PRAGMA wal_checkpoint(TRUNCATE)")
+            timed('optimize', "PRAGMA optimize")
+
+            page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+            pages_after = conn.execute("PRAGMA page_count").fetchone()[0]
+            summary = {
+                'started_at': started_at.strftime('%Y-%m-%d %H:%M:%S'),
+                'seconds': round(time.perf_counter() - started, 3),
+                'quick_check': quick_check,
+                'foreign_key_errors': foreign_key_errors,
+                'bytes_reclaimed': max(0, pages_before - pages_after) * page_size,
+                'free_pages': conn.execute("PRAGMA freelist_count").fetchone()[0],
+                'steps': steps,
+            }
+            conn.execute("""INSERT INTO maintenance_log
+                                (StartedAt, Seconds, QuickCheck, ForeignKeyErrors, BytesReclaimed, Steps)
+                            VALUES (?, ?, ?, ?, ?, ?)""",
+                         (summary['started_at'], summary['seconds'], quick_check, foreign_key_errors,
+                          summary['bytes_reclaimed'], json.dumps(steps)))
+            conn.commit()
+            return summary
+        finally:
+            conn.close()
+
+    def start_background(self):
+        """Start a run on a worker thread - returns False if one is already running"""
+        if self.is_running():
+            return False
+
+        def worker():
+            try:
+                summary = self.run()
+                self.last_result = (summary['quick_check'] == 'ok' and not summary['foreign_key_errors'], summary)
+            except Exception as e:
+                self.last_result = (False, str(e))
+
+        self.last_result = None
+        self._thread = threading.Thread(target=worker, name='ClassIFY-maintenance', daemon=True)
+        self._thread.start()
+        return True
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+
+class TaskArchive: # Moves old tasks into an attached archive database so the live tasks table stays small
+
+    def __init__(self, db):
+        self.db = db
+        self.conn = db.conn
+        self.path = archive_path_for(db.db_path)
+
+    def attach(self):
+        """ATTACH (creating if needed) the archive to the writer connection"""
+        if not self.path:
+            raise ValueError("An in-memory database has no archive")
+        if any(row[1] == 'archive' for row in self.conn.execute("PRAGMA database_list")):
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.conn.commit()                  # ATTACH is not allowed inside a transaction
+        self.conn.execute("ATTACH DATABASE ? AS archive", (self.path,))
+        for sql in ARCHIVE_TABLES_SQL:
+            self.conn.execute(sql)
+
+    def candidates(self, before, whole_term=False):
+        """TaskIDs due before `before` - completed ones only, or every task with whole_term"""
+        query = "SELECT TaskID, Recurrence FROM main.tasks WHERE Deadline < ?"
+        if not whole_term:
+            query += f" AND StatusID = {STATUS_IDS['Completed']}"
+        ids = []
+        for task_id, recurrence in self.conn.execute(query, (before.isoformat(),)):
+            try:
+                rule = RecurrenceRule.parse(recurrence)
+            except ValueError:
+                continue
+            # A repeating task stays live while it can still occur
+            if rule is None or (rule.until and rule.until < before):
+                ids.append(task_id)
+        return ids
+
+    def archive(self, before=None, whole_term=False):
+        """Move matching tasks (and a snapshot of their subjects) to the archive - returns tasks moved"""
+        before = before or date.today() - timedelta(days=ARCHIVE_AFTER_DAYS)
+        self.attach()
+
+        def move(conn):
+            ids = self.candidates(before, whole_term)
+            if not ids:
+                return 0
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS archive_batch (TaskID INTEGER PRIMARY KEY)")
+            conn.execute("DELETE FROM temp.archive_batch")
+            conn.executemany("INSERT INTO temp.archive_batch VALUES (?)", ((task_id,) for task_id in ids))
+            # The archive keeps the text-keyed layout, so it stays readable without the lookup tables
+            conn.execute("""INSERT OR REPLACE INTO archive.subjects
+                            SELECT SubjectCode, Name, Instructor, Units, Goals FROM main.subjects WHERE SubjectID IN
+                                (SELECT SubjectID FROM main.tasks WHERE TaskID IN (SELECT TaskID FROM temp.archive_batch))""")
+            # Copy before delete, and OR IGNORE: WAL commits each file separately, so a crash in
+            # between leaves a task in both places (hidden by all_tasks) and a rerun just finishes the move
+            conn.execute("""INSERT OR IGNORE INTO archive.tasks
+                            SELECT TaskID, SubjectCode, TaskName, Deadline, Priority, Status, Recurrence,
+                                   EffortMinutes, datetime('now', 'localtime')
+                            FROM main.task_details WHERE TaskID IN (SELECT TaskID FROM temp.archive_batch)""")
+            # A move is not a deletion - keep it out of the change log so peers keep their copy
+            conn.execute("UPDATE main.sync_state SET Value = '1' WHERE Key = 'applying'")
+            conn.execute("DELETE FROM main.tasks WHERE TaskID IN (SELECT TaskID FROM temp.archive_batch)")
+            conn.execute("UPDATE main.sync_state SET Value = '0' WHERE Key = 'applying'")
+            # ...but leave one marker so other open windows see the tasks table changed (export skips it)
+            conn.execute("""INSERT INTO main.changelog (TableName, RowID, Op, Version, ChangedAt, Origin, RowData)
+                            VALUES ('tasks', 0, 'M', 0, strftime('%Y-%m-%dT%H:%M:%fZ', 'now'),
+                                    (SELECT Value FROM main.sync_state WHERE Key = 'replica_id'), NULL)""")
+            return len(ids)
+
+        return self.db.write(move, undo=False)
+
+    def latest_past_term_end(self):
+        """Newest schedule TermEnd that has already passed, or None"""
+        value = self.conn.execute("SELECT MAX(TermEnd) FROM main.schedule WHERE TermEnd < ?",
+                                  (date.today().isoformat(),)).fetchone()[0]
+        return date.fromisoformat(value) if value else None
+
+    def counts(self):
+        """(live tasks, archived tasks)"""
+        live = self.conn.execute("SELECT COUNT(*) FROM main.tasks").fetchone()[0]
+        if not self.path or not os.path.exists(self.path):
+            return live, 0
+        self.attach()
+        return live, self.conn.execute("SELECT COUNT(*) FROM archive.tasks").fetchone()[0]
+
+
+class TermLibrary: # Past-term databases, ATTACHed read-only only while a cross-term report runs
+
+    def __init__(self, db):
+        self.db = db
+
+    def terms(self):
+        """Registered (label, path) pairs"""
+        conn = self.db.read_conn
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'term_databases'").fetchone():
+            return []
+        return conn.execute("SELECT Label, Path FROM term_databases ORDER BY AddedAt").fetchall()
+
+    def add(self, path, label=None):
+        """Register a past term's database file - returns its label"""
+        path = os.path.abspath(path)
+        label = (label or os.path.splitext(os.path.basename(path))[0]).strip()
+        if path == os.path.abspath(self.db.db_path):
+            raise ValueError("That is the current database")
+        if not label or label == TERM_CURRENT_LABEL:
+            raise ValueError(f"Choose a term label other than '{TERM_CURRENT_LABEL}'")
+        # Opening it read-only proves the file exists and holds ClassIFY tables
+        term = Database(path, readonly=True)
+        try:
+            tables = {row[0] for row in term.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        finally:
+            term.close()
+        if not {'subjects', 'tasks'} <= tables:
+            raise ValueError(f"Not a ClassIFY database: {path}")
+        
+        def register(conn):
+            conn.execute(TERM_DATABASES_SQL)
+            conn.execute("INSERT OR REPLACE INTO term_databases VALUES (?, ?, datetime('now', 'localtime'))",
+                         (label, path))
+        self.db.write(register)
+        return label
+
+    def remove(self, label):
+        """Forget a registered term - the file itself is left alone"""
+        if not self.terms():
+            return False
+        cur = self.db.write(lambda conn: conn.execute("DELETE FROM term_databases WHERE Label = ?", (label,)))
+        return cur.rowcount > 0
+
+    def sources(self):
+        """(label, path, archive path or None) for the current database and every registered term"""
+        found = []
+        for label, path in [(TERM_CURRENT_LABEL, self.db.db_path)] + self.terms():
+            if not os.path.exists(path):
+                print(f"⚠️ Past term '{label}' skipped - file not found: {path}")
+                continue
+            archive = archive_path_for(path)
+            found.append((label, path, archive if archive and os.path.exists(archive) else None))
+        return found
+
+    def chunks(self, conn):
+        """Split the sources into groups that fit in SQLite's ATTACH limit"""
+        slots = conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+        chunk, used = [], 0
+        for label, path, archive in self.sources():
+            # The current database is 'main' of the report connection, but its archive needs a slot
+            need = (0 if label == TERM_CURRENT_LABEL else 1) + (1 if archive else 0)
+            if chunk and used + need > slots:
+                yield chunk
+                chunk, used = [], 0
+            chunk.append((label, path, archive))
+            used += need
+        if chunk:
+            yield chunk
+
+    def attach_chunk(self, conn, chunk):
+        """ATTACH one group read-only and (re)build the term_subjects / term_tasks views over it"""
+        tasks_parts, subjects_parts = [], []
+        for n, (label, path, archive) in enumerate(chunk):
+            if label == TERM_CURRENT_LABEL:
+                schema = 'main'
+            else:
+                schema = f"term{n}"
+                conn.execute(f"ATTACH DATABASE ? AS {schema}", (readonly_uri(path),))
+            literal = "'" + label.replace("'", "''") + "'"
+            # Terms saved by the compact schema read their tasks through its text-keyed view
+            tasks = 'task_details' if conn.execute(f"SELECT 1 FROM {schema}.sqlite_master WHERE name = 'task_details'"
+                                                   ).fetchone() else 'tasks'
+            tasks_parts.append(f"SELECT {literal} AS Term, SubjectCode, Status, Deadline FROM {schema}.{tasks}")
+            subjects_parts.append(f"SELECT {literal} AS Term, SubjectCode, Name, Instructor, Units FROM {schema}.subjects")
+            if archive:
+                conn.execute(f"ATTACH DATABASE ? AS archive{n}", (readonly_uri(archive),))
+                tasks_parts.append(f"""SELECT {literal}, SubjectCode, Status, Deadline FROM archive{n}.tasks
+                                       WHERE TaskID NOT IN (SELECT TaskID FROM {schema}.tasks)""")
+                subjects_parts.append(f"""SELECT {literal}, SubjectCode, Name, Instructor, Units FROM archive{n}.subjects
+                                          WHERE SubjectCode NOT IN (SELECT SubjectCode FROM {schema}.subjects)""")
+        conn.execute("DROP VIEW IF EXISTS temp.term_tasks")
+        conn.execute("DROP VIEW IF EXISTS temp.term_subjects")
+        conn.execute("CREATE TEMP VIEW term_tasks AS " + " UNION ALL ".join(tasks_parts))
+        conn.execute("CREATE TEMP VIEW term_subjects AS " + " UNION ALL ".join(subjects_parts))
+
+    def detach_all(self, conn):
+        for _, schema, _ in conn.execute("PRAGMA database_list").fetchall():
+            if schema not in ('main', 'temp'):
+                conn.execute(f"DETACH DATABASE {schema}")
+
+    def run(self, query):
+        """Run a query over term_subjects / term_tasks for every group - yields its rows"""
+        if self.db.db_path == ':memory:':
+            raise ValueError("Cross-term reports need a database file")
+        # A connection of its own: the attaches never touch the connections the views use.
+        # mode=ro keeps every file read-only (query_only would also refuse the TEMP views).
+        conn = sqlite3.connect(readonly_uri(self.db.db_path), uri=True, isolation_level=None)
+        try:
+            for chunk in self.chunks(conn):
+                self.attach_chunk(conn, chunk)
+                yield from conn.execute(query)
+                self.detach_all(conn)
+        finally:
+            conn.close()
+
+    def term_ranges(self):
+        """{label: (first deadline, last deadline, subjects, tasks, completed)}"""
+        return {row[0]: row[1:] for row in self.run(
+            """SELECT Term, MIN(Deadline), MAX(Deadline), COUNT(DISTINCT SubjectCode), COUNT(*),
+                      SUM(Status = 'Completed')
+               FROM term_tasks GROUP BY Term""")}
+
+    def completion_history(self):
+        """(Term, From, To, Subjects, Tasks, Completed, Completion) per term, oldest first"""
+        rows = []
+        for label, (first, last, subjects, tasks, completed) in self.term_ranges().items():
+            rows.append((label, first, last, subjects, tasks, completed,
+                         f"{completed / tasks:.0%}" if tasks else "-"))
+        return sorted(rows, key=lambda row: (row[0] == TERM_CURRENT_LABEL, row[1] or '9999'))
+
+    def subjects_ever_taken(self):
+        """(SubjectCode, Name, Instructor, Units, Terms, Tasks) - details from the newest term that had it"""
+        order = {row[0]: n for n, row in enumerate(self.completion_history())}
+        merged = {}
+        for term, code, name, instructor, units, tasks in sorted(self.run(
+                """SELECT s.Term, s.SubjectCode, s.Name, s.Instructor, s.Units, COALESCE(t.Tasks, 0)
+                   FROM term_subjects s
+                   LEFT JOIN (SELECT Term, SubjectCode, COUNT(*) AS Tasks FROM term_tasks GROUP BY Term, SubjectCode) t
+                          ON t.Term = s.Term AND t.SubjectCode = s.SubjectCode"""),
+                key=lambda row: order.get(row[0], len(order))):
+            previous = merged.get(code)
+            terms = (previous[4] + ', ' if previous else '') + term
+            merged[code] = (code, name, instructor, units, terms, (previous[5] if previous else 0) + tasks)
+        return [merged[code] for code in sorted(merged)]
+
+
+class TenantRouter: # Maps each student to their own database file
+
+    STUDENT_ID_PATTERN = re.compile(r'^[A-Za-z0-9][A-Za-z0-9_.-]{0,63}$')
+
+    def __init__(self, base_dir=TENANT_DIR_NAME):
+        self.base_dir = base_dir
+
+    def normalize_id(self, student_id):
+        """Validate a StudentID so it can never escape the students folder"""
+        student_id = str(student_id).strip()
+        if not self.STUDENT_ID_PATTERN.match(student_id):
+            raise ValueError(f"Invalid StudentID: {student_id!r}")
+        return student_id
+
+    def path_for(self, student_id):
+        """Database file for a student - spread over 256 sub-folders so no folder gets huge"""
+        student_id = self.normalize_id(student_id)
+        bucket = hashlib.sha1(student_id.encode('utf-8')).hexdigest()[:2]
+        return os.path.join(self.base_dir, bucket, f"{student_id}.db")
+
+    def exists(self, student_id):
+        return os.path.exists(self.path_for(student_id))
+
+    def students(self):
+        """All StudentIDs that have a database file, sorted"""
+        found = []
+        if os.path.isdir(self.base_dir):
+            for bucket in os.listdir(self.base_dir):
+                bucket_dir = os.path.join(self.base_dir, bucket)
+                if os.path.isdir(bucket_dir):
+                    found.extend(os.path.splitext(n)[0] for n in os.listdir(bucket_dir) if n.endswith('.db'))
+        return sorted(found)
+
+
+class SyncManager: # Exchanges change-log deltas between two copies of a ClassIFY database
+
+    def __init__(self, db):
+        self.db = db
+        self.conn = db.conn
+
+    @property
+    def replica_id(self):
+        return self.conn.execute("SELECT Value FROM sync_state WHERE Key = 'replica_id'").fetchone()[0]
+
+    def sync_key(self, table, rowid):
+        """Stable cross-replica key of a local row: mapped key, or '<creating replica>:<rowid>'"""
+        row = self.conn.execute("SELECT SyncKey FROM sync_map WHERE TableName = ? AND LocalRowID = ?",
+                                (table, rowid)).fetchone()
+        if row:
+            return row[0]
+        first = self.conn.execute("""SELECT Origin FROM changelog WHERE TableName = ? AND RowID = ?
+                                     ORDER BY Seq LIMIT 1""", (table, rowid)).fetchone()
+        return f"{first[0] if first else self.replica_id}:{rowid}"
+
+    def resolve_key(self, table, key, row_data):
+        """Find the local rowid for a sync key - None if the row is new here"""
+        row = self.conn.execute("SELECT LocalRowID FROM sync_map WHERE TableName = ? AND SyncKey = ?",
+                                (table, key)).fetchone()
+        if row:
+            return row[0]
+        
+        # Rows created here, or before this file was copied, keep their original rowid
+        # (imported rows always have a sync_map entry, so they never match here)
+        origin, _, rowid = key.rpartition(':')
+        mapped = self.conn.execute("SELECT 1 FROM sync_map WHERE TableName = ? AND LocalRowID = ?",
+                                   (table, int(rowid))).fetchone()
+        first = self.conn.execute("""SELECT Origin FROM changelog WHERE TableName = ? AND RowID = ?
+                                     ORDER BY Seq LIMIT 1""", (table, int(rowid))).fetchone()
+        if not mapped and first and first[0] == origin:
+            return int(rowid)
+        
+        # Subjects created independently on both sides are merged by SubjectCode
+        if table == 'subjects' and row_data:
+            row = self.conn.execute("SELECT rowid FROM subjects WHERE SubjectCode = ?",
+                                    (row_data['SubjectCode'],)).fetchone()
+            if row:
+                self.conn.execute("INSERT OR REPLACE INTO sync_map VALUES (?, ?, ?)", (table, key, row[0]))
+                return row[0]
+        return None
+
+    def export_bundle(self, path, peer_id=None):
+        """Write every change the peer has not acknowledged to a gzip'd JSON bundle"""
+        me = self.replica_id
+        since, ack = 0, 0
+        if peer_id:
+            row = self.conn.execute("SELECT LastSentSeq, LastReceivedSeq FROM sync_peers WHERE PeerID = ?",
+                                    (peer_id,)).fetchone()
+            if row:
+                since, ack = row
+        
+        # Only the newest entry per row is needed; deferred foreign keys make the order safe
+        rows = self.conn.execute("""SELECT c.Seq, c.TableName, c.RowID, c.Op, c.Version, c.ChangedAt, c.Origin, c.RowData
+                                    FROM changelog c
+                                    JOIN (SELECT MAX(Seq) AS Seq FROM changelog
+                                          WHERE Seq > ? AND Origin != ? AND Op != 'M'
+                                          GROUP BY TableName, RowID) latest ON latest.Seq = c.Seq
+                                    ORDER BY c.Seq""", (since, peer_id or '')).fetchall()
+        upto = self.conn.execute("SELECT COALESCE(MAX(Seq), 0) FROM changelog").fetchone()[0]
+        
+        changes = []
+        for seq, table, rowid, op, version, changed_at, origin, row_data in rows:
+            changes.append({
+                'table': table,
+                'key': self.sync_key(table, rowid),
+                'op': op,
+                'version': version,
+                'changed_at': changed_at,
+                'origin': origin,
+                'row': json.loads(row_data) if row_data else None,
+            })
+        
+        bundle = {'format': SYNC_BUNDLE_FORMAT, 'replica': me, 'peer': peer_id,
+                  'since': since, 'upto': upto, 'ack': ack, 'changes': changes}
+        import gzip
+        with gzip.open(path, 'wt', encoding='utf-8') as f:
+            json.dump(bundle, f, separators=(',', ':'))
+        return len(changes)
+
+    def import_bundle(self, path):
+        """Merge a peer's bundle - returns (applied, skipped) counts"""
+        import gzip
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            bundle = json.load(f)
+        if bundle.get('format') != SYNC_BUNDLE_FORMAT:
+            raise ValueError(f"Not a ClassIFY sync bundle: {path}")
+        peer_id = bundle['replica']
+        if peer_id == self.replica_id:
+            raise ValueError("This bundle was exported from this database")
+        
+        def merge(conn):
+            applied = skipped = 0
+            conn.execute("PRAGMA defer_foreign_keys = ON")
+            conn.execute("UPDATE sync_state SET Value = '1' WHERE Key = 'applying'")
+            # Tasks and schedule rows name their subject by SubjectCode, which must resolve to a SubjectID
+            # when they are stored - so subject changes go first (sorted() keeps the Seq order otherwise)
+            for change in sorted(bundle['changes'], key=lambda change: change['table'] != 'subjects'):
+                if self.apply_change(change):
+                    applied += 1
+                else:
+                    skipped += 1
+            
+            conn.execute("INSERT OR IGNORE INTO sync_peers (PeerID) VALUES (?)", (peer_id,))
+            conn.execute("""UPDATE sync_peers SET LastReceivedSeq = MAX(LastReceivedSeq, ?),
+                                                  LastSentSeq = MAX(LastSentSeq, ?)
+                            WHERE PeerID = ?""", (bundle['upto'], bundle['ack'], peer_id))
+            conn.execute("UPDATE sync_state SET Value = '0' WHERE Key = 'applying'")
+            return applied, skipped
+        
+        self.conn.commit()
+        return self.db.write(merge, undo=False)
+
+    def apply_change(self, change):
+        """Apply one remote change with last-writer-wins on (ChangedAt, Origin) - False if it lost"""
+        table, key, row = change['table'], change['key'], change['row']
+        if table not in TABLE_COLUMNS:
+            return False
+        rowid = self.resolve_key(table, key, row)
+        
+        if rowid is not None:
+            local = self.conn.execute("""SELECT ChangedAt, Origin, Version FROM changelog
+                                         WHERE TableName = ? AND RowID = ? ORDER BY Seq DESC LIMIT 1""",
+                                      (table, rowid)).fetchone()
+            if local and (local[0], local[1]) >= (change['changed_at'], change['origin']):
+                return False
+            exists = self.conn.execute(f"SELECT 1 FROM {table} WHERE rowid = ?", (rowid,)).fetchone()
+        else:
+            local, exists = None, None
+        
+        columns = TABLE_COLUMNS[table]
+        if change['op'] == 'D':
+            if exists:
+                self.conn.execute(f"DELETE FROM {table} WHERE rowid = ?", (rowid,))
+        elif exists:
+            register_codes(self.conn, row.get('Priority'), row.get('Status'))
+            self.conn.execute(update_sql(table, columns) + " WHERE rowid = ?",
+                              [row.get(c) for c in columns] + [rowid])
+        else:
+            register_codes(self.conn, row.get('Priority'), row.get('Status'))
+            cur = self.conn.execute(insert_sql(table, columns), [row.get(c) for c in columns])
+            rowid = cur.lastrowid
+        
+        if rowid is None:
+            return False    # delete of a row we never had
+        self.conn.execute("INSERT OR REPLACE INTO sync_map VALUES (?, ?, ?)", (table, key, rowid))
+        
+        # Record the change locally with its original stamp so it is conflict-checked and forwarded
+        version = max(change['version'], (local[2] + 1) if local else 1)
+        self.conn.execute("""INSERT INTO changelog (TableName, RowID, Op, Version, ChangedAt, Origin, RowData)
+                             VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                          (table, rowid, change['op'], version, change['changed_at'], change['origin'],
+                           json.dumps(row, separators=(',', ':')) if row else None))
+        return True
+
+
+def api_json(payload):
+    """(body, ETag) of a JSON API response - the ETag hashes the body, so it changes exactly when the data does"""
+    body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return body, '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+
+
+def api_rows(kind, rows):
+    """Database rows -> list of dicts keyed by API_COLUMNS[kind]"""
+    columns = API_COLUMNS[kind]
+    return [dict(zip(columns, row)) for row in rows]
+
+
+def report_slug(report_type):
+    """'Upcoming Tasks' -> 'upcoming-tasks', the report's API path segment"""
+    return report_type.lower().replace(' ', '-')
+
+
+class ApiError(Exception): # An API request that cannot be served - carries the HTTP status to answer with
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ApiDatabasePool: # Database calls for the API on executor threads - one writer, a read-only connection per reader
+
+    def __init__(self, db_path, readers=API_READERS, seed=False):
+        from concurrent.futures import ThreadPoolExecutor
+        self.db_path = db_path
+        # The writer opens (and if needed creates or migrates) the file first, so the readers find it ready
+        self.writer = Database(db_path, seed=seed, write_files=False, check_same_thread=False)
+        self._local = threading.local()
+        self._readers = []
+        self._lock = threading.Lock()
+        self.read_pool = ThreadPoolExecutor(max_workers=readers, thread_name_prefix='api-read',
+                                            initializer=self._open_reader)
+        # SQLite takes one writer at a time anyway - one thread keeps saves in order without lock waits
+        self.write_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='api-write')
+
+    def _open_reader(self):
+        """Reader thread initializer - its own read-only Database for the thread's lifetime"""
+        db = Database(self.db_path, readonly=True, check_same_thread=False)
+        self._local.db = db
+        self._local.cache = OrderedDict()   # cache_key -> ((data_version, today), result), least recently used first
+        with self._lock:
+            self._readers.append(db)
+
+    async def read(self, work, cache_key=None):
+        """Run work(db) on a reader thread and return its result.
+        
+        With a cache_key the result is kept and reused while the reader's PRAGMA data_version is unchanged -
+        readers never write, so it moves whenever the API, the GUI or a script commits. The date is part of
+        the check because the reports depend on today."""
+        import asyncio
+        
+        def run():
+            db = self._local.db
+            if cache_key is None:
+                return work(db)
+            cache = self._local.cache
+            version = (db.get_data_version(), date.today())
+            cached = cache.get(cache_key)
+            if cached and cached[0] == version:
+                cache.move_to_end(cache_key)
+                return cached[1]
+            result = work(db)
+            cache[cache_key] = (version, result)
+            cache.move_to_end(cache_key)
+            if len(cache) > API_CACHE_ENTRIES:
+                cache.popitem(last=False)
+            return result
+        return await asyncio.get_running_loop().run_in_executor(self.read_pool, run)
+
+    async def write(self, work):
+        """Run work(db) on the writer thread and return its result"""
+        import asyncio
+        return await asyncio.get_running_loop().run_in_executor(self.write_pool, work, self.writer)
+
+    def close(self):
+        self.read_pool.shutdown(wait=True)
+        self.write_pool.shutdown(wait=True)
+        with self._lock:
+            for db in self._readers:
+                db.close()
+            self._readers.clear()
+        self.writer.close()
+
+
+class ApiServer: # Local HTTP/JSON API over the Database layer - asyncio owns the sockets, ApiDatabasePool the SQLite work
+
+    def __init__(self, pool, token, host=API_HOST, port=API_PORT):
+        self.pool = pool
+        self.token = token              # every request must carry 'Authorization: Bearer <token>'
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self.stop_event = None          # asyncio.Event once serving; set() shuts the server down
+        self.routes = [
+            ('GET', r'/subjects', self.list_subjects),
+            ('POST', r'/subjects', self.create_subject),
+            ('GET', r'/subjects/(?P<code>[^/]+)', self.get_subject),
+            ('PUT', r'/subjects/(?P<code>[^/]+)', self.update_subject),
+            ('DELETE', r'/subjects/(?P<code>[^/]+)', self.delete_subject),
+            ('GET', r'/tasks', self.list_tasks),
+            ('POST', r'/tasks', self.create_task),
+            ('GET', r'/tasks/(?P<task_id>\d+)', self.get_task),
+            ('PUT', r'/tasks/(?P<task_id>\d+)', self.update_task),
+            ('DELETE', r'/tasks/(?P<task_id>\d+)', self.delete_task),
+            ('GET', r'/schedule', self.list_schedule),
+            ('POST', r'/schedule', self.create_schedule),
+            ('GET', r'/schedule/(?P<schedule_id>\d+)', self.get_schedule),
+            ('PUT', r'/schedule/(?P<schedule_id>\d+)', self.update_schedule),
+            ('DELETE', r'/schedule/(?P<schedule_id>\d+)', self.delete_schedule),
+            ('GET', r'/reports', self.list_reports),
+            ('GET', r'/reports/(?P<slug>[a-z-]+)', self.get_report),
+        ]
+        self.routes = [(method, re.compile(f"^{pattern}$"), handler) for method, pattern, handler in self.routes]
+
+    async def serve(self):
+        """Accept connections until stop_event is set (Ctrl+C or SIGTERM)"""
+        import asyncio
+        import signal
+        self.stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop_event.set)
+            except (NotImplementedError, RuntimeError, ValueError):
+                pass        # Windows / not the main thread: Ctrl+C raises KeyboardInterrupt instead
+        server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = server.sockets[0].getsockname()[1]
+        print(f"🌐 ClassIFY API on http://{self.host}:{self.port}/ ({self.pool.db_path})", flush=True)
+        print(f"🔑 Token: {self.token}  (send 'Authorization: Bearer <token>')", flush=True)
+        async with server:
+            await self.stop_event.wait()
+        print(f"🛑 API stopped after {self.requests} request(s)", flush=True)
+
+    async def handle_connection(self, reader, writer):
+        """One client connection - HTTP/1.1 requests in turn while it keeps the connection alive"""
+        import asyncio
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), API_IDLE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    break
+                except (ValueError, asyncio.LimitOverrunError):
+                    # readline() refuses lines longer than the stream limit
+                    await self.send(writer, 414, *api_json({'error': "Request line too long"}), keep_alive=False)
+                    break
+                if not request_line.strip():
+                    break
+                headers = {}
+                try:
+                    for count in itertools.count():
+                        line = await reader.readline()
+                        if line in (b'\r\n', b'\n', b''):
+                            break
+                        if count >= API_MAX_HEADERS:
+                            raise ValueError("too many header lines")
+                        name, _, value = line.decode('latin-1').partition(':')
+                        headers[name.strip().lower()] = value.strip()
+                except (ValueError, asyncio.LimitOverrunError):
+                    await self.send(writer, 431, *api_json({'error': "Request headers too large"}), keep_alive=False)
+                    break
+                parts = request_line.decode('latin-1').split()
+                length = headers.get('content-length', '0')
+                if len(parts) != 3 or not (length.isascii() and length.isdigit()):
+                    await self.send(writer, 400, *api_json({'error': "Malformed request"}), keep_alive=False)
+                    break
+                method, target, version = parts
+                length = int(length)
+                if length > API_MAX_BODY:
+                    await self.send(writer, 413, *api_json({'error': f"Body over {API_MAX_BODY} bytes"}),
+                                    keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+
+                if self.authorized(headers):
+                    status, payload, etag = await self.dispatch(method, target, body)
+                else:
+                    status, payload, etag = 401, api_json({'error': "Missing or wrong API token"})[0], None
+                self.requests += 1
+                # Unchanged since the client's copy - answer with the tag alone
+                if etag and status == 200 and method == 'GET':
+                    known = [tag.strip().removeprefix('W/') for tag in headers.get('if-none-match', '').split(',')]
+                    if etag in known or '*' in known:
+                        status, payload = 304, b''
+                await self.send(writer, status, payload, etag, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def authorized(self, headers):
+        """Authorization: Bearer <token>, compared in constant time"""
+        import hmac
+        scheme, _, token = headers.get('authorization', '').partition(' ')
+        return scheme.lower() == 'bearer' and hmac.compare_digest(token.strip().encode('utf-8'),
+                                                                  self.token.encode('utf-8'))
+
+    async def send(self, writer, status, payload, etag=None, keep_alive=True):
+        from http import HTTPStatus
+        lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+        if status == 401:
+            lines.append('WWW-Authenticate: Bearer realm="ClassIFY"')
+        if status not in (204, 304):
+            lines += ["Content-Type: application/json; charset=utf-8", f"Content-Length: {len(payload)}"]
+        if etag:
+            lines += [f"ETag: {etag}", "Cache-Control: no-cache"]
+        if not keep_alive:
+            lines.append("Connection: close")
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + payload)
+        await writer.drain()
+
+    async def dispatch(self, method, target, body):
+        """Route one request - returns (status, JSON body, ETag or None)"""
+        from urllib.parse import urlsplit, parse_qs, unquote
+        url = urlsplit(target)
+        path = url.path.rstrip('/') or '/'
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        allowed = []
+        for route_method, pattern, handler in self.routes:
+            match = pattern.match(path)
+            if not match:
+                continue
+            if route_method != method:
+                allowed.append(route_method)
+                continue
+            try:
+                data = json.loads(body) if body else {}
+                params = {name: unquote(value) for name, value in match.groupdict().items()}
+                status, (payload, etag) = await handler(query=query, data=data, **params)
+                return status, payload, etag if method == 'GET' else None
+            except ApiError as e:
+                return e.status, api_json({'error': str(e)})[0], None
+            except json.JSONDecodeError as e:
+                return 400, api_json({'error': f"Body is not valid JSON: {e}"})[0], None
+            except DatabaseBusyError as e:
+                return 503, api_json({'error': str(e)})[0], None
+            except sqlite3.IntegrityError as e:
+                return 409, api_json({'error': f"Conflicts with existing data: {e}"})[0], None
+            except (sqlite3.Error, ValueError, TypeError) as e:
+                print(f"⚠️ API {method} {path} failed: {e}")
+                return 500, api_json({'error': str(e)})[0], None
+        if allowed:
+            return 405, api_json({'error': f"{method} not allowed here - use {', '.join(allowed)}"})[0], None
+        return 404, api_json({'error': f"No such resource: {path}"})[0], None
+
+    def fields(self, data, columns, current=None, required=()):
+        """Request body -> {column: value}; a PUT's missing fields keep their `current` values"""
+        if not isinstance(data, dict):
+            raise ApiError(400, "Expected a JSON object")
+        unknown = sorted(set(data) - set(columns))
+        if unknown:
+            raise ApiError(400, f"Unknown field(s): {', '.join(unknown)} - expected {', '.join(columns)}")
+        numbers = ('Units', 'EffortMinutes')
+        wrong = sorted(column for column, value in data.items()
+                       if column not in numbers and value is not None and not isinstance(value, str))
+        if wrong:
+            raise ApiError(400, f"Expected text or null for: {', '.join(wrong)}")
+        # The forms only offer the fixed lists - any other name would get a code the views do not know
+        for column, known in (('Priority', PRIORITY_IDS), ('Status', STATUS_IDS)):
+            if column in data and data[column] not in known:
+                raise ApiError(400, f"{column} must be one of {', '.join(known)}")
+        values = {column: None for column in columns}
+        values.update(current or {})
+        values.update(data)
+        missing = [column for column in required if values[column] in (None, '')]
+        if missing:
+            raise ApiError(400, f"Missing field(s): {', '.join(missing)}")
+        # Same checks as the forms, so API saves look like GUI ones
+        try:
+            if values.get('Deadline'):
+                values['Deadline'] = date.fromisoformat(values['Deadline']).isoformat()
+            for column in ('TermStart', 'TermEnd'):
+                if values.get(column):
+                    values[column] = date.fromisoformat(values[column]).isoformat()
+            if 'Day' in values and values['Day'] not in DAYS:
+                raise ApiError(400, f"Day must be one of {', '.join(DAYS)}")
+            if 'StartTime' in values:
+                for column in ('StartTime', 'EndTime'):
+                    values[column] = datetime.strptime(values[column], '%H:%M').strftime('%H:%M')
+                if values['EndTime'] <= values['StartTime']:
+                    raise ApiError(400, "EndTime must be after StartTime")
+            RecurrenceRule.parse(values.get('Recurrence'))
+            for column in numbers:
+                if values.get(column) is not None:
+                    values[column] = int(values[column])
+        except (ValueError, TypeError) as e:
+            raise ApiError(400, f"Invalid value: {e}") from e
+        return values
+
+    # SUBJECTS
+    async def list_subjects(self, query, data):
+        return 200, await self.pool.read(lambda db: api_json(api_rows('subjects', db.get_subjects())), 'subjects')
+
+    async def get_subject(self, query, data, code):
+        def work(db):
+            row = db.get_subject_by_code(code)
+            if row is None:
+                raise ApiError(404, f"No subject {code}")
+            return api_json(api_rows('subjects', [row])[0])
+        return 200, await self.pool.read(work)
+
+    async def create_subject(self, query, data):
+        values = self.fields(data, TABLE_COLUMNS['subjects'], required=('SubjectCode', 'Name'))
+
+        def work(db):
+            db.add_subject(*(values[c] for c in TABLE_COLUMNS['subjects']))
+            return api_json(api_rows('subjects', [db.get_subject_by_code(values['SubjectCode'])])[0])
+        return 201, await self.pool.write(work)
+
+    async def update_subject(self, query, data, code):
+        def work(db):
+            row = db.get_subject_by_code(code)
+            if row is None:
+                raise ApiError(404, f"No subject {code}")
+            values = self.fields(data, TABLE_COLUMNS['subjects'], dict(zip(API_COLUMNS['subjects'], row)),
+                                 required=('SubjectCode', 'Name'))
+            if not db.update_subject(code, *(values[c] for c in TABLE_COLUMNS['subjects'])):
+                raise ApiError(409, f"SubjectCode {values['SubjectCode']} is already in use")
+            return api_json(api_rows('subjects', [db.get_subject_by_code(values['SubjectCode'])])[0])
+        return 200, await self.pool.write(work)
+
+    async def delete_subject(self, query, data, code):
+        def work(db):
+            if db.get_subject_by_code(code) is None:
+                raise ApiError(404, f"No subject {code}")
+            db.delete_subject(code, confirm=False)
+            return b'', None
+        return 204, await self.pool.write(work)
+
+    # TASKS
+    async def list_tasks(self, query, data):
+        subject = query.get('subject')
+        return 200, await self.pool.read(lambda db: api_json(api_rows('tasks', db.get_tasks(subject))),
+                                         ('tasks', subject))
+
+    async def get_task(self, query, data, task_id):
+        def work(db):
+            row = db.get_task(int(task_id))
+            if row is None:
+                raise ApiError(404, f"No task {task_id}")
+            return api_json(api_rows('task', [row])[0])
+        return 200, await self.pool.read(work)
+
+    async def create_task(self, query, data):
+        values = self.fields(data, TABLE_COLUMNS['tasks'], {'Priority': 'Medium', 'Status': 'Not Started'},
+                             required=('SubjectCode', 'TaskName', 'Deadline'))
+
+        def work(db):
+            if db.get_subject_by_code(values['SubjectCode']) is None:
+                raise ApiError(400, f"No subject {values['SubjectCode']}")
+            task_id = db.add_task(*(values[c] for c in TABLE_COLUMNS['tasks']))
+            return api_json(api_rows('task', [db.get_task(task_id)])[0])
+        return 201, await self.pool.write(work)
+
+    async def update_task(self, query, data, task_id):
+        def work(db):
+            row = db.get_task(int(task_id))
+            if row is None:
+                raise ApiError(404, f"No task {task_id}")
+            values = self.fields(data, TABLE_COLUMNS['tasks'], dict(zip(API_COLUMNS['task'][1:], row[1:])),
+                                 required=('SubjectCode', 'TaskName'))
+            if db.get_subject_by_code(values['SubjectCode']) is None:
+                raise ApiError(400, f"No subject {values['SubjectCode']}")
+            db.update_task(int(task_id), *(values[c] for c in TABLE_COLUMNS['tasks']))
+            return api_json(api_rows('task', [db.get_task(int(task_id))])[0])
+        return 200, await self.pool.write(work)
+
+    async def delete_task(self, query, data, task_id):
+        def work(db):
+            if db.get_task(int(task_id)) is None:
+                raise ApiError(404, f"No task {task_id}")
+            db.delete_task(int(task_id))
+            return b'', None
+        return 204, await self.pool.write(work)
+
+    # SCHEDULE
+    async def list_schedule(self, query, data):
+        day = query.get('day')
+        return 200, await self.pool.read(lambda db: api_json(api_rows('schedule', db.get_schedule(day))),
+                                         ('schedule', day))
+
+    async def get_schedule(self, query, data, schedule_id):
+        def work(db):
+            row = db.get_schedule_entry(int(schedule_id))
+            if row is None:
+                raise ApiError(404, f"No schedule entry {schedule_id}")
+            return api_json(api_rows('schedule', [row])[0])
+        return 200, await self.pool.read(work)
+
+    async def create_schedule(self, query, data):
+        values = self.fields(data, TABLE_COLUMNS['schedule'], required=('SubjectCode', 'Day', 'StartTime', 'EndTime'))
+
+        def work(db):
+            if db.get_subject_by_code(values['SubjectCode']) is None:
+                raise ApiError(400, f"No subject {values['SubjectCode']}")
+            schedule_id = db.add_schedule(*(values[c] for c in TABLE_COLUMNS['schedule']))
+            return api_json(api_rows('schedule', [db.get_schedule_entry(schedule_id)])[0])
+        return 201, await self.pool.write(work)
+
+    async def update_schedule(self, query, data, schedule_id):
+        def work(db):
+            row = db.get_schedule_entry(int(schedule_id))
+            if row is None:
+                raise ApiError(404, f"No schedule entry {schedule_id}")
+            current = {c: v for c, v in zip(API_COLUMNS['schedule'], row) if c in TABLE_COLUMNS['schedule']}
+            values = self.fields(data, TABLE_COLUMNS['schedule'], current,
+                                 required=('SubjectCode', 'Day', 'StartTime', 'EndTime'))
+            if db.get_subject_by_code(values['SubjectCode']) is None:
+                raise ApiError(400, f"No subject {values['SubjectCode']}")
+            db.update_schedule(int(schedule_id), *(values[c] for c in TABLE_COLUMNS['schedule']))
+            return api_json(api_rows('schedule', [db.get_schedule_entry(int(schedule_id))])[0])
+        return 200, await self.pool.write(work)
+
+    async def delete_schedule(self, query, data, schedule_id):
+        def work(db):
+            if db.get_schedule_entry(int(schedule_id)) is None:
+                raise ApiError(404, f"No schedule entry {schedule_id}")
+            db.delete_schedule(int(schedule_id))
+            return b'', None
+        return 204, await self.pool.write(work)
+
+    # REPORTS
+    async def list_reports(self, query, data):
+        return 200, api_json([{'report': name, 'path': f"/reports/{report_slug(name)}", 'columns': list(columns),
+                               'include_archive': name in ARCHIVE_REPORTS}
+                              for name, (_, columns) in REPORTS.items()])
+
+    async def get_report(self, query, data, slug):
+        report_type = next((name for name in REPORTS if report_slug(name) == slug), None)
+        if report_type is None:
+            raise ApiError(404, f"No report {slug} - see /reports")
+        method, columns = REPORTS[report_type]
+        include_archive = query.get('include_archive') in ('1', 'true') and report_type in ARCHIVE_REPORTS
+
+        def work(db):
+            rows = getattr(db, method)(include_archive=True) if include_archive else getattr(db, method)()
+            return api_json({'report': report_type, 'columns': list(columns),
+                             'rows': [dict(zip(columns, row)) for row in rows]})
+        return 200, await self.pool.read(work, ('report', report_type, include_archive))
+
+
+class ToastReminderSink: # Shows reminders as a toast inside the ClassIFY window
+
+    def __init__(self, app):
+        self.app = app
+
+    def notify(self, title, message):
+        self.app.show_toast(f"{title}: {message}")
+
+
+class DesktopReminderSink: # Sends reminders to the desktop notification service, if one is available
+
+    def __init__(self):
+        import shutil
+        if shutil.which('notify-send'):
+            self.command = lambda title, message: ['notify-send', '--app-name=ClassIFY', title, message]
+        elif shutil.which('osascript'):
+            self.command = lambda title, message: ['osascript', '-e',
+                                                   f'display notification {json.dumps(message)} with title {json.dumps(title)}']
+        else:
+            self.command = None
+
+    def notify(self, title, message):
+        if self.command is None:
+            print(f"🔔 {title}: {message}")
+            return
+        import subprocess
+        try:
+            subprocess.Popen(self.command(title, message), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except OSError as e:
+            print(f"⚠️ Desktop notification failed: {e}")
+
+
+class LogFileReminderSink: # Appends reminders to a log file
+
+    def __init__(self, path=REMINDER_LOG_FILE):
+        self.path = path
+
+    def notify(self, title, message):
+        try:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}  {title}: {message}\n")
+        except OSError as e:
+            print(f"⚠️ Could not write reminder log: {e}")
+
+
+def make_reminder_sinks(names, app=None):
+    """Build sinks from a comma-separated list such as 'toast,log'"""
+    sinks = []
+    for name in (n.strip() for n in names.split(',') if n.strip()):
+        if name == 'toast' and app is not None:
+            sinks.append(ToastReminderSink(app))
+        elif name == 'desktop':
+            sinks.append(DesktopReminderSink())
+        elif name == 'log':
+            sinks.append(LogFileReminderSink())
+    return sinks
+
+
+class ReminderScheduler: # Min-heap of upcoming deadlines and class starts, driven by one root.after timer
+
+    def __init__(self, db, root, sinks):
+        self.db = db
+        self.root = root
+        self.sinks = sinks
+        self.heap = []              # [due, seq, key, title, message, active] - ordered by due time
+        self.by_key = {}            # ('task' | 'class', id) -> heap entries, for incremental updates
+        self.counter = itertools.count()
+        self.timer = None
+        self.timer_due = None
+        self.horizon_end = None
+        self.loaded_on = None
+        self.delivered = set()      # (key, due) already shown today - reloads re-read them, but never repeat them
+
+    def reload(self):
+        """Rebuild the heap for the next REMINDER_HORIZON_DAYS"""
+        self.heap = []
+        self.by_key = {}
+        today = date.today()
+        if today != self.loaded_on:
+            self.delivered = set()
+        self.loaded_on = today
+        self.horizon_end = today + timedelta(days=REMINDER_HORIZON_DAYS)
+        for _, task in self.db.iter_task_occurrences(today, self.horizon_end):
+            self.add_task_occurrence(task)
+        for day, entry in self.db.iter_schedule_occurrences(today, self.horizon_end):
+            self.add_class_occurrence(day, entry)
+        heapq.heapify(self.heap)
+        self.arm()
+
+    def add_task_occurrence(self, task):
+        if task[9] == STATUS_IDS['Completed']:
+            return
+        due = datetime.combine(date.fromisoformat(task[3]), datetime.strptime(REMINDER_TASK_TIME, '%H:%M').time())
+        self.push(('task', task[0]), due, "📝 Due today", f"{task[2]} ({task[1]})")
+
+    def add_class_occurrence(self, day, entry):
+        start = datetime.combine(day, datetime.strptime(entry[3], '%H:%M').time())
+        if start <= datetime.now():
+            return
+        due = start - timedelta(minutes=REMINDER_CLASS_LEAD_MINUTES)
+        self.push(('class', entry[0]), due, "🕒 Class soon",
+                  f"{entry[1]} starts at {entry[3]}" + (f" in {entry[5]}" if entry[5] else ""))
+
+    def push(self, key, due, title, message):
+        if (key, due) in self.delivered:
+            return
+        item = [due, next(self.counter), key, title, message, True]
+        self.by_key.setdefault(key, []).append(item)
+        heapq.heappush(self.heap, item)
+
+    def remove(self, key):
+        """Drop every pending reminder for a task/class (lazy deletion - popped later)"""
+        for item in self.by_key.pop(key, []):
+            item[5] = False
+
+    def refresh_task(self, task_id):
+        """Re-read one task after it was saved or deleted"""
+        self.remove(('task', task_id))
+        for _, task in self.db.iter_task_occurrences(date.today(), self.horizon_end, task_id=task_id):
+            self.add_task_occurrence(task)
+        self.arm()
+
+    def refresh_tasks(self, task_ids):
+        """Re-read many tasks after a bulk action - one occurrence scan instead of one per task"""
+        task_ids = set(task_ids)
+        for task_id in task_ids:
+            self.remove(('task', task_id))
+        for _, task in self.db.iter_task_occurrences(date.today(), self.horizon_end):
+            if task[0] in task_ids:
+                self.add_task_occurrence(task)
+        self.arm()
+
+    def refresh_class(self, schedule_id):
+        """Re-read one schedule entry after it was saved or deleted"""
+        self.remove(('class', schedule_id))
+        for day, entry in self.db.iter_schedule_occurrences(date.today(), self.horizon_end, schedule_id=schedule_id):
+            self.add_class_occurrence(day, entry)
+        self.arm()
+
+    def pending(self):
+        """Active reminders in due order"""
+        return [item[:5] for item in sorted(self.heap) if item[5]]
+
+    def arm(self):
+        """Point the single timer at the earliest active reminder (or the daily reload)"""
+        while self.heap and not self.heap[0][5]:
+            heapq.heappop(self.heap)
+        if self.root is None:
+            return
+        
+        next_reload = datetime.combine(date.today() + timedelta(days=1), datetime.min.time())
+        due = min(self.heap[0][0], next_reload) if self.heap else next_reload
+        if self.timer is not None and due == self.timer_due:
+            return
+        if self.timer is not None:
+            self.root.after_cancel(self.timer)
+        delay_ms = max(0, int((due - datetime.now()).total_seconds() * 1000))
+        self.timer = self.root.after(delay_ms, self.fire)
+        self.timer_due = due
+
+    def fire(self):
+        """Deliver everything that is due, then re-arm"""
+        self.timer = None
+        self.timer_due = None
+        now = datetime.now()
+        while self.heap and self.heap[0][0] <= now:
+            item = heapq.heappop(self.heap)
+            due, _, key, title, message, active = item
+            if not active:
+                continue
+            pending = self.by_key.get(key, [])
+            if item in pending:
+                pending.remove(item)
+            if (key, due) in self.delivered:
+                continue
+            self.delivered.add((key, due))
+            for sink in self.sinks:
+                sink.notify(title, message)
+        if now.date() != self.loaded_on:
+            self.reload()       # a new day started - slide the horizon forward
         else:
-            query = """SELECT t.*, s.Name FROM tasks t 
-                      JOIN subjects s ON t.SubjectCode = s.SubjectCode 
-                      ORDER BY t.Deadline"""
-            self.cursor.execute(query)
-        return self.cursor.fetchall()
-    
-    def get_todays_tasks(self):
-        """Get tasks due today"""
-        today = str(date.today())
-        query = """SELECT t.*, s.SubjectCode, s.Name FROM tasks t 
-                  JOIN subjects s ON t.SubjectCode = s.SubjectCode 
-                  WHERE t.Deadline = ? 
-                  ORDER BY CASE t.Priority WHEN 'High' THEN 1 WHEN 'Medium' THEN 2 ELSE 3 END"""
-        self.cursor.execute(query, (today,))
-        return self.cursor.fetchall()
-    
-    def add_task(self, subject_code, task_name, deadline, priority, status):
-        """Add a new task using SubjectCode as FK"""
-        self.cursor.execute(
-            """INSERT INTO tasks (SubjectCode, TaskName, Deadline, Priority, Status)
-               VALUES (?, ?, ?, ?, ?)""",
-            (subject_code, task_name, deadline, priority, status)
-        )
-        self.conn.commit()
-        return self.cursor.lastrowid
+            self.arm()
+
+    def stop(self):
+        if self.timer is not None:
+            self.root.after_cancel(self.timer)
+            self.timer = None
+
+
+def write_report_csv(filename, report_type, columns, rows):
+    """Write one report as CSV, streaming the rows - returns the row count"""
+    import csv
+    count = 0
+    with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow([f"ClassIFY Report: {report_type}"])
+        writer.writerow([f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"])
+        writer.writerow([])
+        writer.writerow(columns)
+        
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+        
+        writer.writerow([])
+        writer.writerow([f"Total records: {count}"])
+    return count
+
+
+def run_report_job(db_path, report_type, filename, include_archive=False):
+    """Process-pool worker: run one report on its own read-only connection and write it to a file"""
+    started = time.perf_counter()
+    result = {'database': db_path, 'report': report_type, 'file': filename, 'rows': 0, 'error': None}
+    try:
+        db = Database(db_path, readonly=True)
+        try:
+            method, columns = REPORTS[report_type]
+            partial = filename + '.partial'
+            rows = getattr(db, method)(include_archive=True) if include_archive and report_type in ARCHIVE_REPORTS \
+                else getattr(db, method)()
+            result['rows'] = write_report_csv(partial, report_type, columns, rows)
+            os.replace(partial, filename)
+        finally:
+            db.close()
+    except (sqlite3.Error, OSError) as e:
+        result['error'] = str(e)
+    result['seconds'] = round(time.perf_counter() - started, 4)
+    return result
+
+
+def run_report_batch(db_paths, out_dir, report_types=None, workers=None, include_archive=False):
+    """Run the reports for every database in a process pool - writes the CSVs and a manifest, returns it"""
+    from concurrent.futures import ProcessPoolExecutor
+    report_types = list(report_types or REPORTS)
+    started = time.perf_counter()
     
-    def update_task(self, task_id, subject_code, task_name, deadline, priority, status):
-        """Update a task using TaskID"""
-        self.cursor.execute(
-            """UPDATE tasks SET SubjectCode=?, TaskName=?, Deadline=?, Priority=?, Status=?
-               WHERE TaskID=?""",
-            (subject_code, task_name, deadline, priority, status, task_id)
-        )
-        self.conn.commit()
+    jobs = []
+    used = set()
+    for db_path in db_paths:
+        # One folder per database; same-named files from different folders get a path hash suffix
+        folder = os.path.splitext(os.path.basename(db_path))[0]
+        if folder in used:
+            folder += '-' + hashlib.sha1(os.path.abspath(db_path).encode('utf-8')).hexdigest()[:6]
+        used.add(folder)
+        os.makedirs(os.path.join(out_dir, folder), exist_ok=True)
+        for report_type in report_types:
+            filename = os.path.join(out_dir, folder, report_type.replace(' ', '_') + '.csv')
+            jobs.append((db_path, report_type, filename, include_archive))
     
-    def delete_task(self, task_id):
-        """Delete a task by TaskID"""
-        self.cursor.execute("DELETE FROM tasks WHERE TaskID = ?", (task_id,))
-        self.conn.commit()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_report_job, *job) for job in jobs]
+        results = [future.result() for future in futures]
     
-    def get_schedule(self, day=None):
-        """Get schedule entries, optionally filtered by day using SubjectCode as FK"""
-        if day:
-            query = """SELECT s.*, subj.Name FROM schedule s
-                      JOIN subjects subj ON s.SubjectCode = subj.SubjectCode
-                      WHERE s.Day = ? ORDER BY s.StartTime"""
-            self.cursor.execute(query, (day,))
+    manifest = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'databases': len(db_paths),
+        'reports': report_types,
+        'workers': workers or os.cpu_count(),
+        'include_archive': include_archive,
+        'seconds': round(time.perf_counter() - started, 4),
+        'rows': sum(r['rows'] for r in results),
+        'errors': sum(1 for r in results if r['error']),
+        'jobs': results,
+    }
+    with open(os.path.join(out_dir, REPORT_MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def run_write_stress_worker(db_path, worker, operations):
+    """Process-pool worker for stress-writes: add_task then update_task, `operations` times"""
+    db = Database(db_path, seed=False, write_files=False)
+    result = {'worker': worker, 'added': [], 'updated': 0, 'failed': 0, 'latencies': []}
+    try:
+        subject = db.conn.execute("SELECT SubjectCode FROM subjects ORDER BY SubjectCode LIMIT 1").fetchone()[0]
+        started = time.perf_counter()
+        for n in range(operations):
+            name = f"stress {worker}-{n}"
+            try:
+                begin = time.perf_counter()
+                task_id = db.add_task(subject, name, '2025-12-01', 'Low', 'Not Started')
+                result['added'].append(task_id)
+                db.update_task(task_id, subject, name, '2025-12-01', 'High', 'Completed')
+                result['updated'] += 1
+                result['latencies'].append(time.perf_counter() - begin)
+            except DatabaseBusyError:
+                result['failed'] += 1
+        result['seconds'] = time.perf_counter() - started
+        result['retries'] = db.write_retries
+    finally:
+        db.close()
+    return result
+
+
+class TaskAnalytics: # Tasks as compact column arrays - aggregates are single passes over the columns
+
+    def __init__(self, db, use_numpy=True):
+        self.db = db
+        self.np = numpy_module() if use_numpy else None
+        self.engine = 'numpy' if self.np is not None else 'array'
+        self.load()
+
+    def load(self):
+        """Read the tasks table once into columns (dates as day ordinals, codes as small ints).
+
+        Repeating tasks keep their anchor date in the deadline column and are flagged in `repeating`;
+        the per-week and lateness figures expand their rules (kept in `repeats`) instead."""
+        from array import array
+        # julianday() - 1721424.5 is the proleptic ordinal used by date.toordinal()
+        rows = self.db.read_conn.execute(
+            f"""SELECT SubjectCode, CAST(Day - 1721424.5 AS INTEGER), Priority, StatusID, Recurrence
+               FROM (SELECT s.SubjectCode, julianday(t.Deadline) AS Day, {PRIORITY_RANK_SQL} AS Priority,
+                            COALESCE(t.StatusID, {STATUS_IDS['Not Started']}) AS StatusID, t.Recurrence
+                     FROM tasks t JOIN subjects s ON s.SubjectID = t.SubjectID)
+               WHERE Day IS NOT NULL""").fetchall()
+        codes, days, priorities, statuses, recurrences = zip(*rows) if rows else ((), (), (), (), ())
+        
+        self.subjects = list(dict.fromkeys(codes))     # subject index -> SubjectCode
+        subject_index = {code: i for i, code in enumerate(self.subjects)}
+        deadline = array('l', days)
+        subject = array('l', map(subject_index.__getitem__, codes))
+        status = array('l', statuses)
+        priority = array('b', priorities)
+        repeating = array('b', bytes(len(days)))
+        self.repeats = []                              # (row, anchor date, RecurrenceRule) per repeating task
+        for i, text in enumerate(recurrences):
+            try:
+                rule = RecurrenceRule.parse(text)
+            except ValueError:
+                continue                               # malformed rule - counted at its deadline like a one-off
+            if rule is not None:
+                repeating[i] = 1
+                self.repeats.append((i, date.fromordinal(days[i]), rule))
+        
+        if self.np is not None:
+            np = self.np
+            deadline, subject = np.asarray(deadline, dtype=np.int64), np.asarray(subject, dtype=np.int64)
+            status, priority = np.asarray(status, dtype=np.int64), np.asarray(priority, dtype=np.int8)
+            repeating = np.asarray(repeating, dtype=bool)
+        self.deadline, self.subject, self.status, self.priority = deadline, subject, status, priority
+        self.repeating = repeating
+
+    def __len__(self):
+        return len(self.deadline)
+
+    def tasks_per_week(self, start=None, weeks=ANALYTICS_WEEKS):
+        """[(week Monday, tasks due that week)] for `weeks` weeks from the week of `start` - a repeating
+        task counts once per occurrence"""
+        start = start or date.today()
+        monday = start.toordinal() - start.weekday()
+        if self.np is not None:
+            np = self.np
+            week = (self.deadline - monday) // 7
+            counts = np.bincount(week[~self.repeating & (week >= 0) & (week < weeks)], minlength=weeks).tolist()
         else:
-            query = """SELECT s.*, subj.Name FROM schedule s
-                      JOIN subjects subj ON s.SubjectCode = subj.SubjectCode
-                      ORDER BY 
-                      CASE s.Day 
-                          WHEN 'Mon' THEN 1
-                          WHEN 'Tue' THEN 2
-                          WHEN 'Wed' THEN 3
-                          WHEN 'Thu' THEN 4
-                          WHEN 'Fri' THEN 5
-                          WHEN 'Sat' THEN 6
-                          WHEN 'Sun' THEN 7
-                          ELSE 8
-                      END,
-                      s.StartTime"""
-            self.cursor.execute(query)
-        return self.cursor.fetchall()
-    
-    def get_todays_schedule(self):
-        """Get today's schedule based on current weekday"""
-        today = date.today()
-        weekday_num = today.weekday()
-        days = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
-        today_day = days[weekday_num]
-        return self.get_schedule(today_day)
-    
-    def add_schedule(self, subject_code, day, start_time, end_time, room):
-        """Add a new schedule entry using SubjectCode as FK"""
-        self.cursor.execute(
-            """INSERT INTO schedule (SubjectCode, Day, StartTime, EndTime, Room)
-               VALUES (?, ?, ?, ?, ?)""",
-            (subject_code, day, start_time, end_time, room)
-        )
-        self.conn.commit()
-        return self.cursor.lastrowid
-    
-    def update_schedule(self, schedule_id, subject_code, day, start_time, end_time, room):
-        """Update a schedule entry using ScheduleID"""
-        self.cursor.execute(
-            """UPDATE schedule SET SubjectCode=?, Day=?, StartTime=?, EndTime=?, Room=?
-               WHERE ScheduleID=?""",
-            (subject_code, day, start_time, end_time, room, schedule_id)
-        )
-        self.conn.commit()
-    
-    def delete_schedule(self, schedule_id):
-        """Delete a schedule entry by ScheduleID"""
-        self.cursor.execute("DELETE FROM schedule WHERE ScheduleID = ?", (schedule_id,))
-        self.conn.commit()
-    
-    # REPORT QUERIES - Updated to match requested filters
-    def get_all_subjects_with_tasks(self):
-        """Report: All subjects with their tasks"""
-        query = """SELECT s.SubjectCode, s.Name, s.Instructor, s.Units,
-                  GROUP_CONCAT(t.TaskName || ' (Due: ' || t.Deadline || ', ' || t.Status || ')', '; ') as Tasks
-                  FROM subjects s
-                  LEFT JOIN tasks t ON s.SubjectCode = t.SubjectCode
-                  GROUP BY s.SubjectCode, s.Name, s.Instructor, s.Units
-                  ORDER BY s.SubjectCode"""
-        self.cursor.execute(query)
-        return self.cursor.fetchall()
-    
-    def get_upcoming_tasks(self):
-        """Report: Upcoming tasks (from tomorrow forward)"""
-        query = """SELECT t.TaskName, t.Deadline, t.Priority, t.Status, s.SubjectCode, s.Name
-                  FROM tasks t
-                  JOIN subjects s ON t.SubjectCode = s.SubjectCode
-                  WHERE date(t.Deadline) > date('now')
-                  ORDER BY date(t.Deadline) ASC"""
-        self.cursor.execute(query)
-        return self.cursor.fetchall()
-    
-    def get_tasks_today(self):
-        """Report: Tasks due today"""
-        query = """SELECT t.TaskName, t.Deadline, t.Priority, t.Status, s.SubjectCode, s.Name
-                  FROM tasks t
-                  JOIN subjects s ON t.SubjectCode = s.SubjectCode
-                  WHERE date(t.Deadline) = date('now')
-                  ORDER BY t.Priority DESC"""
-        self.cursor.execute(query)
-        return self.cursor.fetchall()
-    
-    def get_completed_tasks(self):
-        """Report: Completed tasks"""
-        query = """SELECT t.TaskName, t.Deadline, t.Priority, t.Status, s.SubjectCode, s.Name
-                  FROM tasks t
-                  JOIN subjects s ON t.SubjectCode = s.SubjectCode
-                  WHERE t.Status = 'Completed'
-                  ORDER BY t.Deadline DESC"""
-        self.cursor.execute(query)
-        return self.cursor.fetchall()
-    
-    def get_missing_tasks(self):
-        """Report: Missing/overdue tasks (past deadline and not completed)"""
-        query = """SELECT t.TaskName, t.Deadline, t.Priority, t.Status, s.SubjectCode, s.Name
-                  FROM tasks t
-                  JOIN subjects s ON t.SubjectCode = s.SubjectCode
-                  WHERE date(t.Deadline) < date('now') AND t.Status != 'Completed'
-                  ORDER BY t.Deadline ASC"""
-        self.cursor.execute(query)
-        return self.cursor.fetchall()
-    
-    def get_schedule_for_today(self):
-        """Report: Schedule for today"""
-        today = date.today()
-        weekday_num = today.weekday()
-        days = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
-        today_day = days[weekday_num]
+            counts = [0] * weeks
+            for day, repeating in zip(self.deadline, self.repeating):
+                week = (day - monday) // 7
+                if not repeating and 0 <= week < weeks:
+                    counts[week] += 1
+        first, last = date.fromordinal(monday), date.fromordinal(monday + 7 * weeks - 1)
+        for _, anchor, rule in self.repeats:
+            for day in rule.occurrences(anchor, first, last):
+                counts[(day.toordinal() - monday) // 7] += 1
+        return [(date.fromordinal(monday + 7 * i), counts[i]) for i in range(weeks)]
+
+    def completion_by_subject(self):
+        """[(SubjectCode, completed, total, rate)] sorted by SubjectCode"""
+        size = len(self.subjects)
+        if self.np is not None:
+            np = self.np
+            totals = np.bincount(self.subject, minlength=size).tolist()
+            done = np.bincount(self.subject[self.status == STATUS_IDS['Completed']], minlength=size).tolist()
+        else:
+            totals, done = [0] * size, [0] * size
+            for subject, status in zip(self.subject, self.status):
+                totals[subject] += 1
+                if status == STATUS_IDS['Completed']:
+                    done[subject] += 1
+        return sorted((code, done[i], totals[i], done[i] / totals[i] if totals[i] else 0.0)
+                      for i, code in enumerate(self.subjects))
+
+    def completion_rate(self):
+        """Share of all tasks that are completed"""
+        if not len(self):
+            return 0.0
+        if self.np is not None:
+            return float((self.status == STATUS_IDS['Completed']).mean())
+        return self.status.count(STATUS_IDS['Completed']) / len(self)
+
+    def lateness(self, today=None):
+        """(overdue open tasks, average days overdue, most days overdue)
+
+        There is no completion date column, so lateness is measured on open tasks past their deadline.
+        A repeating task is only overdue once its series has ended, counted from its last occurrence
+        (the rule the task views and the Missing Tasks report use)."""
+        today = today or date.today()
+        ended = (rule.ended_on(anchor, today) for i, anchor, rule in self.repeats
+                 if self.status[i] != STATUS_IDS['Completed'])
+        repeat_late = [today.toordinal() - day.toordinal() for day in ended if day is not None]
+        today = today.toordinal()
+        if self.np is not None:
+            np = self.np
+            late = today - self.deadline[~self.repeating & (self.status != STATUS_IDS['Completed'])
+                                         & (self.deadline < today)]
+            late = np.concatenate((late, np.asarray(repeat_late, dtype=np.int64)))
+            if not len(late):
+                return 0, 0.0, 0
+            return int(len(late)), float(late.mean()), int(late.max())
+        late = [today - day for day, status, repeating in zip(self.deadline, self.status, self.repeating)
+                if not repeating and status != STATUS_IDS['Completed'] and day < today] + repeat_late
+        if not late:
+            return 0, 0.0, 0
+        return len(late), sum(late) / len(late), max(late)
+
+    def priority_mix(self):
+        """{priority name: task count}, Low to High"""
+        if self.np is not None:
+            counts = self.np.bincount(self.priority, minlength=len(PRIORITY_IDS)).tolist()
+        else:
+            counts = [self.priority.count(rank) for rank in range(len(PRIORITY_IDS))]
+        return {name: counts[rank] for name, rank in PRIORITY_IDS.items()}
+
+
+def to_minutes(hhmm):
+    """'HH:MM' -> minutes after midnight"""
+    hours, minutes = hhmm.split(':')
+    return int(hours) * 60 + int(minutes)
+
+
+def from_minutes(minutes):
+    """Minutes after midnight -> 'HH:MM'"""
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+class StudyPlanner: # Fits study sessions for open tasks into the free time around classes
+
+    def __init__(self, db, day_start=PLANNER_DAY_START, day_end=PLANNER_DAY_END):
+        self.db = db
+        self.day_start = to_minutes(day_start)
+        self.day_end = to_minutes(day_end)
+
+    def free_blocks(self, start, end, now=None):
+        """[[date, start minute, end minute]] of free time per day in [start, end], in time order"""
+        busy = {}
+        for day, entry in self.db.iter_schedule_occurrences(start, end):
+            busy.setdefault(day, []).append((entry[10], entry[11]))
+        
+        blocks = []
+        day = start
+        while day <= end:
+            cursor = self.day_start
+            if now is not None and day == now.date():
+                cursor = max(cursor, -(-(now.hour * 60 + now.minute) // 5) * 5)   # next 5-minute mark
+            # Classes come out of the expansion sorted by start time; walk them once, merging overlaps
+            for class_start, class_end in busy.get(day, ()):
+                class_start = min(class_start, self.day_end)
+                if class_start - cursor >= PLANNER_MIN_SESSION_MINUTES:
+                    blocks.append([day, cursor, class_start])
+                cursor = max(cursor, class_end)
+            if self.day_end - cursor >= PLANNER_MIN_SESSION_MINUTES:
+                blocks.append([day, cursor, self.day_end])
+            day += timedelta(days=1)
+        return blocks
+
+    def open_work(self, start, end, now):
+        """[(due date, -priority rank, task row, minutes still needed)] for open tasks due in [start, end]"""
+        efforts = dict(self.db.read_conn.execute("SELECT TaskID, EffortMinutes FROM tasks"))
+        # Sessions that already started count as done and are kept by save()
+        done = {}
+        for task_id, due, minutes in self.db.read_conn.execute(
+                """SELECT TaskID, DueDate, SUM((strftime('%s', EndTime) - strftime('%s', StartTime)) / 60)
+                   FROM study_sessions WHERE SessionDate || ' ' || StartTime < ?
+                   GROUP BY TaskID, DueDate""", (now.strftime('%Y-%m-%d %H:%M'),)):
+            done[(task_id, due)] = minutes
+        
+        work = []
+        for day, task in self.db.iter_task_occurrences(start, end):
+            if task[9] == STATUS_IDS['Completed']:
+                continue
+            effort = efforts.get(task[0]) or PLANNER_DEFAULT_EFFORT[task[8]]
+            needed = effort - done.get((task[0], task[3]), 0)
+            if needed > 0:
+                work.append((day, -task[8], task, needed))
+        return work
+
+    def plan(self, start=None, days=PLANNER_HORIZON_DAYS, now=None):
+        """Earliest-deadline-first fill of the free blocks - returns (sessions, shortfalls)
+
+        sessions are (TaskID, DueDate, date, start minute, end minute); shortfalls are
+        (task row, minutes that did not fit before the deadline)."""
+        now = now or datetime.now()
+        start = start or now.date()
+        end = start + timedelta(days=days)
+        blocks = self.free_blocks(start, end, now)
+        work = sorted(self.open_work(start, end, now), key=lambda w: (w[0], w[1], w[2][0]))
+        
+        sessions, shortfalls = [], []
+        first = 0                                   # blocks before this one are used up
+        for due, _, task, needed in work:
+            i = first
+            while needed > 0 and i < len(blocks) and blocks[i][0] <= due:
+                day, block_start, block_end = blocks[i]
+                length = min(needed, PLANNER_MAX_SESSION_MINUTES, block_end - block_start)
+                if length < min(needed, PLANNER_MIN_SESSION_MINUTES):
+                    i += 1
+                    continue
+                sessions.append((task[0], task[3], day, block_start, block_start + length))
+                needed -= length
+                blocks[i][1] = block_start + length + PLANNER_BREAK_MINUTES
+                if block_end - blocks[i][1] < PLANNER_MIN_SESSION_MINUTES:
+                    i += 1
+            while first < len(blocks) and blocks[first][2] - blocks[first][1] < PLANNER_MIN_SESSION_MINUTES:
+                first += 1
+            if needed > 0:
+                shortfalls.append((task, needed))
+        sessions.sort(key=lambda session: (session[2], session[3]))
+        return sessions, shortfalls
+
+    def save(self, sessions, now=None):
+        """Replace the sessions that have not started yet with a new plan"""
+        now = now or datetime.now()
+        
+        def replace(conn):
+            conn.execute("DELETE FROM study_sessions WHERE SessionDate || ' ' || StartTime >= ?",
+                         (now.strftime('%Y-%m-%d %H:%M'),))
+            conn.executemany(
+                "INSERT INTO study_sessions (TaskID, DueDate, SessionDate, StartTime, EndTime) VALUES (?, ?, ?, ?, ?)",
+                [(task_id, due, day.isoformat(), from_minutes(begin), from_minutes(finish))
+                 for task_id, due, day, begin, finish in sessions])
+        
+        self.db.write(replace)
+
+
+class RefreshScheduler: # Writes mark tables dirty; one debounced pass repaints the affected views once
+
+    def __init__(self, root, repaint, on_flush=None):
+        self.root = root
+        self.repaint = repaint          # called with the set of dirty tables
+        self.on_flush = on_flush
+        self.dirty = set()
+        self.timer = None
+        self.first_mark = None
+        self.requests = 0               # mark() calls
+        self.passes = 0                 # repaint passes actually run
+
+    @property
+    def coalesced(self):
+        """Refresh requests absorbed into another pass"""
+        return self.requests - self.passes - (1 if self.dirty else 0)
+
+    def mark(self, *tables):
+        """Note that tables changed - the repaint happens once things go quiet"""
+        self.dirty.update(tables)
+        self.requests += 1
+        now = time.monotonic()
+        if self.timer is None:
+            self.first_mark = now
+        elif (now - self.first_mark) * 1000 < REFRESH_MAX_WAIT_MS:
+            self.root.after_cancel(self.timer)     # still bursting - push the repaint back
+        else:
+            return                                  # waited long enough - let the armed pass run
+        self.timer = self.root.after(REFRESH_DEBOUNCE_MS, self.flush)
+
+    def flush(self):
+        """Repaint every dirty view once"""
+        self.timer = None
+        tables, self.dirty = self.dirty, set()
+        if not tables:
+            return
+        self.passes += 1
+        self.repaint(tables)
+        if self.on_flush:
+            self.on_flush(self)
+
+
+class ClassTicker: # "Now / next class" line, kept current by one timer re-armed at the next class boundary
+
+    def __init__(self, db, root, show):
+        self.db = db
+        self.root = root
+        self.show = show                # called with the new text
+        self.text = ""
+        self.timer = None
+
+    def update(self):
+        """Look up the current and next class, show them and arm the timer for the next start, end or midnight"""
+        if self.timer is not None:
+            self.root.after_cancel(self.timer)
+        now = datetime.now()
+        current, upcoming = self.db.get_now_and_next(now)
+        boundaries = [24 * 60]          # midnight - a new day's classes
+        parts = []
+        if current:
+            parts.append(f"🟢 Now: {current[1]} until {current[4]}" + (f" in {current[5]}" if current[5] else ""))
+            boundaries.append(current[11])
+        if upcoming:
+            day, entry = upcoming
+            if day == now.date():
+                parts.append(f"⏭️ Next: {entry[1]} at {entry[3]}" + (f" in {entry[5]}" if entry[5] else ""))
+                boundaries.append(entry[10])
+            else:
+                parts.append(f"⏭️ Next: {entry[1]} on {day.strftime('%a %b %d')} at {entry[3]}")
+        self.text = "     ".join(parts) or "No classes coming up"
+        self.show(self.text)
         
-        query = """SELECT s.SubjectCode, sub.Name, s.StartTime, s.EndTime, s.Room
-                  FROM schedule s
-                  JOIN subjects sub ON s.SubjectCode = sub.SubjectCode
-                  WHERE s.Day = ?
-                  ORDER BY s.StartTime"""
-        self.cursor.execute(query, (today_day,))
-        return self.cursor.fetchall()
-    
-    def close(self):
-        """Close database connection"""
-        if self.conn:
-            self.conn.close()
+        seconds_now = now.hour * 3600 + now.minute * 60 + now.second + now.microsecond / 1_000_000
+        delay_ms = int((min(boundaries) * 60 - seconds_now) * 1000) + 50     # just past the boundary minute
+        self.timer = self.root.after(max(delay_ms, 50), self.update)
+
+
+class SubjectIndex: # Sorted, case-folded prefix index over subject codes and names
+
+    def __init__(self, subjects):
+        """Build from (SubjectCode, Name, ...) rows"""
+        self.displays = {}                  # SubjectCode -> "CODE - Name"
+        self.codes = {}                     # case-folded code or display -> SubjectCode
+        entries = []
+        for code, name, *_ in subjects:
+            display = f"{code} - {name}"
+            self.displays[code] = display
+            self.codes[code.casefold()] = code
+            self.codes[display.casefold()] = code
+            # The code, the whole name and every word of the name are searchable prefixes
+            folded_name = (name or '').casefold()
+            for key in {code.casefold(), folded_name, *folded_name.split()}:
+                entries.append((key, display))
+        entries.sort()
+        self.keys = [key for key, _ in entries]
+        self.values = [display for _, display in entries]
+        self.ordered = sorted(self.displays.values(), key=str.casefold)
+
+    def search(self, text, limit=SUBJECT_PICKER_LIMIT):
+        """Up to `limit` "CODE - Name" strings whose code, name or a name word starts with text"""
+        import bisect
+        prefix = text.strip().casefold()
+        if not prefix:
+            return self.ordered[:limit]
+        found = []
+        seen = set()
+        for i in range(bisect.bisect_left(self.keys, prefix), len(self.keys)):
+            if not self.keys[i].startswith(prefix):
+                break
+            display = self.values[i]
+            if display not in seen:
+                seen.add(display)
+                found.append(display)
+                if len(found) >= limit:
+                    break
+        return found
+
+    def code_for(self, text):
+        """SubjectCode for an exact code or "CODE - Name" entry, else None"""
+        return self.codes.get(text.strip().casefold())
+
+
+class SubjectPicker(ttk.Combobox): # Type-ahead subject combobox - narrows its list on each keystroke
+
+    NAVIGATION_KEYS = {'Up', 'Down', 'Return', 'KP_Enter', 'Escape', 'Tab', 'Left', 'Right', 'Home', 'End'}
+
+    def __init__(self, master, index_source, extra_options=(), **kwargs):
+        super().__init__(master, **kwargs)
+        self.index_source = index_source    # callable returning the current SubjectIndex
+        self.extra_options = list(extra_options)
+        self.bind('<KeyRelease>', self.on_key)
+        self.bind('<Return>', self.on_return)
+        self.narrow('')
+
+    def narrow(self, text):
+        """Show the top matches for text"""
+        self['values'] = self.extra_options + self.index_source().search(text)
+
+    def on_key(self, event):
+        if event.keysym not in self.NAVIGATION_KEYS:
+            self.narrow(self.get())
+
+    def on_return(self, event):
+        """Enter picks the best match for what was typed"""
+        if self.get() not in self.extra_options and self.selected_code() is None:
+            matches = self.index_source().search(self.get(), 1)
+            if not matches:
+                return
+            self.set(matches[0])
+        self.event_generate('<<ComboboxSelected>>')
+
+    def selected_code(self):
+        """SubjectCode of the current entry, or None if it is not a known subject"""
+        return self.index_source().code_for(self.get())
+
+
+class DashboardSnapshot: # The dashboard's data from the last run, kept on disk for an instant first paint
+
+    QUERIES = {
+        'classes': lambda db: db.get_todays_schedule(),
+        'todos': lambda db: db.get_todo_rows(),
+        'subjects': lambda db: db.get_subjects(),
+        'markers': lambda db: db.get_deadline_markers(date.today().replace(day=1),
+                                                      date.today().replace(day=1) + timedelta(days=DASHBOARD_MARKER_DAYS - 1)),
+    }
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.path = os.path.splitext(os.path.abspath(db_path))[0] + DASHBOARD_SNAPSHOT_SUFFIX
+
+    @classmethod
+    def collect(cls, db, keys=None):
+        """Query the dashboard rows - {key: list of rows}"""
+        return {key: [list(row) for row in cls.QUERIES[key](db)] for key in keys or cls.QUERIES}
+
+    def signature(self):
+        """(size, mtime) of the database file and its WAL - any commit changes one of them"""
+        stats = []
+        for path in (self.db_path, self.db_path + '-wal'):
+            try:
+                info = os.stat(path)
+                stats.append([info.st_size, info.st_mtime_ns])
+            except OSError:
+                stats.append(None)
+        return stats
+
+    def save(self, data):
+        """Write the snapshot - call after the database is closed so the signature sees the final file"""
+        snapshot = {'format': DASHBOARD_SNAPSHOT_FORMAT, 'day': date.today().isoformat(),
+                    'signature': self.signature(), 'data': data}
+        try:
+            with open(self.path + '.partial', 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, separators=(',', ':'))
+            os.replace(self.path + '.partial', self.path)
+        except OSError as e:
+            print(f"⚠️ Could not save the dashboard snapshot: {e}")
+
+    def load(self):
+        """The saved data, or None when there is none, it is from another day or the database changed since"""
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if (snapshot.get('format') != DASHBOARD_SNAPSHOT_FORMAT or snapshot.get('day') != date.today().isoformat()
+                or snapshot.get('signature') != self.signature()):
+            return None
+        return snapshot['data']
 
 
 class ClassifyApp:
-    """Main application class with SubjectCode as primary key for all tables"""
+    """Main application class - subjects are picked and shown by SubjectCode"""
     
-    def __init__(self, root):
+    def __init__(self, root, db_path='ClassIFY.db', seed=True, reminders=REMINDER_SINKS):
         self.root = root
         self.root.title("Class-i-fy: A student organizer built just for YOU")
         self.root.geometry("1400x900")
@@ -470,8 +3627,14 @@ class ClassifyApp:
             "💫 The expert in anything was once once a beginner. - Helen Hayes"
         ]
         
-        # Initialize database
-        self.db = Database()
+        # The database opens on a worker thread (start_database_loader); until then the
+        # dashboard paints from last run's snapshot if the database has not changed since
+        self.db = None
+        self.snapshot = DashboardSnapshot(db_path)
+        self.dashboard_data = self.snapshot.load()
+        self.subject_index = None       # built on first use by get_subject_index()
+        self.backups = BackupManager(db_path)
+        self.maintenance = MaintenanceManager(db_path)
         
         # Setup styles
         self.setup_styles()
@@ -489,11 +3652,98 @@ class ClassifyApp:
         # Create content area
         self.create_content_area()
         
-        # Show dashboard initially
-        self.show_dashboard()
+        # Show dashboard initially - from the snapshot, or a loading note until the database is open
+        if self.dashboard_data is not None:
+            self.show_dashboard()
+        else:
+            tk.Label(self.content_frame, text="Loading your organizer...", font=self.fonts['subheader'],
+                     bg=self.colors['soft_pink'], fg=self.colors['deep_maroon']).pack(pady=60)
+        for text, btn in self.nav_buttons.items():
+            if text != "🏠 Home":
+                btn.state(['disabled'])
+        
+        self.start_database_loader(db_path, seed, reminders)
+    
+    def start_database_loader(self, db_path, seed, reminders):
+        """Open the database (schema, seeding, SQL files) on a worker thread"""
+        result = {}
+        
+        def worker():
+            try:
+                result['db'] = Database(db_path, seed=seed, check_same_thread=False)
+            except Exception as e:
+                result['error'] = e
+        
+        loader = threading.Thread(target=worker, name='ClassIFY-startup', daemon=True)
+        loader.start()
+        self.root.after(20, lambda: self.check_database_loader(loader, result, reminders))
+    
+    def check_database_loader(self, loader, result, reminders):
+        """Poll the loader thread; once the database is open, finish starting up"""
+        if loader.is_alive():
+            self.root.after(20, lambda: self.check_database_loader(loader, result, reminders))
+            return
+        if 'error' in result:
+            messagebox.showerror("Error", f"Could not open the database: {result['error']}")
+            self.root.destroy()
+            return
+        self.db = result['db']
+        self.finish_startup(reminders)
+    
+    def finish_startup(self, reminders):
+        """Everything that needs the open database - then live data replaces the snapshot"""
+        for btn in self.nav_buttons.values():
+            btn.state(['!disabled'])
         
         # Setup keyboard shortcuts
         self.setup_shortcuts()
+        
+        # Arm the automatic online backup and the periodic maintenance check
+        self.schedule_backup()
+        self.schedule_maintenance(MAINTENANCE_FIRST_CHECK_MS)
+        
+        # Watch for changes made by other processes (another window, the CLI, a sync)
+        self.start_change_poller()
+        
+        # Deadline and class reminders
+        self.reminders = ReminderScheduler(self.db, self.root, make_reminder_sinks(reminders, self))
+        self.reminders.reload()
+        
+        # Views repainted after writes, coalesced into one pass per burst
+        self.refresher = RefreshScheduler(self.root, self.refresh_views, self.update_refresh_counter)
+        
+        # Now / next class on the dashboard
+        self.ticker = ClassTicker(self.db, self.root, self.show_now_next)
+        self.ticker.update()
+        
+        self.dashboard_data = None
+        if self.get_current_page() == "🏠 Home":
+            self.show_dashboard()
+    
+    def show_now_next(self, text):
+        """Ticker callback - the label only exists while the dashboard is shown"""
+        label = getattr(self, 'now_next_label', None)
+        if label is not None and label.winfo_exists():
+            label.config(text=text)
+    
+    def shutdown(self):
+        """Close the database and keep this run's dashboard data for the next start"""
+        if self.db is None:
+            return                      # closed while still loading
+        try:
+            data = DashboardSnapshot.collect(self.db)
+        except sqlite3.Error as e:
+            print(f"⚠️ Could not read the dashboard for the snapshot: {e}")
+            data = None
+        self.db.close()
+        if data is not None:
+            self.snapshot.save(data)
+    
+    def dashboard_rows(self, key):
+        """Rows for a dashboard card - from the snapshot while the database is still opening"""
+        if self.dashboard_data is not None:
+            return self.dashboard_data[key]
+        return DashboardSnapshot.collect(self.db, [key])[key]
     
     def setup_styles(self):
         """Configure premium styles with larger fonts"""
@@ -568,6 +3818,17 @@ class ClassifyApp:
                               fg='white',
                               pady=35)
         title_label.pack(expand=True)
+        
+        self.refresh_counter_label = tk.Label(header_frame, text="",
+                                              font=('Arial', 10),
+                                              bg=self.colors['deep_maroon'],
+                                              fg=self.colors['soft_pink'])
+        self.refresh_counter_label.place(relx=1.0, rely=1.0, anchor='se', x=-10, y=-5)
+    
+    def update_refresh_counter(self, refresher):
+        """Show how many view refreshes were saved by coalescing"""
+        self.refresh_counter_label.config(
+            text=f"🔄 {refresher.passes} refresh(es), {refresher.coalesced} coalesced")
     
     def create_navigation(self):
         """Create premium navigation"""
@@ -580,7 +3841,8 @@ class ClassifyApp:
             ("📚 Subjects", self.show_subjects),
             ("✔ Tasks", self.show_tasks),
             ("🕒 Schedule", self.show_schedule),
-            ("📁 Records", self.show_records)
+            ("📁 Records", self.show_records),
+            ("📊 Analytics", self.show_analytics)
         ]
         
         for text, command in nav_items:
@@ -588,6 +3850,12 @@ class ClassifyApp:
             btn.pack(side='left', padx=5)
             self.nav_buttons[text] = btn
         
+        # Undo / redo of the last saves (Ctrl+Z / Ctrl+Y)
+        ttk.Button(nav_frame, text="↪️ Redo", command=self.redo,
+                  style='Secondary.TButton').pack(side='right', padx=5)
+        ttk.Button(nav_frame, text="↩️ Undo", command=self.undo,
+                  style='Secondary.TButton').pack(side='right', padx=5)
+        
         self.set_active_nav("🏠 Home")
     
     def set_active_nav(self, active_button):
@@ -612,6 +3880,13 @@ class ClassifyApp:
         self.clear_content()
         self.set_active_nav("🏠 Home")
         
+        # Now / next class - kept current by the ticker once the database is open
+        ticker = getattr(self, 'ticker', None)
+        self.now_next_label = tk.Label(self.content_frame, text=ticker.text if ticker else "",
+                                       font=self.fonts['subheader'], bg=self.colors['soft_pink'],
+                                       fg=self.colors['deep_maroon'])
+        self.now_next_label.pack(fill='x', pady=(0, 15))
+        
         #Motivational quote
         import random
         quote_frame = tk.Frame(self.content_frame, bg=self.colors['dusty_pink'], height=80)
@@ -636,6 +3911,9 @@ class ClassifyApp:
         right_column = tk.Frame(main_content, bg=self.colors['soft_pink'])
         right_column.pack(side='right', fill='both', expand=True, padx=(15, 0))
         
+        # Card content frames by callback name, for partial refreshes
+        self.dashboard_cards = {}
+        
         #Today's Classes - Full width
         self.create_card(left_column, "📚 Today's Classes", self.colors['deep_crimson'], 
                         self.get_todays_classes_content, pady=(0, 20), width=600)
@@ -673,10 +3951,11 @@ class ClassifyApp:
         content_frame.pack(fill='both', expand=True)
         
         content_callback(content_frame)
+        self.dashboard_cards[content_callback.__name__] = (content_frame, content_callback)
     
     def get_subjects_goals_content(self, parent):
         """Content for Subjects with Goals card - full width - EXACT FROM SECOND CODE"""
-        subjects = self.db.get_subjects()
+        subjects = self.dashboard_rows('subjects')
         
         if not subjects:
             no_subjects = tk.Label(parent,
@@ -731,7 +4010,7 @@ class ClassifyApp:
     
     def get_todays_classes_content(self, parent):
         """Content for Today's Classes card showing SubjectCode - full width - EXACT FROM SECOND CODE"""
-        schedule = self.db.get_todays_schedule()
+        schedule = self.dashboard_rows('classes')
         
         if not schedule:
             no_classes = tk.Label(parent,
@@ -760,7 +4039,7 @@ class ClassifyApp:
     
     def get_todays_todos_content(self, parent):
         """Content for Today's To-Dos card showing SubjectCode - full width - EXACT FROM SECOND CODE"""
-        tasks = self.db.get_todays_tasks()
+        tasks = self.dashboard_rows('todos')      # get_todo_rows() - text and priority come from the query
         
         if not tasks:
             no_tasks = tk.Label(parent,
@@ -772,26 +4051,21 @@ class ClassifyApp:
             no_tasks.pack(expand=True, pady=30)
             return
         
+        # Color code by priority
+        priority_colors = {
+            'High': self.colors['high_priority'],      # '#FF4444' (RED)
+            'Medium': self.colors['medium_priority'],  # '#FFAA66' (ORANGE)
+            'Low': self.colors['low_priority']         # '#66CC66' (GREEN)
+        }
         for i, task in enumerate(tasks):
             bg_color = self.colors['accent_light'] if i % 2 == 0 else self.colors['card_bg']
             task_frame = tk.Frame(parent, bg=bg_color)
             task_frame.pack(fill='x', pady=8)
             
-            # Color code by priority
-            priority_color = {
-                'High': self.colors['high_priority'],      # '#FF4444' (RED)
-                'Medium': self.colors['medium_priority'],  # '#FFAA66' (ORANGE)
-                'Low': self.colors['low_priority']         # '#66CC66' (GREEN)
-            }.get(task[4], self.colors['text_primary'])
-            
-            # Check if overdue
-            if datetime.strptime(task[3], '%Y-%m-%d').date() < date.today():
-                priority_color = self.colors['high_priority']  # '#FF4444' (RED)
-            
-            status_icon = '✅' if task[5] == 'Completed' else '⏳' if task[5] == 'In Progress' else '📝'
-            task_text = f"{status_icon} {task[2]}\n   📚 {task[6]} ({task[1]})"
+            # Every to-do falls on today, so none of them is overdue
+            priority_color = priority_colors.get(task[4], self.colors['text_primary'])
             task_label = tk.Label(task_frame,
-                                 text=task_text,
+                                 text=task[10],
                                  font=self.fonts['normal'],
                                  bg=bg_color,
                                  fg=priority_color,
@@ -802,8 +4076,8 @@ class ClassifyApp:
     def get_calendar_content(self, parent):
         """Content for Calendar card - shows tasks with SubjectCode - EXACT FROM SECOND CODE"""
         # Try to use tkcalendar if available
-        try:
-            from tkcalendar import Calendar
+        Calendar = calendar_class()
+        if Calendar is not None:
             calendar_frame = tk.Frame(parent, bg=self.colors['card_bg'])
             calendar_frame.pack(fill='both', expand=True)
             
@@ -820,11 +4094,16 @@ class ClassifyApp:
                           height=300)
             cal.pack(fill='both', expand=True, padx=10, pady=10)
             
+            # Mark the days with open tasks due
+            cal.tag_config('deadline', background=self.colors['dusty_pink'], foreground='white')
+            for day, count in self.dashboard_rows('markers'):
+                cal.calevent_create(date.fromisoformat(day), f"{count} task(s) due", 'deadline')
+            
             # Bind click event
             cal.bind('<<CalendarSelected>>', self.on_calendar_date_selected)
             self.calendar = cal
             
-        except ImportError:
+        else:
             # Fallback calendar
             fallback_label = tk.Label(parent,
                                      text="Install tkcalendar for enhanced calendar:\npip install tkcalendar",
@@ -845,20 +4124,33 @@ class ClassifyApp:
                                   bg=self.colors['card_bg'],
                                   fg=self.colors['deep_maroon'])
             month_label.pack(pady=10)
+            
+            month = today.strftime('%Y-%m')
+            due = sum(count for day, count in self.dashboard_rows('markers') if day.startswith(month))
+            tk.Label(month_frame, text=f"{due} open task(s) due this month",
+                    font=self.fonts['normal'], bg=self.colors['card_bg'],
+                    fg=self.colors['text_secondary']).pack()
     
     def on_calendar_date_selected(self, event):
         """Handle calendar date selection - shows tasks with SubjectCode"""
+        if self.db is None:
+            return                      # still opening - the snapshot has no per-day details
         selected_date = self.calendar.get_date()
         
-        # Get tasks for selected date using SubjectCode
-        tasks = self.db.get_tasks()
-        date_tasks = [t for t in tasks if t[3] == selected_date]
+        # Get tasks for selected date using SubjectCode (repeating tasks expanded for that day only)
+        day = date.fromisoformat(selected_date)
+        date_tasks = [task for _, task in self.db.iter_task_occurrences(day, day)]
+        
+        sessions = self.db.get_study_sessions(day)
         
         if date_tasks:
             task_list = "\n".join([f"• {task[2]} ({task[1]}) - Priority: {task[4]}" for task in date_tasks])
-            messagebox.showinfo(f"Tasks for {selected_date}", task_list)
         else:
-            messagebox.showinfo(f"Tasks for {selected_date}", "No tasks due on this date")
+            task_list = "No tasks due on this date"
+        if sessions:
+            task_list += "\n\nStudy sessions:\n" + "\n".join(
+                f"• {start}-{end} {name} ({code}, due {due})" for _, start, end, name, code, due in sessions)
+        messagebox.showinfo(f"Tasks for {selected_date}", task_list)
     
     def show_toast(self, message):
         """Show a success toast message"""
@@ -1047,7 +4339,7 @@ class ClassifyApp:
                 self.db.add_subject(data['code'], data['name'], data['instructor'], units, data['goals'])
                 self.show_toast("Subject added successfully!")
                 dialog.destroy()
-                self.load_subjects_data()
+                self.refresher.mark('subjects')
             except sqlite3.IntegrityError:
                 messagebox.showerror("Error", "Subject code already exists!")
         
@@ -1166,7 +4458,8 @@ class ClassifyApp:
                 if success:
                     self.show_toast("Subject updated successfully!")
                     dialog.destroy()
-                    self.load_subjects_data()
+                    self.refresher.mark('subjects', 'tasks', 'schedule')
+                    self.reminders.reload()
                 else:
                     messagebox.showerror("Error", "Subject code already exists!")
             except Exception as e:
@@ -1193,7 +4486,8 @@ class ClassifyApp:
         # Database method shows confirmation dialog
         if self.db.delete_subject(subject_code):
             self.show_toast("Subject deleted successfully!")
-            self.load_subjects_data()
+            self.refresher.mark('subjects', 'tasks', 'schedule')
+            self.reminders.reload()
     
     def show_tasks(self):
         """Show tasks management page - SIMPLE CRUD INTERFACE"""
@@ -1220,13 +4514,25 @@ class ClassifyApp:
         ttk.Button(control_frame, text="🗑️ Delete Task", 
                   command=self.delete_task, style='Secondary.TButton').pack(side='left', padx=5)
         
+        # Bulk actions on every selected task (Ctrl/Shift-click to select several)
+        ttk.Button(control_frame, text="✅ Mark Completed",
+                  command=lambda: self.bulk_update_tasks(status='Completed'),
+                  style='Secondary.TButton').pack(side='left', padx=5)
+        priority_button = ttk.Button(control_frame, text="⚑ Set Priority", style='Secondary.TButton')
+        priority_button.configure(command=lambda: self.choose_bulk_priority(priority_button))
+        priority_button.pack(side='left', padx=5)
+        ttk.Button(control_frame, text="📅 Move Deadline",
+                  command=self.move_task_deadlines, style='Secondary.TButton').pack(side='left', padx=5)
+        ttk.Button(control_frame, text="🧠 Plan Study Time", 
+                  command=self.plan_study_sessions, style='Secondary.TButton').pack(side='left', padx=5)
+        
         # Filter by subject
         tk.Label(control_frame, text="Filter by Subject:", 
                 bg=self.colors['soft_pink'], font=self.fonts['small']).pack(side='left', padx=(30, 10))
         
         self.task_filter_var = tk.StringVar(value="All Subjects")
-        self.task_filter_combo = ttk.Combobox(control_frame, textvariable=self.task_filter_var, 
-                                             state='readonly', width=30)
+        self.task_filter_combo = SubjectPicker(control_frame, self.get_subject_index, ["All Subjects"],
+                                              textvariable=self.task_filter_var, width=30)
         self.task_filter_combo.pack(side='left')
         self.task_filter_combo.bind('<<ComboboxSelected>>', lambda e: self.refresh_tasks_table())
         
@@ -1238,9 +4544,7 @@ class ClassifyApp:
     
     def load_task_filter_options(self):
         """Load subjects into filter dropdown"""
-        subjects = self.db.get_subjects()
-        options = ["All Subjects"] + [f"{code} - {name}" for code, name, *_ in subjects]
-        self.task_filter_combo['values'] = options
+        self.task_filter_combo.narrow('')
     
     def create_tasks_table(self):
         """Create tasks table with Treeview - SIMPLE DESIGN"""
@@ -1250,7 +4554,7 @@ class ClassifyApp:
         # Create treeview
         columns = ('ID', 'Subject', 'Task Name', 'Deadline', 'Priority', 'Status')
         self.tasks_tree = ttk.Treeview(table_container, columns=columns, show='headings', 
-                                      height=15, style='Pastel.Treeview')
+                                      height=15, style='Pastel.Treeview', selectmode='extended')
         
         # Configure columns
         for col in columns:
@@ -1289,37 +4593,20 @@ class ClassifyApp:
         # Get filter
         filter_value = self.task_filter_var.get()
         
-        if filter_value == "All Subjects":
-            tasks = self.db.get_tasks()
+        subject_code = self.task_filter_combo.selected_code()
+        if filter_value == "All Subjects" or not subject_code:
+            rows = self.db.get_task_rows()
         else:
-            subject_code = filter_value.split(' - ')[0]
-            tasks = self.db.get_tasks(subject_code)
+            rows = self.db.get_task_rows(subject_code)
         
         # Store mapping of tree item IDs to database TaskIDs
         self.task_id_mapping = {}
         
-        # Insert tasks into treeview
-        for i, task in enumerate(tasks):
-            task_id = task[0]  # TaskID from database
-            subject_code = task[1]  # SubjectCode
-            task_name = task[2]  # TaskName
-            deadline = task[3]  # Deadline
-            priority = task[4]  # Priority
-            status = task[5]  # Status
-            subject_name = task[6]  # Subject Name from join
-            
-            # Determine tag for coloring
-            tag = 'high' if priority == 'High' else 'medium' if priority == 'Medium' else 'low'
-            if status == 'Completed':
-                tag = 'completed'
-            elif deadline and datetime.strptime(deadline, '%Y-%m-%d').date() < date.today() and status != 'Completed':
-                tag = 'overdue'
-            
-            values = (task_id, f"{subject_code} - {subject_name}", task_name, deadline, priority, status)
-            item_id = self.tasks_tree.insert('', 'end', values=values, tags=(tag,))
-            
-            # Store mapping
-            self.task_id_mapping[item_id] = task_id
+        # Insert tasks into treeview - labels and colour tags come ready-made from the query
+        insert = self.tasks_tree.insert
+        mapping = self.task_id_mapping
+        for row in rows:
+            mapping[insert('', 'end', values=row[:6], tags=(row[6],))] = row[0]
         
         # Configure tag colors
         self.tasks_tree.tag_configure('high', foreground=self.colors['high_priority'])
@@ -1328,6 +4615,80 @@ class ClassifyApp:
         self.tasks_tree.tag_configure('completed', foreground=self.colors['success'])
         self.tasks_tree.tag_configure('overdue', foreground=self.colors['high_priority'], background='#FFE6E6')
     
+    def selected_task_ids(self):
+        """{tree item: TaskID} for the selected rows of the tasks table"""
+        return {item: self.task_id_mapping[item] for item in self.tasks_tree.selection()
+                if item in self.task_id_mapping}
+    
+    def refresh_task_rows(self, items):
+        """Repaint just these rows from the database - deleted tasks are dropped, moved deadlines re-sorted"""
+        rows = {row[0]: row for row in self.db.get_task_rows(task_ids=items.values())}
+        moved = []
+        for item, task_id in items.items():
+            row = rows.get(task_id)
+            if row is None:
+                self.tasks_tree.delete(item)
+                del self.task_id_mapping[item]
+                continue
+            old_deadline = self.tasks_tree.set(item, 'Deadline')
+            self.tasks_tree.item(item, values=row[:6], tags=(row[6],))
+            if row[3] != old_deadline:
+                moved.append(item)
+        
+        if moved:
+            # The table is ordered by deadline - put moved rows back in place
+            import bisect
+            self.tasks_tree.detach(*moved)
+            deadlines = [self.tasks_tree.set(item, 'Deadline') for item in self.tasks_tree.get_children()]
+            for item in sorted(moved, key=lambda item: self.tasks_tree.set(item, 'Deadline')):
+                position = bisect.bisect_right(deadlines, self.tasks_tree.set(item, 'Deadline'))
+                deadlines.insert(position, self.tasks_tree.set(item, 'Deadline'))
+                self.tasks_tree.move(item, '', position)
+    
+    def bulk_update_tasks(self, **changes):
+        """Apply one change to every selected task in a single transaction"""
+        items = self.selected_task_ids()
+        if not items:
+            messagebox.showwarning("Warning", "Please select one or more tasks!")
+            return
+        try:
+            changed = self.db.update_tasks(items.values(), **changes)
+        except sqlite3.Error as e:
+            messagebox.showerror("Error", f"Failed to update tasks: {str(e)}")
+            return
+        self.reminders.refresh_tasks(items.values())
+        self.refresh_task_rows(items)
+        self.show_toast(f"{changed} task(s) updated!")
+    
+    def choose_bulk_priority(self, button):
+        """Drop-down of priorities under the Set Priority button"""
+        menu = tk.Menu(self.root, tearoff=0)
+        for priority in ('High', 'Medium', 'Low'):
+            menu.add_command(label=priority, command=lambda p=priority: self.bulk_update_tasks(priority=p))
+        menu.tk_popup(button.winfo_rootx(), button.winfo_rooty() + button.winfo_height())
+    
+    def move_task_deadlines(self):
+        """Move the selected tasks' deadlines by a number of days or to one date"""
+        if not self.selected_task_ids():
+            messagebox.showwarning("Warning", "Please select one or more tasks!")
+            return
+        from tkinter import simpledialog
+        answer = simpledialog.askstring("Move Deadline",
+                                        "Move by days (e.g. +7 or -2) or to a date (YYYY-MM-DD):",
+                                        parent=self.root)
+        if not answer:
+            return
+        answer = answer.strip()
+        if re.fullmatch(r'[+-]?\d+', answer):
+            self.bulk_update_tasks(shift_days=int(answer))
+            return
+        try:
+            datetime.strptime(answer, '%Y-%m-%d')
+        except ValueError:
+            messagebox.showerror("Error", "Enter a number of days like +7, or a date in YYYY-MM-DD format!")
+            return
+        self.bulk_update_tasks(deadline=answer)
+    
     def create_task(self):
         """Create a new task - opens form dialog"""
         self.task_form_dialog("Create New Task")
@@ -1338,6 +4699,10 @@ class ClassifyApp:
         if not selected:
             messagebox.showwarning("Warning", "Please select a task to edit!")
             return
+        if len(selected) > 1:
+            messagebox.showwarning("Warning", "Please select only one task to edit - "
+                                   "use the bulk buttons to change several at once!")
+            return
         
         # Get task ID from mapping
         item_id = selected[0]
@@ -1347,43 +4712,68 @@ class ClassifyApp:
         
         task_id = self.task_id_mapping[item_id]
         
-        # Get task details from tree
-        task_data = self.tasks_tree.item(item_id)['values']
+        # Get task details from the database (the tree shows decorated values)
+        task = self.db.get_task(task_id)
+        if not task:
+            messagebox.showerror("Error", "Could not find task data!")
+            return
+        subject = self.db.get_subject_by_code(task[1])
+        task_data = (task[0], f"{task[1]} - {subject[1]}", task[2], task[3], task[4], task[5], task[6], task[7])
         
         # Open edit dialog
         self.task_form_dialog("Edit Task", task_id=task_id, task_data=task_data)
     
     def delete_task(self):
-        """Delete selected task"""
+        """Delete the selected task(s)"""
         selected = self.tasks_tree.selection()
         if not selected:
             messagebox.showwarning("Warning", "Please select a task to delete!")
             return
         
-        # Get task ID from mapping
-        item_id = selected[0]
-        if item_id not in self.task_id_mapping:
+        # Get task IDs from mapping
+        items = self.selected_task_ids()
+        if not items:
             messagebox.showerror("Error", "Could not find task data!")
             return
         
-        task_id = self.task_id_mapping[item_id]
-        task_name = self.tasks_tree.item(item_id)['values'][2]
-        
         # Confirm deletion
-        if messagebox.askyesno("Confirm Delete", 
-                              f"Are you sure you want to delete task:\n\n'{task_name}'?"):
+        if len(items) == 1:
+            task_name = self.tasks_tree.item(next(iter(items)))['values'][2]
+            question = f"Are you sure you want to delete task:\n\n'{task_name}'?"
+        else:
+            question = f"Are you sure you want to delete these {len(items)} tasks?"
+        if messagebox.askyesno("Confirm Delete", question):
             try:
-                self.db.delete_task(task_id)
-                self.show_toast("Task deleted successfully!")
-                self.refresh_tasks_table()
+                deleted = self.db.delete_tasks(items.values())
+                for task_id in items.values():
+                    self.reminders.remove(('task', task_id))
+                self.refresh_task_rows(items)
+                self.show_toast("Task deleted successfully!" if len(items) == 1 else f"{deleted} tasks deleted!")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to delete task: {str(e)}")
     
+    def plan_study_sessions(self):
+        """Plan study sessions for open tasks into the free time around classes"""
+        planner = StudyPlanner(self.db)
+        try:
+            sessions, shortfalls = planner.plan()
+            planner.save(sessions)
+        except sqlite3.Error as e:
+            messagebox.showerror("Error", f"Could not plan study time: {str(e)}")
+            return
+        
+        self.show_toast(f"Planned {len(sessions)} study session(s) - see the calendar")
+        if shortfalls:
+            lines = "\n".join(f"• {task[2]} ({task[1]}, due {task[3]}): {minutes / 60:.1f} h short"
+                              for task, minutes in shortfalls[:15])
+            more = f"\n...and {len(shortfalls) - 15} more" if len(shortfalls) > 15 else ""
+            messagebox.showwarning("Not enough free time", f"These tasks do not fit before their deadline:\n\n{lines}{more}")
+    
     def task_form_dialog(self, title, task_id=None, task_data=None):
         """Task form dialog for both create and edit"""
         dialog = tk.Toplevel(self.root)
         dialog.title(title)
-        dialog.geometry("500x500")
+        dialog.geometry("560x780")
         dialog.configure(bg=self.colors['soft_pink'])
         dialog.transient(self.root)
         dialog.grab_set()
@@ -1412,7 +4802,7 @@ class ClassifyApp:
         # Subject selection
         tk.Label(form_frame, text="Subject:", 
                 bg=self.colors['card_bg'], font=self.fonts['small']).grid(row=0, column=0, sticky='e', pady=10, padx=(0, 10))
-        subject_combo = ttk.Combobox(form_frame, state='readonly', width=30)
+        subject_combo = SubjectPicker(form_frame, self.get_subject_index, width=30)
         subject_combo.grid(row=0, column=1, pady=10, sticky='w')
         
         # Task name
@@ -1441,10 +4831,15 @@ class ClassifyApp:
         status_combo = ttk.Combobox(form_frame, values=['Not Started', 'In Progress', 'Completed'], state='readonly', width=30)
         status_combo.grid(row=4, column=1, pady=10, sticky='w')
         
-        # Load subjects
-        subjects = self.db.get_subjects()
-        subject_options = [f"{code} - {name}" for code, name, *_ in subjects]
-        subject_combo['values'] = subject_options
+        # Repeat
+        read_recurrence = self.create_recurrence_fields(form_frame, 5, task_data[6] if task_data else None)
+        
+        # Effort estimate for the study planner
+        tk.Label(form_frame, text="Effort (hours):", 
+                bg=self.colors['card_bg'], font=self.fonts['small']).grid(row=9, column=0, sticky='e', pady=10, padx=(0, 10))
+        effort_entry = tk.Entry(form_frame, width=33, font=self.fonts['small'],
+                               bg=self.colors['accent_light'])
+        effort_entry.grid(row=9, column=1, pady=10, sticky='w')
         
         # Set default values
         priority_combo.set('Medium')
@@ -1459,16 +4854,18 @@ class ClassifyApp:
             deadline_entry.insert(0, task_data[3])
             priority_combo.set(task_data[4])
             status_combo.set(task_data[5])
+            if task_data[7]:
+                effort_entry.insert(0, f"{task_data[7] / 60:g}")
         
         def save_task():
             # Validate inputs
-            subject = subject_combo.get()
+            subject_code = subject_combo.selected_code()
             task_name = task_name_entry.get().strip()
             deadline = deadline_entry.get().strip()
             priority = priority_combo.get()
             status = status_combo.get()
             
-            if not subject:
+            if not subject_code:
                 messagebox.showerror("Error", "Please select a subject!")
                 return
             
@@ -1487,19 +4884,35 @@ class ClassifyApp:
                 messagebox.showerror("Error", "Deadline must be in YYYY-MM-DD format!")
                 return
             
-            # Extract subject code
-            subject_code = subject.split(' - ')[0]
+            try:
+                recurrence = read_recurrence()
+            except ValueError as e:
+                messagebox.showerror("Error", str(e))
+                return
+            
+            effort = effort_entry.get().strip()
+            try:
+                effort_minutes = round(float(effort) * 60) if effort else None
+            except ValueError:
+                effort_minutes = -1
+            if effort_minutes is not None and effort_minutes <= 0:
+                messagebox.showerror("Error", "Effort must be a positive number of hours (or left blank)!")
+                return
             
             try:
                 if task_id:  # Update existing task
-                    self.db.update_task(task_id, subject_code, task_name, deadline, priority, status)
+                    self.db.update_task(task_id, subject_code, task_name, deadline, priority, status, recurrence,
+                                        effort_minutes)
+                    self.reminders.refresh_task(task_id)
                     self.show_toast("Task updated successfully!")
                 else:  # Create new task
-                    self.db.add_task(subject_code, task_name, deadline, priority, status)
+                    new_id = self.db.add_task(subject_code, task_name, deadline, priority, status, recurrence,
+                                              effort_minutes)
+                    self.reminders.refresh_task(new_id)
                     self.show_toast("Task created successfully!")
                 
                 dialog.destroy()
-                self.refresh_tasks_table()
+                self.refresher.mark('tasks')
                 
             except Exception as e:
                 messagebox.showerror("Error", f"Database error: {str(e)}")
@@ -1508,10 +4921,101 @@ class ClassifyApp:
         button_frame = tk.Frame(dialog, bg=self.colors['soft_pink'], pady=15)
         button_frame.pack(fill='x')
         
-        ttk.Button(button_frame, text="💾 Save", 
-                  command=save_task, style='Primary.TButton').pack(side='left', padx=10)
-        ttk.Button(button_frame, text="❌ Cancel", 
-                  command=dialog.destroy, style='Secondary.TButton').pack(side='left', padx=10)
+        ttk.Button(button_frame, text="💾 Save", 
+                  command=save_task, style='Primary.TButton').pack(side='left', padx=10)
+        ttk.Button(button_frame, text="❌ Cancel", 
+                  command=dialog.destroy, style='Secondary.TButton').pack(side='left', padx=10)
+    
+    def create_recurrence_fields(self, form_frame, first_row, recurrence=None):
+        """Repeat fields for the task form - returns a function that reads them into a rule string"""
+        rule = RecurrenceRule.parse(recurrence)
+        choices = {'Does not repeat': None, 'Every N weeks': 'WEEKLY', 'Every N days': 'DAILY'}
+        
+        tk.Label(form_frame, text="Repeat:", 
+                bg=self.colors['card_bg'], font=self.fonts['small']).grid(row=first_row, column=0, sticky='e', pady=10, padx=(0, 10))
+        repeat_combo = ttk.Combobox(form_frame, values=list(choices), state='readonly', width=30)
+        repeat_combo.grid(row=first_row, column=1, pady=10, sticky='w')
+        
+        entries = {}
+        for offset, (label, field) in enumerate([("Every N:", 'interval'),
+                                                  ("Until (YYYY-MM-DD):", 'until'),
+                                                  ("Skip dates (comma-separated):", 'skip')], start=1):
+            tk.Label(form_frame, text=label, 
+                    bg=self.colors['card_bg'], font=self.fonts['small']).grid(row=first_row + offset, column=0, sticky='e', pady=10, padx=(0, 10))
+            entry = tk.Entry(form_frame, width=33, font=self.fonts['small'],
+                            bg=self.colors['accent_light'])
+            entry.grid(row=first_row + offset, column=1, pady=10, sticky='w')
+            entries[field] = entry
+        
+        if rule:
+            repeat_combo.set('Every N weeks' if rule.freq == 'WEEKLY' else 'Every N days')
+            entries['interval'].insert(0, str(rule.interval))
+            entries['until'].insert(0, rule.until.isoformat() if rule.until else '')
+            entries['skip'].insert(0, ', '.join(d.isoformat() for d in sorted(rule.exceptions)))
+        else:
+            repeat_combo.set('Does not repeat')
+            entries['interval'].insert(0, '1')
+        
+        def read():
+            freq = choices[repeat_combo.get()]
+            if not freq:
+                return None
+            return str(self.read_rule_fields(freq, entries['interval'].get(), entries['until'].get(), entries['skip'].get()))
+        
+        return read
+    
+    def create_term_fields(self, form_frame, first_row, entry=None):
+        """Term and repeat fields for the schedule dialogs - returns a function that reads
+        them into (term_start, term_end, recurrence)"""
+        entries = {}
+        for offset, (label, field) in enumerate([("Term start (YYYY-MM-DD):", 'term_start'),
+                                                  ("Term end (YYYY-MM-DD):", 'term_end'),
+                                                  ("Every N weeks:", 'interval'),
+                                                  ("Skip dates (comma-separated):", 'skip')]):
+            tk.Label(form_frame, text=label, 
+                    bg=self.colors['card_bg'], font=self.fonts['small']).grid(row=first_row + offset, column=0, sticky='e', pady=15, padx=(0, 20))
+            field_entry = tk.Entry(form_frame, width=35, font=self.fonts['small'],
+                                  bg=self.colors['accent_light'])
+            field_entry.grid(row=first_row + offset, column=1, pady=15, sticky='w')
+            entries[field] = field_entry
+        
+        rule = RecurrenceRule.parse(entry[9]) if entry else None
+        entries['term_start'].insert(0, (entry[7] or '') if entry else '')
+        entries['term_end'].insert(0, (entry[8] or '') if entry else '')
+        entries['interval'].insert(0, str(rule.interval) if rule else '1')
+        if rule:
+            entries['skip'].insert(0, ', '.join(d.isoformat() for d in sorted(rule.exceptions)))
+        
+        def read():
+            try:
+                term_start = date.fromisoformat(entries['term_start'].get().strip()) if entries['term_start'].get().strip() else None
+                term_end = date.fromisoformat(entries['term_end'].get().strip()) if entries['term_end'].get().strip() else None
+            except ValueError:
+                raise ValueError("Term dates must be in YYYY-MM-DD format!")
+            if term_start and term_end and term_end < term_start:
+                raise ValueError("Term end must be after term start!")
+            
+            rule = self.read_rule_fields('WEEKLY', entries['interval'].get(), '', entries['skip'].get())
+            # Plain weekly classes need no rule - the term dates bound them
+            recurrence = str(rule) if rule.interval > 1 or rule.exceptions else None
+            return (term_start.isoformat() if term_start else None,
+                    term_end.isoformat() if term_end else None,
+                    recurrence)
+        
+        return read
+    
+    def read_rule_fields(self, freq, interval, until, skip):
+        """Build a RecurrenceRule from form text - raises ValueError with a user-facing message"""
+        try:
+            interval = int(interval.strip() or 1)
+        except ValueError:
+            raise ValueError("Repeat interval must be a number!")
+        try:
+            until = date.fromisoformat(until.strip()) if until.strip() else None
+            exceptions = [date.fromisoformat(d.strip()) for d in skip.split(',') if d.strip()]
+        except ValueError:
+            raise ValueError("Repeat dates must be in YYYY-MM-DD format!")
+        return RecurrenceRule(freq, interval, until, exceptions)
     
     def show_schedule(self):
         """Show schedule page using SubjectCode"""
@@ -1564,6 +5068,7 @@ class ClassifyApp:
         ]
         
         self.schedule_cells = {}
+        self.schedule_slot_cells = {}  # (day, start hour) -> cell id, so entries find their cell directly
         self.schedule_labels = {}  # Store labels for delete functionality
         self.schedule_entries = {}  # Store entry data
         
@@ -1587,6 +5092,7 @@ class ClassifyApp:
                 # Store cell reference
                 cell_id = f"{day}_{time_slot}"
                 self.schedule_cells[cell_id] = cell
+                self.schedule_slot_cells[(day, int(time_slot[:2]))] = cell_id
                 
                 # Bind click event to add schedule
                 cell.bind('<Button-1>', lambda e, d=day, t=time_slot: self.on_schedule_cell_click(d, t))
@@ -1623,45 +5129,38 @@ class ClassifyApp:
             subject_name = entry[6]
             room = entry[5] or ''
             
-            # Find matching time slot
-            for time_slot in self.schedule_cells.keys():
-                slot_day, slot_range = time_slot.split('_')
-                if day == slot_day:
-                    slot_start, slot_end = slot_range.split('-')
-                    slot_start_hour = int(slot_start.split(':')[0])
-                    start_hour = int(start_time.split(':')[0])
-                    
-                    # Check if start time falls within this slot
-                    if slot_start_hour <= start_hour < slot_start_hour + 1:
-                        cell = self.schedule_cells[time_slot]
-                        
-                        # Create entry label - shows SubjectCode
-                        entry_text = f"{subject_code}\n{start_time}-{end_time}"
-                        if room:
-                            entry_text += f"\n{room}"
-                        
-                        label = tk.Label(cell, text=entry_text, font=self.fonts['small'],
-                                        bg=self.colors['soft_pink'], fg=self.colors['text_primary'],
-                                        wraplength=180, justify='center', cursor="hand2")
-                        label.pack(fill='both', expand=True, padx=2, pady=2)
-                        
-                        # Store ScheduleID in label object
-                        label.schedule_id = schedule_id
-                        
-                        # Bind click to select
-                        label.bind('<Button-1>', lambda e, sid=schedule_id: self.select_schedule_entry(sid))
-                        
-                        # Store references
-                        self.schedule_labels[schedule_id] = label
-                        self.schedule_entries[schedule_id] = {
-                            'day': day,
-                            'start_time': start_time,
-                            'end_time': end_time,
-                            'subject_code': subject_code,
-                            'room': room,
-                            'cell': time_slot
-                        }
-                        break
+            # The slot whose hour holds the start time (StartMinute is stored, no parsing needed)
+            time_slot = self.schedule_slot_cells.get((day, entry[10] // 60))
+            if time_slot is None:
+                continue
+            cell = self.schedule_cells[time_slot]
+            
+            # Create entry label - shows SubjectCode
+            entry_text = f"{subject_code}\n{start_time}-{end_time}"
+            if room:
+                entry_text += f"\n{room}"
+            
+            label = tk.Label(cell, text=entry_text, font=self.fonts['small'],
+                            bg=self.colors['soft_pink'], fg=self.colors['text_primary'],
+                            wraplength=180, justify='center', cursor="hand2")
+            label.pack(fill='both', expand=True, padx=2, pady=2)
+            
+            # Store ScheduleID in label object
+            label.schedule_id = schedule_id
+            
+            # Bind click to select
+            label.bind('<Button-1>', lambda e, sid=schedule_id: self.select_schedule_entry(sid))
+            
+            # Store references
+            self.schedule_labels[schedule_id] = label
+            self.schedule_entries[schedule_id] = {
+                'day': day,
+                'start_time': start_time,
+                'end_time': end_time,
+                'subject_code': subject_code,
+                'room': room,
+                'cell': time_slot
+            }
     
     def on_schedule_cell_click(self, day, time_slot):
         """Handle schedule cell click"""
@@ -1695,8 +5194,9 @@ class ClassifyApp:
             if messagebox.askyesno("Confirm Delete", 
                                   f"Delete schedule entry:\n\n{description}\n\nAre you sure?"):
                 self.db.delete_schedule(schedule_id)
+                self.reminders.remove(('class', schedule_id))
                 self.show_toast("Schedule entry deleted successfully!")
-                self.load_schedule_data()
+                self.refresher.mark('schedule')
                 delattr(self, 'selected_schedule_id')
     
     def edit_schedule_entry_dialog(self):
@@ -1723,7 +5223,7 @@ class ClassifyApp:
         
         dialog = tk.Toplevel(self.root)
         dialog.title("Edit Schedule Entry")
-        dialog.geometry("600x550")
+        dialog.geometry("650x800")
         dialog.configure(bg=self.colors['soft_pink'])
         dialog.transient(self.root)
         dialog.grab_set()
@@ -1742,7 +5242,7 @@ class ClassifyApp:
         # Subject - shows SubjectCode
         tk.Label(form_frame, text="Subject:", 
                 bg=self.colors['card_bg'], font=self.fonts['small']).grid(row=0, column=0, sticky='e', pady=15, padx=(0, 20))
-        subject_combo = ttk.Combobox(form_frame, state='readonly', width=33)
+        subject_combo = SubjectPicker(form_frame, self.get_subject_index, width=33)
         subject_combo.grid(row=0, column=1, pady=15, sticky='w')
         
         # Day
@@ -1783,10 +5283,8 @@ class ClassifyApp:
                        bg=self.colors['accent_light'])
         room.grid(row=4, column=1, pady=15, sticky='w')
         
-        # Load subjects using SubjectCode
-        subjects = self.db.get_subjects()
-        subject_options = [f"{code} - {name}" for code, name, *_ in subjects]
-        subject_combo['values'] = subject_options
+        # Term dates and repeat interval
+        read_term = self.create_term_fields(form_frame, 5, entry)
         
         # Set current values
         day_combo.set(entry[2])
@@ -1802,20 +5300,14 @@ class ClassifyApp:
         room.insert(0, entry[5] or '')
         
         # Set current subject
-        current_subject_code = entry[1]
-        for option in subject_options:
-            if current_subject_code in option:
-                subject_combo.set(option)
-                break
+        subject_combo.set(self.get_subject_index().displays.get(entry[1], ''))
         
         def update_schedule():
-            subject_selection = subject_combo.get()
-            if not subject_selection:
+            subject_code = subject_combo.selected_code()
+            if not subject_code:
                 messagebox.showerror("Error", "Please select a subject!")
                 return
             
-            subject_code = subject_selection.split(' - ')[0]
-            
             if not day_combo.get() or not start_hour.get() or not end_hour.get():
                 messagebox.showerror("Error", "Day and times are required!")
                 return
@@ -1823,6 +5315,12 @@ class ClassifyApp:
             start_time = f"{start_hour.get()}:{start_min.get()}"
             end_time = f"{end_hour.get()}:{end_min.get()}"
             
+            try:
+                term_start, term_end, recurrence = read_term()
+            except ValueError as e:
+                messagebox.showerror("Error", str(e))
+                return
+            
             try:
                 # Validate times
                 datetime.strptime(start_time, '%H:%M')
@@ -1836,10 +5334,11 @@ class ClassifyApp:
                     return
                 
                 self.db.update_schedule(schedule_id, subject_code, day_combo.get(), start_time, 
-                                       end_time, room.get())
+                                       end_time, room.get(), term_start, term_end, recurrence)
+                self.reminders.refresh_class(schedule_id)
                 self.show_toast("Schedule entry updated successfully!")
                 dialog.destroy()
-                self.load_schedule_data()
+                self.refresher.mark('schedule')
                 delattr(self, 'selected_schedule_id')
             except ValueError:
                 messagebox.showerror("Error", "Invalid time format! Use HH:MM")
@@ -1858,7 +5357,7 @@ class ClassifyApp:
         """Dialog for adding schedule entry using SubjectCode as FK"""
         dialog = tk.Toplevel(self.root)
         dialog.title("Add Schedule Entry")
-        dialog.geometry("600x550")
+        dialog.geometry("650x800")
         dialog.configure(bg=self.colors['soft_pink'])
         dialog.transient(self.root)
         dialog.grab_set()
@@ -1877,7 +5376,7 @@ class ClassifyApp:
         # Subject - shows SubjectCode
         tk.Label(form_frame, text="Subject:", 
                 bg=self.colors['card_bg'], font=self.fonts['small']).grid(row=0, column=0, sticky='e', pady=15, padx=(0, 20))
-        subject_combo = ttk.Combobox(form_frame, state='readonly', width=33)
+        subject_combo = SubjectPicker(form_frame, self.get_subject_index, width=33)
         subject_combo.grid(row=0, column=1, pady=15, sticky='w')
         
         # Day
@@ -1918,12 +5417,12 @@ class ClassifyApp:
                        bg=self.colors['accent_light'])
         room.grid(row=4, column=1, pady=15, sticky='w')
         
-        # Load subjects using SubjectCode
-        subjects = self.db.get_subjects()
-        subject_options = [f"{code} - {name}" for code, name, *_ in subjects]
-        subject_combo['values'] = subject_options
-        if subject_options:
-            subject_combo.set(subject_options[0])
+        # Term dates and repeat interval
+        read_term = self.create_term_fields(form_frame, 5)
+        
+        # Default to the first subject
+        if subject_combo['values']:
+            subject_combo.set(subject_combo['values'][0])
         
         # Set defaults if provided
         if default_day:
@@ -1946,13 +5445,11 @@ class ClassifyApp:
             end_min.set('00')
         
         def save_schedule():
-            subject_selection = subject_combo.get()
-            if not subject_selection:
+            subject_code = subject_combo.selected_code()
+            if not subject_code:
                 messagebox.showerror("Error", "Please select a subject!")
                 return
             
-            subject_code = subject_selection.split(' - ')[0]
-            
             if not day_combo.get() or not start_hour.get() or not end_hour.get():
                 messagebox.showerror("Error", "Day and times are required!")
                 return
@@ -1960,6 +5457,12 @@ class ClassifyApp:
             start_time = f"{start_hour.get()}:{start_min.get()}"
             end_time = f"{end_hour.get()}:{end_min.get()}"
             
+            try:
+                term_start, term_end, recurrence = read_term()
+            except ValueError as e:
+                messagebox.showerror("Error", str(e))
+                return
+            
             try:
                 # Validate times
                 datetime.strptime(start_time, '%H:%M')
@@ -1972,11 +5475,12 @@ class ClassifyApp:
                     messagebox.showerror("Error", "End time must be after start time!")
                     return
                 
-                self.db.add_schedule(subject_code, day_combo.get(), start_time, 
-                                    end_time, room.get())
+                new_id = self.db.add_schedule(subject_code, day_combo.get(), start_time, 
+                                             end_time, room.get(), term_start, term_end, recurrence)
+                self.reminders.refresh_class(new_id)
                 self.show_toast("Schedule entry added successfully!")
                 dialog.destroy()
-                self.load_schedule_data()
+                self.refresher.mark('schedule')
             except ValueError:
                 messagebox.showerror("Error", "Invalid time format! Use HH:MM")
             except Exception as e:
@@ -2011,14 +5515,7 @@ class ClassifyApp:
         
         self.report_var = tk.StringVar()
         report_combo = ttk.Combobox(report_frame, textvariable=self.report_var, state='readonly', width=30)
-        report_combo['values'] = [
-            'All Subjects with Tasks',
-            'Upcoming Tasks',
-            'Tasks Today',
-            'Completed Tasks',
-            'Missing Tasks',
-            'Schedule for Today'
-        ]
+        report_combo['values'] = list(REPORTS)
         report_combo.set('All Subjects with Tasks')
         report_combo.pack(side='left', padx=(0, 25))
         
@@ -2030,6 +5527,30 @@ class ClassifyApp:
         ttk.Button(report_frame, text="🔄 Refresh", 
                   command=self.generate_report, style='Secondary.TButton').pack(side='left', padx=10)
         
+        self.include_archive_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(report_frame, text="Include archived tasks", variable=self.include_archive_var,
+                      command=self.generate_report, bg=self.colors['soft_pink'],
+                      font=self.fonts['small']).pack(side='left', padx=10)
+        
+        # Backup controls
+        backup_frame = tk.Frame(self.content_frame, bg=self.colors['soft_pink'])
+        backup_frame.pack(fill='x', pady=(0, 20))
+        
+        ttk.Button(backup_frame, text="💾 Backup Now", 
+                  command=lambda: self.run_backup(manual=True), style='Secondary.TButton').pack(side='left')
+        ttk.Button(backup_frame, text="♻️ Restore Backup", 
+                  command=self.restore_backup, style='Secondary.TButton').pack(side='left', padx=10)
+        ttk.Button(backup_frame, text="🗄️ Archive Old Tasks", 
+                  command=self.archive_old_tasks, style='Secondary.TButton').pack(side='left', padx=10)
+        ttk.Button(backup_frame, text="📚 Add Past Term", 
+                  command=self.add_past_term, style='Secondary.TButton').pack(side='left', padx=10)
+        
+        snapshots = self.backups.list_snapshots()
+        backup_info = f"Last backup: {os.path.basename(snapshots[0])}" if snapshots else "No backups yet"
+        tk.Label(backup_frame, text=f"{backup_info} (keeping {self.backups.keep})",
+                bg=self.colors['soft_pink'], fg=self.colors['text_secondary'],
+                font=self.fonts['small']).pack(side='left', padx=15)
+        
         # Results frame - FULL WIDTH
         self.results_frame = tk.Frame(self.content_frame, bg=self.colors['card_bg'])
         self.results_frame.pack(fill='both', expand=True, padx=10, pady=10)
@@ -2037,6 +5558,81 @@ class ClassifyApp:
         # Generate initial report
         self.generate_report()
     
+    def show_analytics(self):
+        """Show workload analytics computed from the task columns"""
+        self.clear_content()
+        self.set_active_nav("📊 Analytics")
+        
+        header = tk.Label(self.content_frame,
+                         text="📊 Workload Analytics",
+                         font=self.fonts['header'],
+                         bg=self.colors['soft_pink'],
+                         fg=self.colors['deep_maroon'])
+        header.pack(pady=(0, 25))
+        
+        self.analytics = TaskAnalytics(self.db)
+        self.dashboard_cards = {}
+        
+        main_content = tk.Frame(self.content_frame, bg=self.colors['soft_pink'])
+        main_content.pack(fill='both', expand=True)
+        
+        left_column = tk.Frame(main_content, bg=self.colors['soft_pink'])
+        left_column.pack(side='left', fill='both', expand=True, padx=(0, 15))
+        
+        right_column = tk.Frame(main_content, bg=self.colors['soft_pink'])
+        right_column.pack(side='right', fill='both', expand=True, padx=(15, 0))
+        
+        self.create_card(left_column, "📈 Overview", self.colors['deep_crimson'],
+                        self.get_analytics_overview_content, pady=(0, 20))
+        self.create_card(left_column, "🗓️ Tasks per Week", self.colors['dusty_pink'],
+                        self.get_tasks_per_week_content)
+        self.create_card(right_column, "✅ Completion by Subject", self.colors['deep_maroon'],
+                        self.get_completion_by_subject_content)
+    
+    def get_analytics_overview_content(self, parent):
+        """Content for the Overview card - totals, completion, lateness and priority mix"""
+        analytics = self.analytics
+        overdue, average_late, worst_late = analytics.lateness()
+        mix = analytics.priority_mix()
+        lines = [
+            f"Total tasks: {len(analytics)}",
+            f"Completed: {analytics.completion_rate():.0%}",
+            f"Overdue: {overdue}" + (f" (avg {average_late:.1f} days late, worst {worst_late})" if overdue else ""),
+            "Priority mix: " + ", ".join(f"{name} {mix[name]}" for name in reversed(mix)),
+        ]
+        for line in lines:
+            tk.Label(parent, text=line, font=self.fonts['normal'],
+                    bg=self.colors['card_bg'], fg=self.colors['text_primary'],
+                    anchor='w').pack(fill='x', pady=4)
+        tk.Label(parent, text=f"Computed with {analytics.engine} columns", font=self.fonts['small'],
+                bg=self.colors['card_bg'], fg=self.colors['text_secondary'],
+                anchor='w').pack(fill='x', pady=(10, 0))
+    
+    def get_tasks_per_week_content(self, parent):
+        """Content for the Tasks per Week card - one bar per week"""
+        weeks = self.analytics.tasks_per_week()
+        busiest = max((count for _, count in weeks), default=0) or 1
+        for monday, count in weeks:
+            row = tk.Frame(parent, bg=self.colors['card_bg'])
+            row.pack(fill='x', pady=2)
+            tk.Label(row, text=monday.strftime('%b %d'), width=8, font=self.fonts['small'],
+                    bg=self.colors['card_bg'], fg=self.colors['text_secondary'], anchor='w').pack(side='left')
+            tk.Frame(row, bg=self.colors['deep_crimson'], height=18,
+                    width=max(2, int(300 * count / busiest))).pack(side='left', padx=(5, 8))
+            tk.Label(row, text=str(count), font=self.fonts['small'],
+                    bg=self.colors['card_bg'], fg=self.colors['text_primary']).pack(side='left')
+    
+    def get_completion_by_subject_content(self, parent):
+        """Content for the Completion by Subject card"""
+        columns = ('SubjectCode', 'Completed', 'Total', 'Rate')
+        tree = ttk.Treeview(parent, columns=columns, show='headings', height=12)
+        for col in columns:
+            tree.heading(col, text=col)
+            tree.column(col, width=120, anchor='center')
+        for code, done, total, rate in self.analytics.completion_by_subject():
+            tree.insert('', 'end', values=(code, done, total, f"{rate:.0%}"))
+        tree.pack(fill='both', expand=True)
+    
     def generate_report(self):
         """Generate the selected report from the 6 requested filters"""
         report_type = self.report_var.get()
@@ -2055,24 +5651,12 @@ class ClassifyApp:
         header.pack(fill='x')
         
         # Get data based on report type
-        if report_type == 'All Subjects with Tasks':
-            data = self.db.get_all_subjects_with_tasks()
-            columns = ('SubjectCode', 'Name', 'Instructor', 'Units', 'Tasks')
-        elif report_type == 'Upcoming Tasks':
-            data = self.db.get_upcoming_tasks()
-            columns = ('TaskName', 'Deadline', 'Priority', 'Status', 'SubjectCode', 'Name')
-        elif report_type == 'Tasks Today':
-            data = self.db.get_tasks_today()
-            columns = ('TaskName', 'Deadline', 'Priority', 'Status', 'SubjectCode', 'Name')
-        elif report_type == 'Completed Tasks':
-            data = self.db.get_completed_tasks()
-            columns = ('TaskName', 'Deadline', 'Priority', 'Status', 'SubjectCode', 'Name')
-        elif report_type == 'Missing Tasks':
-            data = self.db.get_missing_tasks()
-            columns = ('TaskName', 'Deadline', 'Priority', 'Status', 'SubjectCode', 'Name')
-        elif report_type == 'Schedule for Today':
-            data = self.db.get_schedule_for_today()
-            columns = ('SubjectCode', 'Name', 'StartTime', 'EndTime', 'Room')
+        if report_type in REPORTS:
+            method, columns = REPORTS[report_type]
+            if self.include_archive_var.get() and report_type in ARCHIVE_REPORTS:
+                data = getattr(self.db, method)(include_archive=True)
+            else:
+                data = getattr(self.db, method)()
         else:
             data = []
             columns = ()
@@ -2138,6 +5722,7 @@ class ClassifyApp:
         
         report_type, columns, data = self.current_report_data
         
+        from tkinter import filedialog
         filename = filedialog.asksaveasfilename(
             defaultextension=".csv",
             filetypes=[("CSV files", "*.csv"), ("All files", "*.*")],
@@ -2146,37 +5731,182 @@ class ClassifyApp:
         
         if filename:
             try:
-                with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                    writer = csv.writer(csvfile)
-                    writer.writerow([f"ClassIFY Report: {report_type}"])
-                    writer.writerow([f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"])
-                    writer.writerow([])
-                    writer.writerow(columns)
-                    
-                    for row in data:
-                        writer.writerow(row)
-                    
-                    writer.writerow([])
-                    writer.writerow([f"Total records: {len(data)}"])
+                write_report_csv(filename, report_type, columns, data)
                 self.show_toast(f"Report exported to {filename}")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to export: {str(e)}")
     
+    def schedule_backup(self):
+        """Arm the next automatic backup"""
+        self.root.after(BACKUP_INTERVAL_MS, self.run_backup)
+    
+    def run_backup(self, manual=False):
+        """Start an online backup on a worker thread so the window stays responsive"""
+        if not self.backups.start_background():
+            if manual:
+                messagebox.showinfo("Backup", "A backup is already running.")
+            return
+        self.root.after(200, lambda: self.check_backup(manual))
+    
+    def check_backup(self, manual):
+        """Poll the backup worker and report the result when it finishes"""
+        if self.backups.is_running():
+            self.root.after(200, lambda: self.check_backup(manual))
+            return
+        
+        ok, detail = self.backups.last_result
+        if ok:
+            print(f"✅ Backup saved: {detail}")
+            if manual:
+                self.show_toast(f"Backup saved: {os.path.basename(detail)}")
+        else:
+            print(f"⚠️ Backup failed: {detail}")
+            if manual:
+                messagebox.showerror("Error", f"Backup failed: {detail}")
+        
+        if not manual:
+            self.schedule_backup()
+    
+    def schedule_maintenance(self, delay=MAINTENANCE_CHECK_MS):
+        """Arm the next check for due maintenance"""
+        self.root.after(delay, self.run_maintenance)
+    
+    def run_maintenance(self):
+        """Start due maintenance on a worker thread - never alongside a backup"""
+        if self.backups.is_running() or not self.maintenance.is_due() or not self.maintenance.start_background():
+            self.schedule_maintenance()
+            return
+        self.root.after(200, self.check_maintenance)
+    
+    def check_maintenance(self):
+        """Poll the maintenance worker and log the result when it finishes"""
+        if self.maintenance.is_running():
+            self.root.after(200, self.check_maintenance)
+            return
+        
+        ok, detail = self.maintenance.last_result
+        if isinstance(detail, dict):
+            print(f"{'✅' if ok else '⚠️'} Maintenance: quick_check {detail['quick_check']}, "
+                  f"{detail['foreign_key_errors']} foreign key error(s), "
+                  f"{detail['bytes_reclaimed']:,} bytes reclaimed in {detail['seconds']:.2f}s")
+            if not ok:
+                messagebox.showwarning("Database check",
+                                       f"The database check found a problem ({detail['quick_check']}, "
+                                       f"{detail['foreign_key_errors']} foreign key error(s)).\n\n"
+                                       "Consider restoring a backup from the Records page.")
+        else:
+            print(f"⚠️ Maintenance failed: {detail}")
+        self.schedule_maintenance()
+    
+    def archive_old_tasks(self):
+        """Move completed tasks due more than ARCHIVE_AFTER_DAYS ago to the archive database"""
+        before = date.today() - timedelta(days=ARCHIVE_AFTER_DAYS)
+        if not messagebox.askyesno("Archive Old Tasks",
+                                   f"Move completed tasks due before {before.isoformat()} to the archive?\n\n"
+                                   "They disappear from the task lists but stay available in reports\n"
+                                   "with \"Include archived tasks\" ticked."):
+            return
+        try:
+            moved = TaskArchive(self.db).archive(before)
+        except (sqlite3.Error, OSError) as e:
+            messagebox.showerror("Error", f"Archiving failed: {e}")
+            return
+        self.show_toast(f"Archived {moved} task(s)")
+        if moved:
+            self.refresher.mark('tasks')
+    
+    def add_past_term(self):
+        """Register a past term's database for the cross-term reports"""
+        from tkinter import filedialog
+        filename = filedialog.askopenfilename(
+            title="Choose a past term's ClassIFY database",
+            filetypes=[("ClassIFY databases", "*.db"), ("All files", "*.*")]
+        )
+        if not filename:
+            return
+        try:
+            label = TermLibrary(self.db).add(filename)
+        except (sqlite3.Error, OSError, ValueError) as e:
+            messagebox.showerror("Error", f"Could not add the term: {e}")
+            return
+        self.show_toast(f"Added past term '{label}' - see All Subjects Ever Taken and Completion History")
+    
+    def restore_backup(self):
+        """Restore the database from a chosen snapshot"""
+        if self.backups.is_running():
+            messagebox.showwarning("Warning", "Please wait for the running backup to finish!")
+            return
+        
+        from tkinter import filedialog
+        filename = filedialog.askopenfilename(
+            initialdir=self.backups.backup_dir,
+            filetypes=[("ClassIFY backups", "*.db"), ("All files", "*.*")]
+        )
+        if not filename:
+            return
+        
+        if messagebox.askyesno("Confirm Restore",
+                              f"Replace ALL current data with the backup:\n\n{os.path.basename(filename)}?\n\n"
+                              "A backup of the current data is taken first."):
+            try:
+                self.backups.restore(filename, target_conn=self.db.conn)
+                self.db.undo_log.clear()        # the steps describe the data that was just replaced
+                # Everything cached from the old data goes too
+                self.subject_index = None
+                self.ticker.update()
+                self.reminders.reload()
+                self.show_toast("Backup restored successfully!")
+                self.refresh_current_page()
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to restore backup: {str(e)}")
+    
     def setup_shortcuts(self):
         """Setup keyboard shortcuts"""
         self.root.bind('<Control-n>', lambda e: self.add_subject_dialog() if "📚 Subjects" in self.root.title() else None)
         self.root.bind('<Control-t>', lambda e: self.create_task() if "✔ Tasks" in self.root.title() else None)
         self.root.bind('<Control-s>', lambda e: self.add_schedule_dialog() if "🕒 Schedule" in self.root.title() else None)
         self.root.bind('<Control-q>', lambda e: self.root.quit())
+        self.root.bind('<Control-z>', lambda e: self.undo())
+        self.root.bind('<Control-y>', lambda e: self.redo())
+        self.root.bind('<Control-Z>', lambda e: self.redo())     # Ctrl+Shift+Z
         self.root.bind('<F5>', lambda e: self.refresh_current_page())
     
-    def refresh_current_page(self):
-        """Refresh current page"""
-        current_nav = None
+    def undo(self):
+        """Undo the last save - one transaction, however many rows it touched"""
+        self.replay_step(self.db.undo_log.undo if self.db else None, "Nothing to undo", "↩️ Undone")
+    
+    def redo(self):
+        """Redo the last undone save"""
+        self.replay_step(self.db.undo_log.redo if self.db else None, "Nothing to redo", "↪️ Redone")
+    
+    def replay_step(self, action, nothing_message, done_message):
+        if action is None:
+            return                      # still opening
+        try:
+            tables = action()
+        except sqlite3.IntegrityError as e:
+            messagebox.showerror("Error", f"That change can no longer be reversed - the data changed since: {e}")
+            return
+        except sqlite3.Error as e:
+            messagebox.showerror("Error", f"Could not undo/redo: {e}")
+            return
+        if tables is None:
+            self.show_toast(nothing_message)
+            return
+        self.reminders.reload()
+        self.refresher.mark(*tables)
+        self.show_toast(f"{done_message} ({', '.join(sorted(tables))})")
+    
+    def get_current_page(self):
+        """Text of the active navigation button"""
         for text, btn in self.nav_buttons.items():
             if str(btn.cget('style')) == 'NavActive.TButton':
-                current_nav = text
-                break
+                return text
+        return None
+    
+    def refresh_current_page(self):
+        """Refresh current page"""
+        current_nav = self.get_current_page()
         
         if current_nav == "🏠 Home":
             self.show_dashboard()
@@ -2188,6 +5918,71 @@ class ClassifyApp:
             self.show_schedule()
         elif current_nav == "📁 Records":
             self.show_records()
+        elif current_nav == "📊 Analytics":
+            self.show_analytics()
+
+
+    def start_change_poller(self):
+        """Remember the current data_version and start polling it"""
+        self.last_data_version = self.db.get_data_version()
+        self.last_change_seq = self.db.get_last_change_seq()
+        self.root.after(CHANGE_POLL_MS, self.poll_external_changes)
+    
+    def poll_external_changes(self):
+        """Cheap check for commits by other processes - only the affected views are refreshed"""
+        try:
+            version = self.db.get_data_version()
+            if version != self.last_data_version:
+                self.last_data_version = version
+                tables, newest_seq = self.db.get_changed_tables(self.last_change_seq)
+                if newest_seq < self.last_change_seq:
+                    # The change log went backwards - the database file was replaced (e.g. restored)
+                    tables = set(TABLE_COLUMNS)
+                self.last_change_seq = newest_seq
+                if tables:
+                    print(f"🔄 External changes to: {', '.join(sorted(tables))}")
+                    self.reminders.reload()
+                    self.refresher.mark(*tables)
+        except sqlite3.Error as e:
+            print(f"⚠️ Change check failed: {e}")
+        self.root.after(CHANGE_POLL_MS, self.poll_external_changes)
+    
+    def get_subject_index(self):
+        """Prefix index for the subject pickers - rebuilt only after subjects change"""
+        if self.subject_index is None:
+            self.subject_index = SubjectIndex(self.db.get_subjects())
+        return self.subject_index
+    
+    def refresh_views(self, tables):
+        """Refresh only the parts of the current page that show the changed tables"""
+        if 'subjects' in tables:
+            self.subject_index = None
+        if tables & {'schedule', 'subjects'}:
+            self.ticker.update()
+        current_nav = self.get_current_page()
+        
+        if current_nav == "🏠 Home":
+            for name, (frame, callback) in getattr(self, 'dashboard_cards', {}).items():
+                if DASHBOARD_CARD_TABLES.get(name, set()) & tables and frame.winfo_exists():
+                    for widget in frame.winfo_children():
+                        widget.destroy()
+                    callback(frame)
+        elif current_nav == "📚 Subjects":
+            if 'subjects' in tables:
+                self.load_subjects_data()
+        elif current_nav == "✔ Tasks":
+            if 'subjects' in tables:
+                self.load_task_filter_options()
+            if tables & {'tasks', 'subjects'}:
+                self.refresh_tasks_table()
+        elif current_nav == "🕒 Schedule":
+            if tables & {'schedule', 'subjects'}:
+                self.load_schedule_data()
+        elif current_nav == "📁 Records":
+            self.generate_report()
+        elif current_nav == "📊 Analytics":
+            if tables & {'tasks', 'subjects'}:
+                self.show_analytics()
 
 
 def write_user_manual():
@@ -2207,17 +6002,43 @@ Files created:
 
 Quick overview:
 - Home/Dashboard: See today's classes, monthly calendar, today's to-dos, and subjects with goals.
+  The top line shows the class in progress and the next one, updated as classes start and end.
+  Days with open tasks due are highlighted on the calendar. On exit the dashboard is saved to
+  ClassIFY.dashboard.json next to the database; the next start shows it at once while the database
+  opens, unless the database changed since or the day is over. The other pages unlock once it is open.
 - Subjects: Add/Edit/Delete subjects. Fields: SubjectCode, Name, Instructor, Units, Goals (max 100 chars)
 - Tasks: Add tasks linked to SubjectCode. Fields: TaskName, SubjectCode, Deadline(YYYY-MM-DD), Priority, Status.
+  A task can repeat every N weeks or every N days from its deadline, optionally until a date and
+  with skipped dates. Repeating tasks are marked 🔁 and stored once; each occurrence shows up on the
+  calendar, in Today's To-Do List and in the Upcoming Tasks / Tasks Today reports.
+  Ctrl-click or Shift-click to select several tasks, then Mark Completed, Set Priority,
+  Move Deadline (+N / -N days or a YYYY-MM-DD date) or Delete them all in one go.
 - Schedule: Weekly grid (Mon..Sun) for class schedule entries (SubjectCode, StartTime, EndTime, Room). Click cells to add, click entries to select for edit/delete.
-- Records/Reports: Run pre-built reports (All Subjects with Tasks, Upcoming Tasks, Tasks Today, Completed Tasks, Missing Tasks, Schedule for Today). Export to CSV allowed.
+  Entries can have term start/end dates, meet every N weeks, and skip dates (e.g. holidays).
+- Records/Reports: Run pre-built reports (All Subjects with Tasks, Upcoming Tasks, Tasks Today, Completed Tasks, Missing Tasks, Schedule for Today, All Subjects Ever Taken, Completion History). Export to CSV allowed.
 
 Important notes:
 - All tables persist between runs. Data is not dropped on startup.
 - Sample data is inserted only when the subjects table is empty (first run).
 - Goals field supports up to 100 characters. A character counter is shown in the UI.
 - Deleting a subject cascades and removes related tasks and schedule entries.
-- SubjectCode is used as the primary key for subjects and as a foreign key in tasks and schedule.
+- Renaming a SubjectCode is a single-row change: tasks and schedule entries point at the subject's
+  SubjectID, so they follow it at once, and a rename that clashes with an existing code changes nothing.
+- Undo (Ctrl+Z) and Redo (Ctrl+Y or Ctrl+Shift+Z) reverse whole saves - a deleted subject comes
+  back with all its tasks, schedule entries and study sessions in one step. The last 100 saves made
+  in this window can be undone until it is closed; syncs, archiving and restores are not undoable.
+- Changes made by another ClassIFY window, the command line or a sync show up automatically
+  within a couple of seconds; only the affected parts of the page are refreshed.
+- Several windows (or a script) can save to the same ClassIFY.db at once: a save waits briefly for
+  the other one and retries, and only reports "database is locked" if it stays busy for seconds.
+- Subject boxes (task and schedule forms, task filter) are type-ahead: type part of a code or any
+  word of the name to narrow the list, then press Enter to pick the best match.
+- Subjects have a compact integer SubjectID that tasks and schedule refer to; SubjectCode stays unique
+  and is what you type and see everywhere. Task priority and status are stored as small integer codes
+  looked up in the priorities and statuses tables (new names get a code when first saved).
+- For your own queries, the task_details and schedule_details views show tasks and schedule entries
+  with SubjectCode, Priority and Status as text, the way older versions stored them. Older databases
+  are converted on first open; tables are STRICT when the SQLite library is 3.37 or newer.
 - Tasks use auto-increment TaskID for uniqueness (hidden from user).
 
 Key SQL queries used in Reports:
@@ -2225,8 +6046,10 @@ Key SQL queries used in Reports:
 2. Upcoming Tasks: Tasks due from tomorrow forward
 3. Tasks Today: Tasks due today
 4. Completed Tasks: All completed tasks
-5. Missing Tasks: Overdue tasks not yet completed
+5. Missing Tasks: Overdue tasks not yet completed (a repeating task once its repeats have ended)
 6. Schedule for Today: Today's class schedule
+7. All Subjects Ever Taken: Subjects across this and every added past term, with the terms they were taken in
+8. Completion History: Tasks, completed tasks and completion rate per term
 
 Keyboard Shortcuts:
 - Ctrl+N: Add new subject (when in Subjects page)
@@ -2240,6 +6063,123 @@ Schedule Management:
 - Click existing entries to select them (they will be highlighted)
 - Use buttons to edit or delete selected entries
 
+Backups:
+- A snapshot is taken automatically every 30 minutes into the 'backups' folder next to ClassIFY.db.
+- Snapshots are copied online in small steps, so you can keep working while a backup runs.
+- Every snapshot is checked with PRAGMA quick_check; only the newest 7 are kept.
+- Records page: "Backup Now" takes a snapshot, "Restore Backup" replaces all data with a chosen snapshot
+  (the current data is backed up first). Snapshots from older versions are upgraded as they are
+  restored; one made by a newer ClassIFY is refused.
+
+Maintenance:
+- Every 7 days the app checks the database (PRAGMA quick_check and foreign_key_check), refreshes
+  the query planner's statistics (ANALYZE) and gives the space of deleted rows back to the disk.
+- It runs in the background, never at the same time as a backup; each run is recorded with its
+  duration and the bytes reclaimed. A warning is shown if the check finds a problem.
+- Closing the app runs PRAGMA optimize, which only re-analyzes tables that need it.
+
+Archive:
+- Records page: "Archive Old Tasks" moves completed tasks due more than 90 days ago into a separate
+  archive database (archive/ClassIFY.db next to ClassIFY.db), so the everyday lists stay fast.
+- Tick "Include archived tasks" to see them again in All Subjects with Tasks, Completed Tasks and
+  Missing Tasks (and in exported CSVs). Archived tasks keep their subject's details even if the
+  subject is deleted later.
+- Repeating tasks stay live until their UNTIL date has passed. Archiving is local: a synced copy
+  keeps its own tasks. Back up the archive folder together with the 'backups' folder.
+
+Past terms:
+- Keep one database per term and add the old ones with "Add Past Term" on the Records page
+  (or the terms command). They are only ever opened read-only.
+- All Subjects Ever Taken and Completion History read the current database together with every
+  past term (archived tasks included). Past terms are opened only while these reports run, so
+  starting the app is as fast as before.
+
+Command line (run without a command to start the app):
+- python3 ClassIFY.py backup [--keep N]     : take a snapshot
+- python3 ClassIFY.py backups               : list snapshots
+- python3 ClassIFY.py restore SNAPSHOT      : restore a snapshot
+- python3 ClassIFY.py maintenance [--if-due] : check, analyze and compact the database
+- python3 ClassIFY.py maintenance --history : list past maintenance runs
+- python3 ClassIFY.py archive [--before DATE]: archive completed tasks due before DATE
+- python3 ClassIFY.py archive --term-end DATE : archive every task due up to the end of a term
+- python3 ClassIFY.py archive --past-terms    : same, for the latest term (schedule TermEnd) that ended
+- python3 ClassIFY.py terms [--add PATH [--label NAME]] [--remove LABEL]
+                                           : list, add or remove past-term databases
+- python3 ClassIFY.py import-budget         : check how quickly the program loads
+- python3 ClassIFY.py reports [DB ...] [--out DIR] [--all-students]
+                                           : write all reports as CSV files, in parallel,
+                                             with a manifest.json of row counts and timings
+                                             (add --include-archive for archived tasks)
+- python3 ClassIFY.py bench-rename [--tasks N]
+                                           : time a SubjectCode rename on a generated
+                                             database (1,000,000 tasks by default)
+- python3 ClassIFY.py bench-tasks-table [--tasks N]
+                                           : time building the tasks table's rows, per row,
+                                             in Python vs in the SQL view-model (100,000 tasks)
+- python3 ClassIFY.py bench-schema [--tasks N]
+                                           : compare file size and common queries of the old
+                                             text-keyed layout and the compact one (200,000 tasks)
+- python3 ClassIFY.py stress-writes [--processes N] [--ops N]
+                                           : several processes save tasks at once; reports
+                                             writes per second and checks no write was lost
+- python3 ClassIFY.py loadtest [--connections N] [--seconds S] [--url URL --token T]
+                                           : clients hammer the JSON API (a scratch one, or the
+                                             one at URL); reports requests/s and latency p50-p99
+- Use --db PATH before the command to work on another database file.
+
+Multiple students (one deployment for a whole cohort):
+- python3 ClassIFY.py --student 2023-00123           : open that student's own database
+- python3 ClassIFY.py --student 2023-00123 backup    : any command works per student
+- python3 ClassIFY.py students                       : list students with a database
+- Each student gets a separate file under students/ (spread over sub-folders), so two students
+  can both take "CS 211" and one student's queries never scan another student's rows.
+- New student databases start empty (no sample data).
+
+Syncing two computers (e.g. laptop and lab machine):
+- Every change to subjects, tasks and schedule is recorded in a change log inside the database.
+- Set up the second computer once by copying a backup snapshot (or ClassIFY.db while the app is
+  closed); the copy gets its own replica ID.
+- python3 ClassIFY.py sync-id                              : show this database's replica ID
+- python3 ClassIFY.py sync-export lab.cfsync --peer ID     : write the changes the other computer lacks
+- python3 ClassIFY.py sync-import laptop.cfsync            : merge the other computer's bundle
+- Bundles only hold the changes since the last sync, so they stay small.
+- If the same row was changed on both computers, the most recent change wins.
+
+Reminders:
+- Tasks are announced at 08:00 on their deadline day; classes 10 minutes before they start.
+- Reminders appear as a toast in the window and are written to ClassIFY_reminders.log.
+- python3 ClassIFY.py --reminders toast,desktop,log       : also send desktop notifications
+- python3 ClassIFY.py --reminders none                    : turn reminders off
+- python3 ClassIFY.py reminders                           : list the reminders for the next 7 days
+
+Analytics:
+- The 📊 Analytics page shows tasks due per week, completion per subject, overdue tasks and the priority mix.
+- python3 ClassIFY.py analytics [--weeks N]               : print the same report in the terminal
+- Installing NumPy (pip install numpy) makes it faster on very large task lists; it works without it.
+
+Study planner:
+- Give tasks an "Effort (hours)" estimate (blank = 3 h High, 2 h Medium, 1 h Low).
+- Tasks page -> "🧠 Plan Study Time" fills the free time between classes (07:00-21:00) with
+  study sessions, earliest deadline first. Click a day in the calendar to see its sessions.
+- Planning again replaces the sessions that have not started yet.
+- python3 ClassIFY.py plan [--days N] [--dry-run]          : plan from the terminal
+
+JSON API (phones and scripts):
+- python3 ClassIFY.py serve [--port 8765] [--host 0.0.0.0] : serve the database over HTTP/JSON
+  (only this computer can connect unless --host 0.0.0.0 is given; Ctrl+C stops it)
+- Every request needs the header "Authorization: Bearer <token>" with the token serve prints.
+  It belongs to the database and stays the same between runs; serve --new-token replaces it.
+  Anyone with the token can change your data - share it only with your own devices.
+- GET /subjects, /tasks (?subject=CS%20211), /schedule (?day=Mon), /reports and /reports/<name>
+  such as /reports/upcoming-tasks (?include_archive=1 where the Records page offers it).
+- POST /subjects, /tasks, /schedule add; PUT /subjects/<code>, /tasks/<id>, /schedule/<id> change
+  only the fields sent; DELETE removes (deleting a subject removes its tasks and schedule too).
+- Field names are the column names, e.g. {"SubjectCode": "CS 211", "TaskName": "Lab 3",
+  "Deadline": "2025-12-01", "Priority": "High"}; dates are YYYY-MM-DD and times HH:MM.
+  Priority is Low, Medium or High and Status is Not Started, In Progress or Completed, as in the forms.
+- Lists carry an ETag: send it back as If-None-Match and an unchanged list answers 304 with no body.
+- The API can run while the ClassIFY window is open on the same database; each sees the other's saves.
+
 (see ClassIFY_tables.sql and ClassIFY_data.sql in project root)
 
 Contact:
@@ -2254,12 +6194,872 @@ Contact:
         print(f"⚠️ Could not write USER_Manual.txt: {e}")
 
 
-def main():
+def cmd_backup(args):
+    """CLI: take an online snapshot of the database"""
+    manager = BackupManager(args.db, backup_dir=args.dir, keep=args.keep)
+    path = manager.create_snapshot()
+    print(f"✅ Backup saved: {path}")
+    return 0
+
+
+def cmd_backups(args):
+    """CLI: list existing snapshots, newest first"""
+    manager = BackupManager(args.db, backup_dir=args.dir)
+    snapshots = manager.list_snapshots()
+    if not snapshots:
+        print("No backups found")
+    for path in snapshots:
+        print(f"{path}  ({os.path.getsize(path)} bytes)")
+    return 0
+
+
+def cmd_restore(args):
+    """CLI: restore the database from a snapshot"""
+    manager = BackupManager(args.db, backup_dir=args.dir)
+    safety_path = manager.restore(args.snapshot)
+    print(f"✅ Restored {args.db} from {args.snapshot}")
+    print(f"   Previous data saved to {safety_path}")
+    return 0
+
+
+def cmd_maintenance(args):
+    """CLI: run database maintenance now (or only when due) or show past runs"""
+    manager = MaintenanceManager(args.db, interval_days=args.every)
+    if args.history:
+        runs = manager.history(args.history)
+        if not runs:
+            print("📭 No maintenance runs yet")
+        for started_at, seconds, quick_check, fk_errors, reclaimed, steps in runs:
+            print(f"{started_at}  {seconds:7.2f}s  quick_check {quick_check}, {fk_errors} FK error(s), "
+                  f"{reclaimed:,} bytes reclaimed")
+        return 0
+    if args.if_due and not manager.is_due():
+        print(f"✅ Maintenance not due (runs every {args.every} day(s))")
+        return 0
+    
+    summary = manager.run()
+    for step, seconds in summary['steps'].items():
+        print(f"   {step:18} {seconds * 1000:9.1f} ms")
+    print(f"   quick_check: {summary['quick_check']}, foreign key errors: {summary['foreign_key_errors']}, "
+          f"free pages left: {summary['free_pages']}")
+    ok = summary['quick_check'] == 'ok' and not summary['foreign_key_errors']
+    print(f"{'✅' if ok else '⚠️'} Maintenance finished in {summary['seconds']:.2f}s, "
+          f"{summary['bytes_reclaimed']:,} bytes reclaimed")
+    return 0 if ok else 1
+
+
+def cmd_archive(args):
+    """CLI: move old tasks to the archive database"""
+    db = Database(args.db, write_files=False)
+    try:
+        archive = TaskArchive(db)
+        if args.past_terms:
+            term_end = archive.latest_past_term_end()
+            if term_end is None:
+                print("📭 No schedule entry has a past TermEnd")
+                return 0
+            moved = archive.archive(term_end + timedelta(days=1), whole_term=True)
+            print(f"🗄️ Archived {moved} task(s) due up to the term that ended {term_end}")
+        elif args.term_end:
+            moved = archive.archive(date.fromisoformat(args.term_end) + timedelta(days=1), whole_term=True)
+            print(f"🗄️ Archived {moved} task(s) due up to {args.term_end}")
+        else:
+            before = date.fromisoformat(args.before) if args.before else None
+            moved = archive.archive(before)
+            print(f"🗄️ Archived {moved} completed task(s)")
+        live, archived = archive.counts()
+    finally:
+        db.close()
+    print(f"✅ {live} live task(s), {archived} archived in {archive.path}")
+    return 0
+
+
+def cmd_terms(args):
+    """CLI: list, add or remove the past-term databases used by cross-term reports"""
+    db = Database(args.db, write_files=False)
+    try:
+        library = TermLibrary(db)
+        if args.add:
+            print(f"✅ Added past term '{library.add(args.add, args.label)}'")
+        if args.remove:
+            print(f"{'✅ Removed' if library.remove(args.remove) else '⚠️ No such term:'} '{args.remove}'")
+        terms = library.terms()
+    finally:
+        db.close()
+    if not terms:
+        print("📭 No past terms registered")
+    for label, path in terms:
+        print(f"{label:24} {path}{'' if os.path.exists(path) else '  (missing!)'}")
+    return 0
+
+
+def cmd_students(args):
+    """CLI: list the students that have their own database"""
+    students = TenantRouter(args.students_dir).students()
+    for student_id in students:
+        print(student_id)
+    print(f"{len(students)} student database(s) in {args.students_dir}")
+    return 0
+
+
+def cmd_sync_id(args):
+    """CLI: print this database's replica ID"""
+    db = Database(args.db, write_files=False)
+    print(SyncManager(db).replica_id)
+    db.close()
+    return 0
+
+
+def cmd_sync_export(args):
+    """CLI: write the changes a peer has not seen yet to a bundle file"""
+    db = Database(args.db, write_files=False)
+    try:
+        count = SyncManager(db).export_bundle(args.bundle, args.peer)
+    finally:
+        db.close()
+    print(f"✅ Exported {count} change(s) to {args.bundle} ({os.path.getsize(args.bundle)} bytes)")
+    return 0
+
+
+def cmd_sync_import(args):
+    """CLI: merge a peer's bundle file into this database"""
+    db = Database(args.db, write_files=False)
+    try:
+        applied, skipped = SyncManager(db).import_bundle(args.bundle)
+    finally:
+        db.close()
+    print(f"✅ Applied {applied} change(s), skipped {skipped} already seen or older change(s)")
+    return 0
+
+
+def cmd_reminders(args):
+    """CLI: print the reminders the GUI would show over the next REMINDER_HORIZON_DAYS"""
+    db = Database(args.db, write_files=False)
+    try:
+        scheduler = ReminderScheduler(db, None, [])
+        scheduler.reload()
+        pending = scheduler.pending()
+    finally:
+        db.close()
+    if not pending:
+        print(f"📭 No reminders in the next {REMINDER_HORIZON_DAYS} days")
+    for due, _, _, title, message in pending:
+        print(f"{due.strftime('%a %Y-%m-%d %H:%M')}  {title}: {message}")
+    return 0
+
+
+def cmd_import_budget(args):
+    """CLI: time 'import ClassIFY' in a fresh interpreter with python -X importtime and check it against the budget.
+
+    The module is byte-compiled first, so this is a warm-cache start - what every launch after the first costs.
+    Without that a missing or stale .pyc (or PYTHONDONTWRITEBYTECODE=1) adds the compile time to every run."""
+    import py_compile
+    import subprocess
+    module_dir = os.path.dirname(os.path.abspath(__file__))
+    py_compile.compile(os.path.abspath(__file__), doraise=True)
+    best = None
+    for _ in range(max(1, args.runs)):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import ClassIFY'],
+                                cwd=module_dir, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise OSError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "import failed")
+        modules = []
+        for line in result.stderr.splitlines():
+            # import time: self [us] | cumulative | imported package
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            modules.append((int(self_us), int(cumulative_us), name.strip()))
+        total = next(cumulative for _, cumulative, name in modules if name == 'ClassIFY')
+        if best is None or total < best[0]:
+            best = (total, modules)
+    
+    total, modules = best
+    print(f"⏱️ import ClassIFY: {total / 1000:.1f} ms with cached bytecode "
+          f"(budget {args.budget} ms, best of {max(1, args.runs)})")
+    for self_us, _, name in sorted(modules, reverse=True)[:args.top]:
+        print(f"   {self_us / 1000:7.1f} ms  {name}")
+    if total / 1000 > args.budget:
+        print("⚠️ Import budget exceeded")
+        return 1
+    print("✅ Within budget")
+    return 0
+
+
+def cmd_analytics(args):
+    """CLI: print the workload analytics report"""
+    db = Database(args.db, write_files=False)
+    try:
+        analytics = TaskAnalytics(db, use_numpy=not args.no_numpy)
+    finally:
+        db.close()
+    overdue, average_late, worst_late = analytics.lateness()
+    print(f"📊 {len(analytics)} task(s), {analytics.completion_rate():.0%} completed ({analytics.engine} columns)")
+    print(f"⏰ Overdue: {overdue}" + (f", avg {average_late:.1f} days late, worst {worst_late}" if overdue else ""))
+    print("🎯 Priority mix: " + ", ".join(f"{name} {count}" for name, count in analytics.priority_mix().items()))
+    print("🗓️ Tasks per week:")
+    for monday, count in analytics.tasks_per_week(weeks=args.weeks):
+        print(f"   {monday.isoformat()}  {count:4d}  {'#' * count}")
+    print("✅ Completion by subject:")
+    for code, done, total, rate in analytics.completion_by_subject():
+        print(f"   {code:<12} {done:4d}/{total:<4d} {rate:5.0%}")
+    return 0
+
+
+def cmd_plan(args):
+    """CLI: plan study sessions into free time and save them (or just show them with --dry-run)"""
+    db = Database(args.db, write_files=False)
+    try:
+        planner = StudyPlanner(db)
+        sessions, shortfalls = planner.plan(days=args.days)
+        if not args.dry_run:
+            planner.save(sessions)
+        names = dict(db.read_conn.execute("SELECT TaskID, TaskName FROM tasks"))
+    finally:
+        db.close()
+    for task_id, due, day, start, end in sessions[:args.show]:
+        print(f"{day.strftime('%a %Y-%m-%d')} {from_minutes(start)}-{from_minutes(end)}  {names[task_id]} (due {due})")
+    if len(sessions) > args.show:
+        print(f"   ...{len(sessions) - args.show} more")
+    for task, minutes in shortfalls:
+        print(f"⚠️ {task[2]} ({task[1]}, due {task[3]}): {minutes / 60:.1f} h did not fit")
+    print(f"{'🔎 Proposed' if args.dry_run else '✅ Saved'} {len(sessions)} study session(s)")
+    return 0
+
+
+def cmd_reports(args):
+    """CLI: write every report for one or many databases in parallel"""
+    databases = list(args.databases) or ([] if args.all_students else [args.db])
+    if args.all_students:
+        router = TenantRouter(args.students_dir)
+        databases += [router.path_for(student) for student in router.students()]
+    if not databases:
+        print("📭 No databases to report on")
+        return 0
+    unknown = [name for name in args.report or () if name not in REPORTS]
+    if unknown:
+        raise ValueError(f"Unknown report(s): {', '.join(unknown)} - choose from: {', '.join(REPORTS)}")
+    
+    manifest = run_report_batch(databases, args.out, args.report, args.workers, args.include_archive)
+    for job in manifest['jobs']:
+        if job['error']:
+            print(f"⚠️ {job['database']} / {job['report']}: {job['error']}")
+    print(f"✅ {len(manifest['jobs']) - manifest['errors']} report(s), {manifest['rows']} row(s) "
+          f"for {manifest['databases']} database(s) in {manifest['seconds']:.2f}s -> "
+          f"{os.path.join(args.out, REPORT_MANIFEST)}")
+    return 1 if manifest['errors'] else 0
+
+
+def bench_rows(tasks, subjects):
+    """Generated {table: rows in TABLE_COLUMNS order} for the benchmarks"""
+    codes = [f"BENCH {n:04d}" for n in range(max(2, subjects))]
+    first_day = date(2025, 8, 1).toordinal()
+    priorities, statuses = list(PRIORITY_IDS), list(STATUS_IDS)
+    return {
+        'subjects': [(code, f"Benchmark subject {code}", '', 3, '') for code in codes],
+        'tasks': [(codes[n % len(codes)], f"Task {n}", date.fromordinal(first_day + n % 600).isoformat(),
+                   priorities[n % 3], statuses[n % 7 % 3], 'FREQ=WEEKLY;INTERVAL=1' if n % 50 == 0 else None, None)
+                  for n in range(tasks)],
+        'schedule': [(code, day, '07:00', '09:00', '', None, None, None) for code in codes for day in DAYS[:2]],
+    }
+
+
+def generate_bench_data(db, tasks, subjects):
+    """Fill a scratch database with generated subjects, tasks and schedule rows - returns the SubjectCodes"""
+    start = time.perf_counter()
+    rows = bench_rows(tasks, subjects)
+    
+    def generate(conn):
+        # Generated rows are not worth a change-log entry (or an undo step) each
+        conn.execute("UPDATE sync_state SET Value = '1' WHERE Key = 'applying'")
+        for table, table_rows in rows.items():
+            conn.executemany(insert_sql(table, TABLE_COLUMNS[table]), table_rows)
+        conn.execute("UPDATE sync_state SET Value = '0' WHERE Key = 'applying'")
+    
+    db.write(generate, undo=False)
+    codes = [row[0] for row in rows['subjects']]
+    print(f"🧪 Generated {tasks:,} task(s) across {len(codes)} subject(s) in {time.perf_counter() - start:.1f}s")
+    return codes
+
+
+def cmd_bench_tasks_table(args):
+    """CLI: per-row cost of loading the tasks table - Python formatting per row vs the TASK_VIEW_SQL view-model"""
+    import tempfile
+    with tempfile.TemporaryDirectory() as folder:
+        db = Database(os.path.join(folder, 'bench.db'), seed=False, write_files=False)
+        try:
+            generate_bench_data(db, args.tasks, args.subjects)
+            
+            def series_ended(task):
+                # A repeating task is only overdue once its series has ended, as in get_task_rows
+                try:
+                    return RecurrenceRule.parse(task[7]).ended_on(date.fromisoformat(task[3]), date.today()) is not None
+                except ValueError:
+                    return True             # malformed rule - judged by its deadline like a one-off
+            
+            def python_rows():
+                # What refresh_tasks_table did per row before the view-model
+                rows = []
+                for task in db.get_tasks():
+                    tag = 'high' if task[4] == 'High' else 'medium' if task[4] == 'Medium' else 'low'
+                    if task[5] == 'Completed':
+                        tag = 'completed'
+                    elif task[3] and datetime.strptime(task[3], '%Y-%m-%d').date() < date.today() and task[5] != 'Completed':
+                        if not task[7] or series_ended(task):
+                            tag = 'overdue'
+                    task_name = f"🔁 {task[2]}" if task[7] else task[2]
+                    rows.append(((task[0], f"{task[1]} - {task[6]}", task_name, task[3], task[4], task[5]), tag))
+                return rows
+            
+            def view_model_rows():
+                return [(row[:6], row[6]) for row in db.get_task_rows()]
+            
+            def fastest(build):
+                timings = []
+                for _ in range(max(1, args.repeat)):
+                    started = time.perf_counter()
+                    rows = build()
+                    timings.append(time.perf_counter() - started)
+                return min(timings), rows
+            
+            before, expected = fastest(python_rows)
+            after, rows = fastest(view_model_rows)
+            mismatches = sum(1 for old, new in zip(expected, rows) if old[1] != new[1] or old[0] != tuple(new[0]))
+            mismatches += abs(len(expected) - len(rows))
+            count = max(1, len(rows))
+            print(f"   rows built in Python (strptime, f-strings): {before * 1000:8.1f} ms = {before / count * 1e6:5.2f} µs/row")
+            print(f"   rows built by the view-model query:         {after * 1000:8.1f} ms = {after / count * 1e6:5.2f} µs/row")
+            
+            # The Treeview insert loop itself, when there is a display to create widgets on
+            try:
+                root = tk.Tk()
+            except tk.TclError:
+                print("   (no display - Treeview inserts not timed)")
+            else:
+                root.withdraw()
+                tree = ttk.Treeview(root, columns=('ID', 'Subject', 'Task Name', 'Deadline', 'Priority', 'Status'))
+                started = time.perf_counter()
+                for values, tag in rows:
+                    tree.insert('', 'end', values=values, tags=(tag,))
+                elapsed = time.perf_counter() - started
+                root.destroy()
+                print(f"   Treeview insert loop:                       {elapsed * 1000:8.1f} ms = {elapsed / count * 1e6:5.2f} µs/row")
+        finally:
+            db.close()
+    if mismatches:
+        print(f"⚠️ {mismatches} row(s) differ between the two paths")
+        return 1
+    print("✅ Tasks table benchmark finished")
+    return 0
+
+
+def cmd_bench_schema(args):
+    """CLI: size and query times of the text-keyed v5 layout against the compact v6 one, on the same generated rows"""
+    import tempfile
+    import shutil
+    with tempfile.TemporaryDirectory() as folder:
+        legacy_path, compact_path = os.path.join(folder, 'legacy.db'), os.path.join(folder, 'compact.db')
+        # A v5 file as older versions left it; opening a copy with Database runs migrate_v6 on it
+        conn = sqlite3.connect(legacy_path)
+        for sql in [SUBJECTS_V5_SQL, TASKS_V5_SQL.format(name='tasks'), SCHEDULE_V5_SQL.format(name='schedule'),
+                    STUDY_SESSIONS_SQL.format(name='study_sessions')] + INDEXES_V5_SQL:
+            conn.execute(sql)
+        rows = bench_rows(args.tasks, args.subjects)
+        for table, table_rows in rows.items():
+            columns = TABLE_COLUMNS[table]
+            conn.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                             table_rows)
+        conn.execute("PRAGMA user_version = 5")
+        conn.commit()
+        conn.close()
+        shutil.copy(legacy_path, compact_path)
+        started = time.perf_counter()
+        Database(compact_path, seed=False, write_files=False).close()
+        print(f"🧪 {args.tasks:,} task(s), {len(rows['subjects'])} subject(s); "
+              f"migrate_v6 and first open took {time.perf_counter() - started:.2f}s")
+
+        legacy = sqlite3.connect(legacy_path, isolation_level=None)
+        compact = sqlite3.connect(compact_path, isolation_level=None)
+        try:
+            print("   bytes used by subjects / tasks / schedule and their indexes (after VACUUM):")
+            sizes = []
+            for label, conn in (('v5 text keys', legacy), ('v6 compact', compact)):
+                conn.execute("VACUUM")
+                try:
+                    used = dict(conn.execute(
+                        """SELECT m.type, SUM(d.pgsize) FROM dbstat d JOIN sqlite_master m ON m.name = d.name
+                           WHERE m.tbl_name IN ('subjects', 'tasks', 'schedule', 'priorities', 'statuses')
+                           GROUP BY m.type""").fetchall())
+                except sqlite3.OperationalError:
+                    used = None         # SQLite built without the dbstat table
+                sizes.append(sum(used.values()) if used else os.path.getsize(conn.execute(
+                    "PRAGMA database_list").fetchone()[2]))
+                if used:
+                    print(f"   {label:<14} tables {used.get('table', 0) / 1e6:8.2f} MB   "
+                          f"indexes {used.get('index', 0) / 1e6:8.2f} MB   total {sizes[-1] / 1e6:8.2f} MB")
+                else:
+                    print(f"   {label:<14} whole file {sizes[-1] / 1e6:8.2f} MB (includes the change log)")
+            print(f"   compact layout: {1 - sizes[1] / sizes[0]:.0%} smaller")
+
+            code = rows['subjects'][0][0]
+            queries = [
+                ("tasks list, subject joined",
+                 """SELECT t.TaskID, t.SubjectCode, t.TaskName, t.Deadline, t.Priority, t.Status, s.Name
+                    FROM tasks t JOIN subjects s ON t.SubjectCode = s.SubjectCode ORDER BY t.Deadline""",
+                 """SELECT t.TaskID, s.SubjectCode, t.TaskName, t.Deadline, p.Name, st.Name, s.Name
+                    FROM tasks t JOIN subjects s ON s.SubjectID = t.SubjectID
+                    LEFT JOIN priorities p ON p.PriorityID = t.PriorityID
+                    LEFT JOIN statuses st ON st.StatusID = t.StatusID ORDER BY t.Deadline""", ()),
+                ("one subject's tasks",
+                 "SELECT TaskID, TaskName FROM tasks WHERE SubjectCode = ?",
+                 """SELECT t.TaskID, t.TaskName FROM tasks t JOIN subjects s ON s.SubjectID = t.SubjectID
+                    WHERE s.SubjectCode = ?""", (code,)),
+                ("open tasks per subject",
+                 "SELECT SubjectCode, COUNT(*) FROM tasks WHERE Status != 'Completed' GROUP BY SubjectCode",
+                 f"""SELECT s.SubjectCode, COUNT(*) FROM tasks t JOIN subjects s ON s.SubjectID = t.SubjectID
+                     WHERE t.StatusID != {STATUS_IDS['Completed']} GROUP BY t.SubjectID""", ()),
+                ("high priority count",
+                 "SELECT COUNT(*) FROM tasks WHERE Priority = 'High'",
+                 f"SELECT COUNT(*) FROM tasks WHERE PriorityID = {PRIORITY_IDS['High']}", ()),
+                ("every column, text values",
+                 "SELECT * FROM tasks", "SELECT * FROM task_details", ()),
+            ]
+
+            def fastest(conn, sql, params):
+                timings = []
+                for _ in range(max(1, args.repeat)):
+                    started = time.perf_counter()
+                    result = conn.execute(sql, params).fetchall()
+                    timings.append(time.perf_counter() - started)
+                return min(timings), result
+
+            mismatches = 0
+            print(f"   {'query':<28}{'v5 text keys':>14}{'v6 compact':>14}")
+            for name, legacy_sql, compact_sql, params in queries:
+                before, expected = fastest(legacy, legacy_sql, params)
+                after, result = fastest(compact, compact_sql, params)
+                mismatches += sorted(expected) != sorted(result)
+                print(f"   {name:<28}{before * 1000:11.1f} ms{after * 1000:11.1f} ms")
+        finally:
+            legacy.close()
+            compact.close()
+    if mismatches:
+        print(f"⚠️ {mismatches} query(s) returned different rows on the two layouts")
+        return 1
+    print("✅ Schema benchmark finished")
+    return 0
+
+
+def cmd_bench_rename(args):
+    """CLI: time SubjectCode renames on a generated database with --tasks tasks"""
+    import tempfile
+    with tempfile.TemporaryDirectory() as folder:
+        db = Database(os.path.join(folder, 'bench.db'), seed=False, write_files=False)
+        try:
+            codes = generate_bench_data(db, args.tasks, args.subjects)
+            
+            code = codes[0]
+            subject = db.get_subject_by_code(code)
+            moved = db.read_conn.execute("SELECT COUNT(*) FROM task_details WHERE SubjectCode = ?", (code,)).fetchone()[0]
+            
+            def rename_round_trip():
+                timings = []
+                for new_code, old_code in ((code + ' X', code), (code, code + ' X')) * max(1, args.repeat):
+                    started = time.perf_counter()
+                    if not db.update_subject(old_code, new_code, *subject[1:]):
+                        raise ValueError(f"Rename {old_code} -> {new_code} failed")
+                    timings.append(time.perf_counter() - started)
+                return min(timings)
+            
+            # Tasks keep their SubjectID; only the change log records them under the new code
+            print(f"   rename '{code}' ({moved:,} task(s)), indexed SubjectID:   {rename_round_trip() * 1000:8.1f} ms")
+            db.conn.execute("DROP INDEX idx_tasks_subject")
+            db.conn.execute("DROP INDEX idx_schedule_subject")
+            print(f"   same rename without the SubjectID indexes:     {rename_round_trip() * 1000:8.1f} ms")
+            
+            # A clash with an existing code must leave every row where it was
+            if db.update_subject(code, codes[1], *subject[1:]):
+                raise ValueError("Rename onto an existing SubjectCode was accepted")
+            still = db.read_conn.execute("SELECT COUNT(*) FROM task_details WHERE SubjectCode = ?", (code,)).fetchone()[0]
+            orphans = db.read_conn.execute("PRAGMA foreign_key_check").fetchall()
+            print(f"   rejected clash left {still:,} task(s) in place, {len(orphans)} orphan(s)")
+        finally:
+            db.close()
+    if still != moved or orphans:
+        print("⚠️ Rename was not atomic")
+        return 1
+    print("✅ Rename benchmark finished")
+    return 0
+
+
+def cmd_stress_writes(args):
+    """CLI: several processes write to one database at once - reports throughput and lost writes"""
+    from concurrent.futures import ProcessPoolExecutor
+    import tempfile
+    with tempfile.TemporaryDirectory() as folder:
+        path = args.db_file or os.path.join(folder, 'stress.db')
+        db = Database(path, seed=False, write_files=False)
+        try:
+            db.write(lambda conn: conn.execute(
+                "INSERT OR IGNORE INTO subjects (SubjectCode, Name) VALUES ('STRESS 1', 'Stress test')"))
+            before = db.conn.execute("SELECT COUNT(*) FROM tasks WHERE TaskName LIKE 'stress %'").fetchone()[0]
+        finally:
+            db.close()
+        
+        print(f"🧪 {args.processes} process(es) x {args.ops} add_task + update_task on {path}")
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=args.processes) as pool:
+            results = list(pool.map(run_write_stress_worker, [path] * args.processes,
+                                    range(args.processes), [args.ops] * args.processes))
+        elapsed = time.perf_counter() - started
+        
+        db = Database(path, seed=False, write_files=False)
+        try:
+            added = [task_id for r in results for task_id in r['added']]
+            found = db.conn.execute("SELECT COUNT(*) FROM tasks WHERE TaskName LIKE 'stress %'").fetchone()[0] - before
+            completed = 0
+            # Every acknowledged add must exist and every acknowledged update must have stuck
+            for start in range(0, len(added), 500):
+                chunk = added[start:start + 500]
+                completed += db.conn.execute(
+                    f"SELECT COUNT(*) FROM task_details WHERE Status = 'Completed' AND TaskID IN ({','.join('?' * len(chunk))})",
+                    chunk).fetchone()[0]
+        finally:
+            db.close()
+    
+    writes = sum(len(r['added']) + r['updated'] for r in results)
+    latencies = sorted(latency for r in results for latency in r['latencies'])
+    lost = (len(added) - found) + (sum(r['updated'] for r in results) - completed)
+    print(f"   {writes} write(s) in {elapsed:.2f}s = {writes / elapsed:.0f} writes/s")
+    if latencies:
+        print(f"   add+update latency: median {latencies[len(latencies) // 2] * 1000:.1f} ms, "
+              f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.1f} ms, max {latencies[-1] * 1000:.1f} ms")
+    print(f"   busy retries: {sum(r['retries'] for r in results)}, gave up: {sum(r['failed'] for r in results)}, "
+          f"lost writes: {lost}")
+    if lost:
+        print("⚠️ Writes were lost")
+        return 1
+    print("✅ No lost writes")
+    return 0
+
+
+def cmd_serve(args):
+    """CLI: run the local JSON API until Ctrl+C"""
+    import asyncio
+    pool = ApiDatabasePool(args.db, readers=args.readers, seed=not args.student)
+    try:
+        token = pool.writer.get_api_token(renew=args.new_token)
+        asyncio.run(ApiServer(pool, token, args.host, args.port).serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.close()
+    return 0
+
+
+async def api_call(reader, writer, token, method, path, data=None, etag=None):
+    """One HTTP/1.1 request on a kept-alive connection - returns (status, headers, body)"""
+    payload = json.dumps(data).encode('utf-8') if data is not None else b''
+    lines = [f"{method} {path} HTTP/1.1", "Host: classify", f"Authorization: Bearer {token}",
+             f"Content-Length: {len(payload)}"]
+    if etag:
+        lines.append(f"If-None-Match: {etag}")
+    writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + payload)
+    await writer.drain()
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("server closed the connection")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get('content-length') or 0)
+    return int(status_line.split()[1]), headers, (await reader.readexactly(length) if length else b'')
+
+
+async def run_loadtest(host, port, token, connections, seconds, write_share):
+    """Keep `connections` clients busy for `seconds` - a read mix that revalidates with If-None-Match, plus task updates"""
+    import asyncio
+    import random
+    from urllib.parse import quote
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        status, _, body = await api_call(reader, writer, token, 'GET', '/subjects')
+        if status != 200:
+            raise OSError(f"the API answered {status}: {body.decode('utf-8', 'replace')}")
+        codes = [subject['SubjectCode'] for subject in json.loads(body)]
+        _, _, body = await api_call(reader, writer, token, 'GET', '/tasks')
+        task_ids = [task['TaskID'] for task in json.loads(body)]
+    finally:
+        writer.close()
+    reads = ['/tasks', '/subjects', '/schedule', '/schedule?day=Mon', '/reports/upcoming-tasks',
+             '/reports/missing-tasks', '/reports/all-subjects-with-tasks']
+    reads += [f"/tasks?subject={quote(code)}" for code in codes[:5]]
+    stats = {'latencies': [], 'statuses': {}, 'errors': 0, 'writes': 0}
+    deadline = time.perf_counter() + seconds
+
+    async def client(number):
+        rng = random.Random(number)
+        etags = {}                  # path -> ETag of the copy this client holds, like a phone's cache
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                if task_ids and rng.random() < write_share:
+                    stats['writes'] += 1
+                    status, _, _ = await api_call(reader, writer, token, 'PUT', f"/tasks/{rng.choice(task_ids)}",
+                                                  {'Status': rng.choice(list(STATUS_IDS))})
+                else:
+                    path = rng.choice(reads)
+                    status, headers, _ = await api_call(reader, writer, token, 'GET', path, etag=etags.get(path))
+                    if 'etag' in headers:
+                        etags[path] = headers['etag']
+                stats['latencies'].append(time.perf_counter() - started)
+                stats['statuses'][status] = stats['statuses'].get(status, 0) + 1
+        except (ConnectionError, asyncio.IncompleteReadError, OSError):
+            stats['errors'] += 1
+        finally:
+            writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(n) for n in range(connections)))
+    stats['seconds'] = time.perf_counter() - started
+    return stats
+
+
+def cmd_loadtest(args):
+    """CLI: requests per second and latency percentiles of the JSON API under concurrent clients"""
+    import asyncio
+    import subprocess
+    import tempfile
+    from urllib.parse import urlsplit
+    with tempfile.TemporaryDirectory() as folder:
+        server = None
+        token = args.token
+        if args.url:
+            if not token:
+                raise ValueError("--url needs --token (printed by 'serve')")
+            url = urlsplit(args.url)
+            host, port = url.hostname, url.port or 80
+        else:
+            # A scratch database and a server in its own process, so the clients do not share its GIL
+            path = os.path.join(folder, 'loadtest.db')
+            db = Database(path, seed=False, write_files=False)
+            try:
+                generate_bench_data(db, args.tasks, args.subjects)
+            finally:
+                db.close()
+            server = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--db', path, 'serve', '--port', '0'],
+                                      stdout=subprocess.PIPE, text=True, encoding='utf-8',
+                                      env={**os.environ, 'PYTHONIOENCODING': 'utf-8'})
+            host = port = None
+            for line in server.stdout:
+                if line.startswith('🌐'):
+                    url = urlsplit(line.split()[4])
+                    host, port = url.hostname, url.port
+                elif line.startswith('🔑'):
+                    token = line.split()[2]
+                    break
+            if port is None or token is None:
+                server.kill()
+                raise OSError("the API server did not start")
+        try:
+            print(f"🧪 {args.connections} connection(s) for {args.seconds}s against http://{host}:{port}/ "
+                  f"({args.write_share:.0%} task updates)")
+            stats = asyncio.run(run_loadtest(host, port, token, args.connections, args.seconds, args.write_share))
+        finally:
+            if server:
+                server.terminate()
+                server.wait(timeout=30)
+                server.stdout.close()
+
+    latencies = sorted(stats['latencies'])
+    count = len(latencies)
+    print(f"   {count:,} request(s) in {stats['seconds']:.2f}s = {count / stats['seconds']:,.0f} requests/s "
+          f"({stats['writes']:,} update(s))")
+    if latencies:
+        def percentile(share):
+            return latencies[min(count - 1, int(count * share))] * 1000
+        print(f"   latency: p50 {percentile(0.5):.1f} ms, p90 {percentile(0.9):.1f} ms, p99 {percentile(0.99):.1f} ms, "
+              f"max {latencies[-1] * 1000:.1f} ms")
+    print("   responses: " + ', '.join(f"{status} x{n:,}" for status, n in sorted(stats['statuses'].items())))
+    failed = stats['errors'] + sum(n for status, n in stats['statuses'].items() if status >= 500)
+    if failed or not count:
+        print(f"⚠️ {failed} failed request(s) or dropped connection(s)")
+        return 1
+    print("✅ Load test finished")
+    return 0
+
+
+def build_arg_parser():
+    """Command line options - running without a command starts the GUI"""
+    parser = argparse.ArgumentParser(prog='ClassIFY.py', description="ClassIFY - Student Organizer")
+    parser.add_argument('--db', default='ClassIFY.db', help="database file (default: ClassIFY.db)")
+    parser.add_argument('--student', help="StudentID - use that student's own database instead of --db")
+    parser.add_argument('--students-dir', default=TENANT_DIR_NAME,
+                        help=f"folder holding per-student databases (default: {TENANT_DIR_NAME})")
+    parser.add_argument('--reminders', default=REMINDER_SINKS,
+                        help=f"where reminders go: any of toast,desktop,log or 'none' (default: {REMINDER_SINKS})")
+    commands = parser.add_subparsers(dest='command', metavar='command')
+    
+    backup = commands.add_parser('backup', help="take an online snapshot of the database")
+    backup.add_argument('--keep', type=int, default=BACKUP_KEEP, help=f"snapshots to keep (default: {BACKUP_KEEP})")
+    backup.add_argument('--dir', help="backup folder (default: 'backups' next to the database)")
+    backup.set_defaults(func=cmd_backup)
+    
+    backups = commands.add_parser('backups', help="list snapshots")
+    backups.add_argument('--dir', help="backup folder (default: 'backups' next to the database)")
+    backups.set_defaults(func=cmd_backups)
+    
+    restore = commands.add_parser('restore', help="replace the database with a snapshot")
+    restore.add_argument('snapshot', help="snapshot file to restore")
+    restore.add_argument('--dir', help="backup folder (default: 'backups' next to the database)")
+    restore.set_defaults(func=cmd_restore)
+    
+    maintenance = commands.add_parser('maintenance', help="check, analyze and compact the database")
+    maintenance.add_argument('--if-due', action='store_true', help="only run when the last run is old enough")
+    maintenance.add_argument('--every', type=int, default=MAINTENANCE_INTERVAL_DAYS,
+                             help=f"days between runs for --if-due (default: {MAINTENANCE_INTERVAL_DAYS})")
+    maintenance.add_argument('--history', type=int, nargs='?', const=10, metavar='N',
+                             help="list the last N runs instead (default: 10)")
+    maintenance.set_defaults(func=cmd_maintenance)
+    
+    archive = commands.add_parser('archive', help="move old tasks to the archive database")
+    archive.add_argument('--before', help=f"YYYY-MM-DD - archive completed tasks due before this date "
+                                          f"(default: {ARCHIVE_AFTER_DAYS} days ago)")
+    archive.add_argument('--term-end', help="YYYY-MM-DD - archive every task due up to this date, whatever its status")
+    archive.add_argument('--past-terms', action='store_true',
+                         help="like --term-end with the latest schedule TermEnd that has passed")
+    archive.set_defaults(func=cmd_archive)
+    
+    terms = commands.add_parser('terms', help="list, add or remove past-term databases for cross-term reports")
+    terms.add_argument('--add', metavar='PATH', help="register a past term's database file")
+    terms.add_argument('--label', help="name for the term being added (default: the file name)")
+    terms.add_argument('--remove', metavar='LABEL', help="forget a registered term")
+    terms.set_defaults(func=cmd_terms)
+    
+    students = commands.add_parser('students', help="list students with their own database")
+    students.set_defaults(func=cmd_students)
+    
+    sync_id = commands.add_parser('sync-id', help="print this database's replica ID")
+    sync_id.set_defaults(func=cmd_sync_id)
+    
+    sync_export = commands.add_parser('sync-export', help="write unsynced changes to a bundle file")
+    sync_export.add_argument('bundle', help="bundle file to write (e.g. laptop.cfsync)")
+    sync_export.add_argument('--peer', help="replica ID of the receiving database (omit to export everything)")
+    sync_export.set_defaults(func=cmd_sync_export)
+    
+    sync_import = commands.add_parser('sync-import', help="merge a bundle file from another database")
+    sync_import.add_argument('bundle', help="bundle file to read")
+    sync_import.set_defaults(func=cmd_sync_import)
+    
+    reminders = commands.add_parser('reminders', help="list the reminders due in the next few days")
+    reminders.set_defaults(func=cmd_reminders)
+    
+    analytics = commands.add_parser('analytics', help="print workload analytics (tasks per week, completion, lateness)")
+    analytics.add_argument('--weeks', type=int, default=ANALYTICS_WEEKS,
+                           help=f"weeks in the tasks-per-week table (default: {ANALYTICS_WEEKS})")
+    analytics.add_argument('--no-numpy', action='store_true', help="use the pure-Python column arrays")
+    analytics.set_defaults(func=cmd_analytics)
+    
+    reports = commands.add_parser('reports', help="write all reports for one or more databases to a folder")
+    reports.add_argument('databases', nargs='*', help="database files (default: --db)")
+    reports.add_argument('--out', default='reports', help="output folder (default: reports)")
+    reports.add_argument('--all-students', action='store_true', help="include every student database")
+    reports.add_argument('--report', action='append', help="report name to run (repeatable, default: all)")
+    reports.add_argument('--workers', type=int, help="worker processes (default: one per CPU)")
+    reports.add_argument('--include-archive', action='store_true', help="include archived tasks where it applies")
+    reports.set_defaults(func=cmd_reports)
+    
+    plan = commands.add_parser('plan', help="plan study sessions for open tasks into free time")
+    plan.add_argument('--days', type=int, default=PLANNER_HORIZON_DAYS,
+                      help=f"days ahead to plan (default: {PLANNER_HORIZON_DAYS})")
+    plan.add_argument('--dry-run', action='store_true', help="show the plan without saving it")
+    plan.add_argument('--show', type=int, default=20, help="sessions to print (default: 20)")
+    plan.set_defaults(func=cmd_plan)
+    
+    bench = commands.add_parser('bench-rename', help="time a SubjectCode rename on a generated database")
+    bench.add_argument('--tasks', type=int, default=1000000, help="tasks to generate (default: 1000000)")
+    bench.add_argument('--subjects', type=int, default=100, help="subjects the tasks are spread over (default: 100)")
+    bench.add_argument('--repeat', type=int, default=3, help="rename round trips, the fastest counts (default: 3)")
+    bench.set_defaults(func=cmd_bench_rename)
+    
+    table_bench = commands.add_parser('bench-tasks-table', help="time building the tasks table rows on a generated database")
+    table_bench.add_argument('--tasks', type=int, default=100000, help="tasks to generate (default: 100000)")
+    table_bench.add_argument('--subjects', type=int, default=100, help="subjects the tasks are spread over (default: 100)")
+    table_bench.add_argument('--repeat', type=int, default=3, help="timed runs per path, the fastest counts (default: 3)")
+    table_bench.set_defaults(func=cmd_bench_tasks_table)
+    
+    schema_bench = commands.add_parser('bench-schema', help="compare size and query times of the v5 and compact v6 layouts")
+    schema_bench.add_argument('--tasks', type=int, default=200000, help="tasks to generate (default: 200000)")
+    schema_bench.add_argument('--subjects', type=int, default=100, help="subjects the tasks are spread over (default: 100)")
+    schema_bench.add_argument('--repeat', type=int, default=3, help="timed runs per query, the fastest counts (default: 3)")
+    schema_bench.set_defaults(func=cmd_bench_schema)
+    
+    serve = commands.add_parser('serve', help="run the local JSON API for phones and scripts")
+    serve.add_argument('--host', default=API_HOST, help=f"address to listen on (default: {API_HOST})")
+    serve.add_argument('--port', type=int, default=API_PORT, help=f"port (default: {API_PORT}, 0 picks a free one)")
+    serve.add_argument('--readers', type=int, default=API_READERS,
+                       help=f"reader threads with their own connection (default: {API_READERS})")
+    serve.add_argument('--new-token', action='store_true', help="replace the API token (old clients stop working)")
+    serve.set_defaults(func=cmd_serve)
+    
+    loadtest = commands.add_parser('loadtest', help="measure requests per second and latency of the JSON API")
+    loadtest.add_argument('--url', help="API to test, e.g. http://127.0.0.1:8765 (default: start one on generated data)")
+    loadtest.add_argument('--token', help="that API's token, as printed by 'serve'")
+    loadtest.add_argument('--tasks', type=int, default=2000, help="tasks to generate (default: 2000)")
+    loadtest.add_argument('--subjects', type=int, default=20, help="subjects to generate (default: 20)")
+    loadtest.add_argument('--connections', type=int, default=LOADTEST_CONNECTIONS,
+                          help=f"concurrent keep-alive clients (default: {LOADTEST_CONNECTIONS})")
+    loadtest.add_argument('--seconds', type=float, default=LOADTEST_SECONDS,
+                          help=f"how long to run (default: {LOADTEST_SECONDS})")
+    loadtest.add_argument('--write-share', type=float, default=LOADTEST_WRITE_SHARE,
+                          help=f"fraction of requests that update a task (default: {LOADTEST_WRITE_SHARE})")
+    loadtest.set_defaults(func=cmd_loadtest)
+    
+    stress = commands.add_parser('stress-writes', help="hammer one database from several processes and check for lost writes")
+    stress.add_argument('--processes', type=int, default=4, help="writer processes (default: 4)")
+    stress.add_argument('--ops', type=int, default=200, help="add_task + update_task pairs per process (default: 200)")
+    stress.add_argument('--db-file', help="database to hammer (default: a throwaway file, not --db)")
+    stress.set_defaults(func=cmd_stress_writes)
+    
+    budget = commands.add_parser('import-budget', help="check how long importing ClassIFY takes")
+    budget.add_argument('--budget', type=float, default=IMPORT_BUDGET_MS,
+                        help=f"maximum import time in ms (default: {IMPORT_BUDGET_MS})")
+    budget.add_argument('--runs', type=int, default=5, help="imports to time, the fastest counts (default: 5)")
+    budget.add_argument('--top', type=int, default=10, help="slowest modules to list (default: 10)")
+    budget.set_defaults(func=cmd_import_budget)
+    
+    return parser
+
+
+def main(argv=None):
     """Main function"""
+    parser = build_arg_parser()
+    args = parser.parse_args(argv)
+    if args.student:
+        # Route to the student's own database file
+        router = TenantRouter(args.students_dir)
+        try:
+            args.db = router.path_for(args.student)
+        except ValueError as e:
+            parser.error(str(e))
+        os.makedirs(os.path.dirname(args.db), exist_ok=True)
+    
+    if args.command:
+        try:
+            return args.func(args)
+        except (sqlite3.Error, OSError, ValueError) as e:
+            print(f"⚠️ {args.command} failed: {e}")
+            return 1
+    
     print("=" * 60)
     print("ClassIFY - Student Organizer")
-    print("Using SubjectCode as primary key for all subject relationships")
-    print("No numeric IDs - all tables connected via SubjectCode")
+    print("Subjects keyed by a compact SubjectID; SubjectCode stays unique and user-facing")
+    print("Priority and status stored as integer codes - see the task_details view for text")
     print("=" * 60)
     
     # Write user manual
@@ -2267,7 +7067,7 @@ def main():
     
     # Create and run application
     root = tk.Tk()
-    app = ClassifyApp(root)
+    app = ClassifyApp(root, args.db, seed=not args.student, reminders=args.reminders)
     
     # Center window
     root.update_idletasks()
@@ -2279,10 +7079,10 @@ def main():
     
     root.mainloop()
     
-    # Cleanup
-    if hasattr(app, 'db'):
-        app.db.close()
+    # Cleanup - also saves the dashboard snapshot for the next start
+    app.shutdown()
+    return 0
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
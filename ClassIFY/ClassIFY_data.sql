@@ -8,17 +8,23 @@ INSERT INTO subjects (SubjectCode, Name, Instructor, Units, Goals) VALUES
 ('CpE 405', 'Discrete Mathematics', 'BAGSIT, CHARLES CONRAD P.', 3, 'Learn more about logics with math!'),
 ('IT 212', 'Computer Networking 1', 'MACATANGAY, LLOYD H.', 3, 'Get CISCO NetAcad certification');
 
--- Tasks
-INSERT INTO tasks (SubjectCode, TaskName, Deadline, Priority, Status) VALUES
+-- Tasks (codes and names are looked up as their SubjectID / PriorityID / StatusID)
+INSERT INTO tasks (SubjectID, TaskName, Deadline, PriorityID, StatusID)
+SELECT s.SubjectID, v.column2, v.column3, p.PriorityID, st.StatusID FROM (VALUES
 ('CpE 405', 'Review for final exam', '2025-12-12', 'High', 'Not Started'),
 ('CS 211', 'Review for final exam', '2025-12-09', 'High', 'Not Started'),
 ('CS 211', 'Review for quiz', '2025-12-09', 'High', 'In Progress'),
 ('CS 212', 'Review for final exam 
  and practice coding with assembly language', '2025-12-11', 'High', 'Not Started'),
-('Phy 101', 'Successfully defend the research project in Physics and STS', '2025-12-04', 'High', 'Completed');
+('Phy 101', 'Successfully defend the research project in Physics and STS', '2025-12-04', 'High', 'Completed')
+) v
+JOIN subjects s ON s.SubjectCode = v.column1
+JOIN priorities p ON p.Name = v.column4
+JOIN statuses st ON st.Name = v.column5;
 
 -- Schedule
-INSERT INTO schedule (SubjectCode, Day, StartTime, EndTime, Room) VALUES
+INSERT INTO schedule (SubjectID, Day, StartTime, EndTime, Room)
+SELECT s.SubjectID, v.column2, v.column3, v.column4, v.column5 FROM (VALUES
 ('Phy 101', 'Mon', '10:00', '13:00', 'ROOM 402'),
 ('GEd 109', 'Mon', '14:00', '17:00', 'ROOM 101'),
 ('CS 211', 'Tue', '07:00', '10:00', 'LAB 02'),
@@ -29,4 +35,6 @@ INSERT INTO schedule (SubjectCode, Day, StartTime, EndTime, Room) VALUES
 ('IT 212', 'Thu', '14:00', '16:00', 'ONLINE'),
 ('CS 212', 'Thu', '11:00', '13:00', 'ONLINE'),
 ('CS 212', 'Fri', '07:00', '10:00', 'LAB 03'),
-('CpE 405', 'Sat', '07:00', '10:00', 'ROOM 103');
+('CpE 405', 'Sat', '07:00', '10:00', 'ROOM 103')
+) v
+JOIN subjects s ON s.SubjectCode = v.column1;
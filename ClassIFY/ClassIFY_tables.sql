@@ -1,29 +1,86 @@
 PRAGMA foreign_keys = ON;
 
 CREATE TABLE IF NOT EXISTS subjects (
-    SubjectCode TEXT PRIMARY KEY,       -- e.g. 'CS 212'
+    SubjectID INTEGER PRIMARY KEY,      -- compact key tasks and schedule refer to
+    SubjectCode TEXT NOT NULL UNIQUE,   -- e.g. 'CS 212'
     Name TEXT NOT NULL,
     Instructor TEXT,
     Units INTEGER,
     Goals TEXT   -- allow at least 100 characters
-);
+) STRICT;
+
+CREATE TABLE IF NOT EXISTS priorities (
+    PriorityID INTEGER PRIMARY KEY,
+    Name TEXT NOT NULL UNIQUE
+) STRICT;
+
+CREATE TABLE IF NOT EXISTS statuses (
+    StatusID INTEGER PRIMARY KEY,
+    Name TEXT NOT NULL UNIQUE
+) STRICT;
+
+INSERT OR IGNORE INTO priorities (PriorityID, Name) VALUES (0, 'Low'), (1, 'Medium'), (2, 'High');
+INSERT OR IGNORE INTO statuses (StatusID, Name) VALUES (0, 'Not Started'), (1, 'In Progress'), (2, 'Completed');
 
 CREATE TABLE IF NOT EXISTS tasks (
     TaskID INTEGER PRIMARY KEY AUTOINCREMENT,
-    SubjectCode TEXT NOT NULL,
+    SubjectID INTEGER NOT NULL,
     TaskName TEXT NOT NULL,
     Deadline TEXT,                   -- YYYY-MM-DD
-    Priority TEXT,                   -- Low / Medium / High
-    Status TEXT,                     -- Not Started / In Progress / Completed
-    FOREIGN KEY (SubjectCode) REFERENCES subjects(SubjectCode) ON DELETE CASCADE
-);
+    PriorityID INTEGER,              -- priorities: 0 Low, 1 Medium, 2 High
+    StatusID INTEGER,                -- statuses: 0 Not Started, 1 In Progress, 2 Completed
+    Recurrence TEXT,                 -- NULL or e.g. 'FREQ=WEEKLY;INTERVAL=1;UNTIL=2025-12-20'
+    EffortMinutes INTEGER,           -- estimated work, NULL = default for the priority
+    FOREIGN KEY (SubjectID) REFERENCES subjects(SubjectID) ON DELETE CASCADE,
+    FOREIGN KEY (PriorityID) REFERENCES priorities(PriorityID),
+    FOREIGN KEY (StatusID) REFERENCES statuses(StatusID)
+) STRICT;
 
 CREATE TABLE IF NOT EXISTS schedule (
     ScheduleID INTEGER PRIMARY KEY AUTOINCREMENT,
-    SubjectCode TEXT NOT NULL,
+    SubjectID INTEGER NOT NULL,
     Day TEXT NOT NULL,               -- 'Mon','Tue','Wed','Thu','Fri','Sat','Sun'
     StartTime TEXT NOT NULL,         -- 'HH:MM'
     EndTime TEXT NOT NULL,           -- 'HH:MM'
     Room TEXT,
-    FOREIGN KEY (SubjectCode) REFERENCES subjects(SubjectCode) ON DELETE CASCADE
-);
+    TermStart TEXT,                  -- YYYY-MM-DD, NULL = no start date
+    TermEnd TEXT,                    -- YYYY-MM-DD, NULL = no end date
+    Recurrence TEXT,                 -- NULL = every week, or e.g. 'FREQ=WEEKLY;INTERVAL=2'
+    StartMinute INTEGER GENERATED ALWAYS AS (CAST(substr(StartTime, 1, instr(StartTime, ':') - 1) AS INTEGER) * 60
+                                            + CAST(substr(StartTime, instr(StartTime, ':') + 1) AS INTEGER)) VIRTUAL,
+    EndMinute INTEGER GENERATED ALWAYS AS (CAST(substr(EndTime, 1, instr(EndTime, ':') - 1) AS INTEGER) * 60
+                                          + CAST(substr(EndTime, instr(EndTime, ':') + 1) AS INTEGER)) VIRTUAL,
+    FOREIGN KEY (SubjectID) REFERENCES subjects(SubjectID) ON DELETE CASCADE
+) STRICT;
+
+CREATE TABLE IF NOT EXISTS study_sessions (
+    SessionID INTEGER PRIMARY KEY AUTOINCREMENT,
+    TaskID INTEGER NOT NULL,
+    DueDate TEXT NOT NULL,           -- deadline (or repeat date) the session works towards
+    SessionDate TEXT NOT NULL,       -- YYYY-MM-DD
+    StartTime TEXT NOT NULL,         -- 'HH:MM'
+    EndTime TEXT NOT NULL,           -- 'HH:MM'
+    FOREIGN KEY (TaskID) REFERENCES tasks(TaskID) ON DELETE CASCADE
+) STRICT;
+
+CREATE INDEX IF NOT EXISTS idx_tasks_deadline ON tasks(Deadline);
+CREATE INDEX IF NOT EXISTS idx_tasks_subject ON tasks(SubjectID);
+CREATE INDEX IF NOT EXISTS idx_schedule_day ON schedule(Day, StartMinute, EndMinute);
+CREATE INDEX IF NOT EXISTS idx_schedule_subject ON schedule(SubjectID);
+CREATE INDEX IF NOT EXISTS idx_study_sessions_date ON study_sessions(SessionDate, StartTime);
+CREATE INDEX IF NOT EXISTS idx_study_sessions_task ON study_sessions(TaskID);
+
+-- Text-keyed views with the column layout tasks and schedule had before the compact schema
+CREATE VIEW IF NOT EXISTS task_details AS
+    SELECT t.TaskID, s.SubjectCode, t.TaskName, t.Deadline, p.Name AS Priority, st.Name AS Status,
+           t.Recurrence, t.EffortMinutes
+    FROM tasks t
+    JOIN subjects s ON s.SubjectID = t.SubjectID
+    LEFT JOIN priorities p ON p.PriorityID = t.PriorityID
+    LEFT JOIN statuses st ON st.StatusID = t.StatusID;
+
+CREATE VIEW IF NOT EXISTS schedule_details AS
+    SELECT c.ScheduleID, s.SubjectCode, c.Day, c.StartTime, c.EndTime, c.Room,
+           c.TermStart, c.TermEnd, c.Recurrence, c.StartMinute, c.EndMinute
+    FROM schedule c
+    JOIN subjects s ON s.SubjectID = c.SubjectID;